@@ -0,0 +1 @@
+"""Benchmarks of ib-client hot paths, run them with "python -m benchmarks run"."""
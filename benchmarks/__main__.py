@@ -0,0 +1,125 @@
+import json
+
+import click
+
+from . import memory
+from .runner import compare, get_metadata, run
+from .suite import BENCHMARKS
+
+
+def parse_sizes(_, __, value: str) -> list:
+    try:
+        sizes = [int(size) for size in value.split(',')]
+    except ValueError:
+        raise click.BadParameter(f'{value} is not a comma-separated list of integers')
+    if any(size < 1 for size in sizes):
+        raise click.BadParameter(f'sizes must be positive integers but you provide {value}')
+    return sizes
+
+
+def format_duration(seconds: float) -> str:
+    for unit, factor in (('s', 1), ('ms', 1e3)):
+        if seconds >= 1 / factor:
+            return f'{seconds * factor:.3f}{unit}'
+    return f'{seconds * 1e6:.3f}us'
+
+
+def echo_result(result: dict) -> None:
+    throughput = f' ({result["items_per_second"]:,.0f} items/s)' if result['items'] > 1 else ''
+    click.echo(f'{result["id"]}: {format_duration(result["median"])} '
+               f'+/- {format_duration(result["stdev"])}{throughput}', err=True)
+
+
+@click.group()
+def cli():
+    """Benchmarks ib-client hot paths against a local fake wapi."""
+
+
+@cli.command('list')
+def list_benchmarks():
+    """Lists available benchmarks."""
+    for benchmark in BENCHMARKS:
+        click.echo(f'{benchmark.name}: {benchmark.setup.__doc__}')
+
+
+@cli.command('run')
+@click.option('-s', '--sizes', default='10000', callback=parse_sizes, show_default=True,
+              help='Comma-separated numbers of networks of the synthetic datasets, e.g. 10000,100000,1000000.')
+@click.option('-k', '--filter', 'name_filter', help='Only runs benchmarks whose name contains this text.')
+@click.option('-r', '--rounds', type=click.IntRange(min=1), default=5, show_default=True,
+              help='Number of measures of each benchmark.')
+@click.option('--min-time', type=click.FloatRange(min=0), default=0.2, show_default=True,
+              help='Minimum duration in seconds of a measure.')
+@click.option('--latency', type=click.FloatRange(min=0), default=0.0, show_default=True,
+              help='Time in seconds added by the fake wapi to each request.')
+@click.option('-o', '--output', type=click.File('w'), default='-',
+              help='File where json results are written, by default the standard output.')
+def run_benchmarks(sizes, name_filter, rounds, min_time, latency, output):
+    """Runs benchmarks and writes their results in json."""
+    results = run(sizes, name_filter, rounds, min_time, latency, progress=echo_result)
+    json.dump(results, output, indent=4)
+    output.write('\n')
+
+
+@cli.command('compare')
+@click.argument('baseline', type=click.File())
+@click.argument('current', type=click.File())
+@click.option('-t', '--threshold', type=click.FloatRange(min=0), default=0.1, show_default=True,
+              help='Relative slowdown of a median considered as a regression.')
+def compare_results(baseline, current, threshold):
+    """
+    Compares two json results of the run command, the exit code is 1 if a benchmark of CURRENT is slower than in
+    BASELINE by more than the threshold.
+    """
+    comparisons, regression = compare(json.load(baseline), json.load(current), threshold)
+    for comparison in comparisons:
+        flag = ' REGRESSION' if comparison['regression'] else ''
+        click.echo(f'{comparison["id"]}: {format_duration(comparison["baseline"])} -> '
+                   f'{format_duration(comparison["current"])} ({comparison["change"]:+.1%}){flag}')
+    if regression:
+        raise click.exceptions.Exit(1)
+
+
+def format_size(size: float) -> str:
+    if size < 1024:
+        return f'{size}B'
+    for unit in ('KB', 'MB'):
+        size /= 1024
+        if size < 1024:
+            return f'{size:.1f}{unit}'
+    return f'{size / 1024:.1f}GB'
+
+
+def echo_memory_result(result: dict) -> None:
+    click.echo(f'{result["name"]}[size={result["size"]}]: peak {format_size(result["peak"])}, '
+               f'steady {format_size(result["steady"])}, retained {format_size(result["retained"])}, '
+               f'RSS {format_size(result["rss_before"])} -> {format_size(result["rss_peak"])}', err=True)
+
+
+@cli.command('memory')
+@click.option('-s', '--sizes', default='10000,100000', callback=parse_sizes, show_default=True,
+              help='Comma-separated numbers of networks of the fake wapi, e.g. 10000,100000,1000000.')
+@click.option('-k', '--filter', 'name_filter', help='Only measures operations whose name contains this text.')
+@click.option('--max-growth', type=click.FloatRange(min=1), default=2.0, show_default=True,
+              help='Maximum ratio between the peak memory of streaming operations on the largest and the smallest '
+                   'datasets.')
+@click.option('--rss-limit', type=click.IntRange(min=1), help='Maximum resident memory in MB, e.g. 512.')
+@click.option('-o', '--output', type=click.File('w'), default='-',
+              help='File where json results are written, by default the standard output.')
+def measure_memory(sizes, name_filter, max_growth, rss_limit, output):
+    """
+    Measures peak and steady memory of operations against a fake wapi running in another process. The exit code is 1
+    if the memory of a streaming operation grows with the number of objects or exceeds the RSS limit.
+    """
+    results = memory.run(sizes, name_filter, progress=echo_memory_result)
+    json.dump({'metadata': get_metadata(), 'operations': results}, output, indent=4)
+    output.write('\n')
+    problems = memory.check(results, max_growth, rss_limit * 1024 * 1024 if rss_limit is not None else None)
+    for problem in problems:
+        click.echo(problem, err=True)
+    if problems:
+        raise click.exceptions.Exit(1)
+
+
+if __name__ == '__main__':
+    cli()
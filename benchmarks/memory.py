@@ -0,0 +1,249 @@
+"""
+Measures of the memory used by client operations on large datasets, to check that streaming paths use a memory which
+does not depend on the number of objects.
+
+Two kinds of measures are taken:
+- traced memory: python allocations made during the operation, given by tracemalloc.
+- RSS: resident memory of the process, what a container memory limit applies to. To be meaningful, each measure is
+  taken in a fresh interpreter and the fake wapi runs in another process.
+"""
+import collections.abc
+import contextlib
+import gc
+import multiprocessing
+import os
+import re
+import resource
+import statistics
+import subprocess  # nosec
+import sys
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Sequence
+
+from infoblox import Client
+from infoblox.scripts import cli
+
+# the fake wapi limits searches without paging to 1000 objects, like infoblox, this one returns 1000 networks
+GET_PARAMS = {'comment~': r'^network \d{1,3}$'}
+URL_REGEX = re.compile(r'http://[^\s,]+')
+
+
+def get_rss() -> int:
+    """Returns the resident memory of the current process in bytes."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # not on Linux, we fall back on the peak RSS, in bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class RssSampler:
+    """Samples the resident memory in a background thread and keeps its maximum."""
+
+    def __init__(self, interval: float = 0.01):
+        """:param interval: time in seconds between two samples."""
+        self.interval = interval
+        self.peak = get_rss()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='infoblox-rss-sampler', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, get_rss())
+
+    def __enter__(self) -> 'RssSampler':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.peak = max(self.peak, get_rss())
+
+
+def measure_memory(function: Callable[[], Any], sample_every: int = 1000) -> Dict[str, int]:
+    """
+    Calls the function and returns its memory usage in bytes:
+    - peak: the highest traced memory during the call.
+    - steady: the median traced memory while items are consumed if the function returns an iterator, the memory
+      held by its result otherwise.
+    - retained: the traced memory still allocated once the result is released, e.g. caches or leaks.
+    - rss_before and rss_peak: the resident memory of the process before and during the call.
+    If the function returns an iterator, it is consumed and its items are released one by one.
+    :param function: the operation to measure.
+    :param sample_every: number of items consumed between two samples of the steady memory.
+    """
+    gc.collect()
+    rss_before = get_rss()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        with RssSampler() as sampler:
+            result = function()
+            if isinstance(result, collections.abc.Iterator):
+                samples = []
+                item = None
+                for index, item in enumerate(result, 1):
+                    if index % sample_every == 0:
+                        samples.append(tracemalloc.get_traced_memory()[0] - baseline)
+                # the last item must not be counted as retained
+                del item
+                result = None
+                steady = int(statistics.median(samples)) if samples else 0
+            else:
+                steady = tracemalloc.get_traced_memory()[0] - baseline
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        del result
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {'peak': peak, 'steady': steady, 'retained': max(retained, 0), 'rss_before': rss_before,
+            'rss_peak': sampler.peak}
+
+
+class Operation(NamedTuple):
+    name: str
+    # receives the wapi url and returns the function to measure
+    setup: Callable[[str], Callable[[], Any]]
+    # True if the memory of the operation must not depend on the number of objects
+    streaming: bool
+
+
+OPERATIONS: List[Operation] = []
+
+
+def operation(streaming: bool = True) -> Callable:
+    """Registers an operation, the decorated function receives the wapi url and returns the function to measure."""
+
+    def decorator(setup: Callable[[str], Callable[[], Any]]) -> Callable[[str], Callable[[], Any]]:
+        OPERATIONS.append(Operation(setup.__name__, setup, streaming))
+        return setup
+
+    return decorator
+
+
+def get_network(url: str):
+    return Client(url, user='admin', password='admin').get_object('network')
+
+
+@operation()
+def get_multiple(url: str):
+    """Iteration over all networks page by page."""
+    network = get_network(url)
+    return lambda: network.get_multiple(page_size=1000)
+
+
+@operation()
+def count(url: str):
+    """Count of all networks."""
+    network = get_network(url)
+    return network.count
+
+
+@operation()
+def get(url: str):
+    """Search of 1000 networks, the maximum returned by infoblox without paging."""
+    network = get_network(url)
+    return lambda: network.get(params=GET_PARAMS)
+
+
+@operation()
+def cli_export(url: str):
+    """Export of all networks in ndjson by the CLI."""
+
+    def export():
+        environment = {'IB_URL': url, 'IB_USER': 'admin', 'IB_PASSWORD': 'admin'}
+        with _patch_environment(environment):
+            cli.main(['object', '-n', 'network', 'export', '--output', os.devnull, '--quiet'],
+                     prog_name='ib', standalone_mode=False)
+
+    return export
+
+
+@contextlib.contextmanager
+def _patch_environment(variables: Dict[str, str]) -> Iterator[None]:
+    old_values = {name: os.environ.get(name) for name in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for name, value in old_values.items():
+            if value is None:
+                del os.environ[name]
+            else:
+                os.environ[name] = value
+
+
+@contextlib.contextmanager
+def serve_fake_wapi(size: int) -> Iterator[str]:
+    """Runs a fake wapi with size networks in a child process and yields its url."""
+    process = subprocess.Popen([sys.executable, '-m', 'infoblox.testing', '--port', '0', '--networks', str(size)],
+                               stdout=subprocess.PIPE, universal_newlines=True)  # nosec
+    try:
+        # the url is printed once networks are created
+        match = URL_REGEX.search(process.stdout.readline())
+        if match is None:
+            raise RuntimeError('the fake wapi did not start')
+        yield match.group()
+    finally:
+        process.terminate()
+        process.wait()
+        process.stdout.close()
+
+
+def _measure_operation(name: str, url: str) -> Dict[str, int]:
+    setup = next(item.setup for item in OPERATIONS if item.name == name)
+    return measure_memory(setup(url))
+
+
+def measure_in_fresh_process(name: str, url: str) -> Dict[str, int]:
+    """Measures an operation in a new interpreter, so that its RSS is not affected by previous operations."""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(_measure_operation, (name, url))
+
+
+def run(sizes: Sequence[int] = (10000,), name_filter: str = None, isolated: bool = True,
+        progress: Callable[[dict], None] = None) -> List[dict]:
+    """
+    Measures the memory of operations for each dataset size and returns the results.
+    :param sizes: numbers of networks of the fake wapi.
+    :param name_filter: if given, only operations whose name contains it are measured.
+    :param isolated: if True, each operation is measured in a new interpreter, otherwise in the current process.
+    :param progress: callable receiving each result as soon as it is computed.
+    """
+    operations = [item for item in OPERATIONS if name_filter is None or name_filter in item.name]
+    results = []
+    for size in sizes:
+        with serve_fake_wapi(size) as url:
+            for item in operations:
+                memory = measure_in_fresh_process(item.name, url) if isolated else measure_memory(item.setup(url))
+                result = {'name': item.name, 'size': size, 'streaming': item.streaming, **memory}
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return results
+
+
+def check(results: List[dict], max_growth: float = 2.0, rss_limit: int = None) -> List[str]:
+    """
+    Returns the problems found in results of streaming operations, the list is empty if there are none.
+    :param results: the results returned by the run function.
+    :param max_growth: maximum ratio between the peak memory of the largest dataset and that of the smallest one.
+    :param rss_limit: maximum resident memory in bytes.
+    """
+    problems = []
+    streaming = [result for result in results if result['streaming']]
+    for name in {result['name'] for result in streaming}:
+        measures = sorted((result for result in streaming if result['name'] == name), key=lambda item: item['size'])
+        smallest, largest = measures[0], measures[-1]
+        if largest['size'] > smallest['size'] and largest['peak'] > max_growth * smallest['peak']:
+            problems.append(f'{name}: peak memory grows from {smallest["peak"]} bytes with {smallest["size"]} '
+                            f'objects to {largest["peak"]} bytes with {largest["size"]} objects')
+        for result in measures:
+            if rss_limit is not None and result['rss_peak'] > rss_limit:
+                problems.append(f'{name}: resident memory reaches {result["rss_peak"]} bytes with {result["size"]} '
+                                f'objects, above the limit of {rss_limit} bytes')
+    return sorted(problems)
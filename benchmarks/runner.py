@@ -0,0 +1,134 @@
+"""Execution of benchmarks and comparison of their results."""
+import datetime
+import gc
+import os
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from infoblox import __version__
+from .suite import BENCHMARKS, SMALL_SIZE, Benchmark, Environment
+
+
+def get_id(name: str, params: Dict[str, Any]) -> str:
+    """Returns the identifier of a benchmark case, e.g. "get_multiple[size=10000,page_size=1000]"."""
+    if not params:
+        return name
+    return f'{name}[{",".join(f"{key}={value}" for key, value in params.items())}]'
+
+
+def get_metadata() -> dict:
+    """Returns information about the environment where results are computed."""
+    return {
+        'ib_client': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat()
+    }
+
+
+def measure(function: Callable[[], Any], rounds: int = 5, min_time: float = 0.2) -> Tuple[int, List[float]]:
+    """
+    Returns the number of iterations per round and the duration in seconds of one call for each round. The number of
+    iterations is chosen so that a round lasts at least min_time.
+    """
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    iterations = max(1, int(min_time / elapsed)) if elapsed > 0 else 1000
+    timings = []
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        timings.append((time.perf_counter() - start) / iterations)
+    return iterations, timings
+
+
+def make_result(name: str, params: Dict[str, Any], iterations: int, timings: List[float], items: int) -> dict:
+    median = statistics.median(timings)
+    return {
+        'id': get_id(name, params),
+        'name': name,
+        'params': params,
+        'rounds': len(timings),
+        'iterations': iterations,
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'median': median,
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'items': items,
+        'items_per_second': items / median if median else None
+    }
+
+
+def _run_benchmark(benchmark: Benchmark, env: Environment, rounds: int, min_time: float) -> Iterator[dict]:
+    for params in benchmark.params:
+        function, items = benchmark.setup(env, **params)
+        iterations, timings = measure(function, rounds, min_time)
+        case_params = {'size': env.size, **params} if benchmark.sized else params
+        yield make_result(benchmark.name, case_params, iterations, timings, items)
+
+
+def run(sizes: Sequence[int] = (10000,), name_filter: str = None, rounds: int = 5, min_time: float = 0.2,
+        latency: float = 0.0, progress: Callable[[dict], None] = None) -> dict:
+    """
+    Runs benchmarks and returns their results with information about the environment.
+    :param sizes: numbers of networks of datasets used by benchmarks depending on the number of objects.
+    :param name_filter: if given, only benchmarks whose name contains it are run.
+    :param rounds: number of measures of each benchmark.
+    :param min_time: minimum duration in seconds of a measure, fast functions are called many times per measure.
+    :param latency: time in seconds added by the fake wapi to each request.
+    :param progress: callable receiving each result as soon as it is computed.
+    """
+    benchmarks = [benchmark for benchmark in BENCHMARKS if name_filter is None or name_filter in benchmark.name]
+    results = []
+
+    def add(result: dict) -> None:
+        results.append(result)
+        if progress is not None:
+            progress(result)
+
+    unsized = [benchmark for benchmark in benchmarks if not benchmark.sized]
+    if unsized:
+        with Environment(SMALL_SIZE, latency) as env:
+            for benchmark in unsized:
+                for result in _run_benchmark(benchmark, env, rounds, min_time):
+                    add(result)
+    sized = [benchmark for benchmark in benchmarks if benchmark.sized]
+    for size in sizes if sized else ():
+        # a single dataset is held in memory at a time
+        with Environment(size, latency) as env:
+            for benchmark in sized:
+                for result in _run_benchmark(benchmark, env, rounds, min_time):
+                    add(result)
+
+    return {'metadata': {**get_metadata(), 'latency': latency}, 'benchmarks': results}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> Tuple[List[dict], bool]:
+    """
+    Compares the medians of benchmarks present in two results and returns the comparisons and True if a benchmark
+    is slower than the baseline by more than the threshold.
+    :param baseline: the reference results.
+    :param current: the new results.
+    :param threshold: the relative slowdown considered as a regression, e.g. 0.1 for 10%.
+    """
+    baseline_results = {result['id']: result for result in baseline['benchmarks']}
+    comparisons = []
+    regression = False
+    for result in current['benchmarks']:
+        reference = baseline_results.get(result['id'])
+        if reference is None:
+            continue
+        change = result['median'] / reference['median'] - 1
+        is_regression = change > threshold
+        regression = regression or is_regression
+        comparisons.append({'id': result['id'], 'baseline': reference['median'], 'current': result['median'],
+                            'change': change, 'regression': is_regression})
+    return comparisons, regression
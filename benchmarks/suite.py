@@ -0,0 +1,155 @@
+"""Benchmarks of the client hot paths against a fake wapi holding synthetic networks."""
+import contextlib
+import io
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from infoblox import Client, Resource
+from infoblox.scripts.utils import pretty_echo
+from infoblox.testing import FakeWapi, NETWORK_FIELDS, make_field, make_networks, next_available_ip, start_fake_wapi
+
+# dataset size used by benchmarks which do not depend on the number of objects
+SMALL_SIZE = 100
+# a struct field, so that the validation of large payloads checks nested values
+OPTIONS_FIELD = {
+    'doc': 'An array of DHCP option structs that lists the DHCP options associated with the object.',
+    'is_array': True,
+    'name': 'options',
+    'schema': {
+        'fields': [
+            make_field('name', supports='rwu', doc='The name of the DHCP option.'),
+            make_field('num', 'uint', supports='rwu', doc='The code of the DHCP option.'),
+            make_field('value', supports='rwu', doc='Value of the DHCP option.'),
+            make_field('use_option', 'bool', supports='rwu', doc='Only applies to special options.')
+        ]
+    },
+    'standard_field': False,
+    'supports': 'rwu',
+    'type': ['dhcpoption'],
+    'wapi_primitive': 'struct'
+}
+
+
+class Environment:
+    """A fake wapi with synthetic networks served on loopback and a client connected to it."""
+
+    def __init__(self, size: int, latency: float = 0.0):
+        """
+        :param size: the number of networks.
+        :param latency: time in seconds added by the fake wapi to each request.
+        """
+        self.size = size
+        self.wapi = FakeWapi(latency=latency)
+        self.wapi.add_schema('network', NETWORK_FIELDS + [OPTIONS_FIELD], unique_fields=('network', 'network_view'),
+                             functions={'next_available_ip': next_available_ip})
+        self.wapi.add_objects('network', make_networks(size))
+        self.server = start_fake_wapi(self.wapi)
+        self.client = self.make_client()
+        self.network = self.client.get_object('network')
+
+    def make_client(self) -> Client:
+        return Client(self.server.url, user='admin', password='admin')
+
+    def close(self) -> None:
+        self.client.session.close()
+        self.server.stop()
+
+    def __enter__(self) -> 'Environment':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+# a benchmark returns the timed function and the number of objects it processes per call
+Setup = Callable[..., Tuple[Callable[[], Any], int]]
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Setup
+    params: Tuple[Dict[str, Any], ...]
+    # True if the benchmark is run for each dataset size
+    sized: bool
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(params: Tuple[Dict[str, Any], ...] = ({},), sized: bool = False) -> Callable[[Setup], Setup]:
+    """Registers a benchmark, it receives an Environment and each dict of params as keyword arguments."""
+
+    def decorator(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(setup.__name__, setup, params, sized))
+        return setup
+
+    return decorator
+
+
+@benchmark()
+def client_startup(env: Environment):
+    """Client construction, the api schema load included."""
+    return env.make_client, 1
+
+
+@benchmark(params=({'cached_schema': False}, {'cached_schema': True}))
+def resource_construction(env: Environment, cached_schema: bool):
+    """Resource construction, with the object schema load or from an already loaded schema."""
+    if not cached_schema:
+        return lambda: env.client.get_object('network'), 1
+    schema = env.network.documentation
+    return lambda: Resource(env.client.session, env.server.url, 'network', schema=schema), 1
+
+
+@benchmark()
+def validate_params(env: Environment):
+    """Validation of search parameters."""
+    params = {'network~': '10.0.', 'network_view': 'default', 'comment:': 'network 1', '*Site': 'Paris'}
+    # noinspection PyProtectedMember
+    return lambda: env.network._validate_params(params), 1
+
+
+@benchmark(params=({'options': 10}, {'options': 1000}))
+def create_validation(env: Environment, options: int):
+    """Validation of a creation payload with many struct values."""
+    payload = {
+        'network': '192.168.0.0/24',
+        'comment': 'benchmark',
+        'options': [{'name': 'domain-name', 'num': 15, 'value': f'example{index}.com', 'use_option': True}
+                    for index in range(options)]
+    }
+
+    def validate():
+        errors = env.network.validate(payload)
+        assert not errors, errors
+
+    return validate, options
+
+
+@benchmark(params=({'page_size': 100}, {'page_size': 1000}, {'page_size': 10000}), sized=True)
+def get_multiple(env: Environment, page_size: int):
+    """Iteration over all networks page by page."""
+
+    def iterate():
+        for _ in env.network.get_multiple(page_size=page_size):
+            pass
+
+    return iterate, env.size
+
+
+@benchmark(sized=True)
+def count(env: Environment):
+    """Count of networks matching an extensible attribute."""
+    return lambda: env.network.count(params={'*Site': 'Paris'}), env.size
+
+
+@benchmark(params=({'output_format': 'json'}, {'output_format': 'ndjson'}, {'output_format': 'pretty'}),
+           sized=True)
+def pretty_echo_rendering(env: Environment, output_format: str):
+    """Rendering of networks by the CLI."""
+    networks = list(env.wapi.get_objects('network').values())
+
+    def render():
+        with contextlib.redirect_stdout(io.StringIO()):
+            pretty_echo(networks, output_format=output_format)
+
+    return render, len(networks)
@@ -0,0 +1,32 @@
+"""
+The benchmarks as pytest-benchmark tests, run them with "pytest benchmarks". The dataset size is given by the
+IB_BENCHMARK_SIZE environment variable, by default 10000.
+"""
+import os
+
+import pytest
+
+from .runner import get_id
+from .suite import BENCHMARKS, SMALL_SIZE, Environment
+
+pytest.importorskip('pytest_benchmark')
+
+CASES = [(benchmark, params) for benchmark in BENCHMARKS for params in benchmark.params]
+
+
+@pytest.fixture(scope='module')
+def environments():
+    environments = {}
+    yield environments
+    for env in environments.values():
+        env.close()
+
+
+@pytest.mark.parametrize(('case', 'params'), CASES, ids=[get_id(case.name, params) for case, params in CASES])
+def test_benchmark(benchmark, environments, case, params):
+    size = int(os.getenv('IB_BENCHMARK_SIZE', '10000')) if case.sized else SMALL_SIZE
+    if size not in environments:
+        environments[size] = Environment(size)
+    function, items = case.setup(environments[size], **params)
+    benchmark.extra_info.update({'size': size, 'items': items})
+    benchmark(function)
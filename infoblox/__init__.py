@@ -1,22 +1,42 @@
 __version__ = '0.1.4'
 
+from .allocation import Allocator
+from .batch import Batch, BatchResult
 from .client import Client
 from .exceptions import (
     IBError, BadParameterError, HttpError, IncompatibleApiError, IncompatibleOperationError, MandatoryFieldError,
     FieldError, SearchOnlyFieldError, NotSearchableFieldError, NotFoundError, FileError, ObjectNotFoundError,
-    FieldNotFoundError, FunctionNotFoundError
+    FieldNotFoundError, FunctionNotFoundError, AllocationError
 )
+from .instrumentation import Event, MetricsCollector
+from .loadgen import LoadGenerator, LoadReport
+from .mirror import Mirror, MirrorChanges
+from .prometheus import MetricsServer, generate_metrics, start_metrics_server
+from .query import Placeholder, PreparedQuery
 from .resource import Resource
+from .search import LocalQuery, EqualityIndex
+from .slowlog import SlowRequestLogger
+from .snapshot import Snapshot
+from .tracing import Span, Tracer, InMemoryExporter, OpenTelemetryTracer
+from .validation import PayloadErrors, validate_payloads
 from .scripts.utils import pretty_echo, handle_json_arguments, parse_dict_items, handle_json_file
 
 __all__ = [
     # core classes
-    'Client', 'Resource',
+    'Client', 'Resource', 'Batch', 'BatchResult', 'PayloadErrors', 'validate_payloads', 'Placeholder', 'PreparedQuery',
+    'Allocator', 'LoadGenerator', 'LoadReport',
+
+    # instrumentation
+    'Event', 'MetricsCollector', 'generate_metrics', 'MetricsServer', 'start_metrics_server', 'Span', 'Tracer',
+    'InMemoryExporter', 'OpenTelemetryTracer', 'SlowRequestLogger',
+
+    # local copies of infoblox objects
+    'Mirror', 'MirrorChanges', 'Snapshot', 'LocalQuery', 'EqualityIndex',
 
     # exceptions
     'IBError', 'BadParameterError', 'HttpError', 'IncompatibleApiError', 'IncompatibleOperationError',
     'MandatoryFieldError', 'FieldError', 'SearchOnlyFieldError', 'NotSearchableFieldError', 'NotFoundError',
-    'FileError', 'ObjectNotFoundError', 'FieldNotFoundError', 'FunctionNotFoundError',
+    'FileError', 'ObjectNotFoundError', 'FieldNotFoundError', 'FunctionNotFoundError', 'AllocationError',
 
     # script utilities
     'pretty_echo', 'handle_json_file', 'handle_json_arguments', 'parse_dict_items',
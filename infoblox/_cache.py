@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .exceptions import BadParameterError, HttpError
+from .types import Json
+
+
+class NegativeCache:
+    """
+    Remembers for a short time the object references that infoblox reported as missing, so that repeated
+    lookups of these references fail locally instead of performing useless HTTP requests.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10000):
+        """
+        :param ttl: time in seconds during which a missing reference is remembered.
+        :param max_size: maximum number of references remembered, the oldest ones are dropped first.
+        """
+        if not isinstance(ttl, (int, float)) or ttl <= 0:
+            raise BadParameterError(f'ttl must be a positive number but you provide {ttl}')
+        if not isinstance(max_size, int) or max_size <= 0:
+            raise BadParameterError(f'max_size must be a positive integer but you provide {max_size}')
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        # object reference -> (expiration time, status code, error message)
+        self._entries: 'OrderedDict[str, Tuple[float, int, Json]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, object_ref: str, error: HttpError) -> None:
+        """
+        Remembers that an object reference is missing.
+        :param object_ref: the missing object reference.
+        :param error: the error returned by infoblox when the reference was fetched.
+        """
+        with self._lock:
+            self._entries.pop(object_ref, None)
+            self._entries[object_ref] = (time.monotonic() + self._ttl, error.status_code, error.error_message)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, object_ref: str) -> Optional[HttpError]:
+        """
+        Returns the error to raise if the object reference is known to be missing, None otherwise.
+        :param object_ref: the object reference to look for.
+        """
+        with self._lock:
+            entry = self._entries.get(object_ref)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[object_ref]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return HttpError(entry[1], entry[2])
+
+    def invalidate(self, object_ref: str) -> None:
+        """Forgets an object reference."""
+        with self._lock:
+            self._entries.pop(object_ref, None)
+
+    def invalidate_object(self, name: str) -> None:
+        """
+        Forgets all the references of an infoblox object type.
+        :param name: the name of the infoblox object e.g record:host.
+        """
+        prefix = f'{name}/'
+        with self._lock:
+            for object_ref in [ref for ref in self._entries if ref.startswith(prefix)]:
+                del self._entries[object_ref]
+
+    def clear(self) -> None:
+        """Forgets all references."""
+        with self._lock:
+            self._entries.clear()
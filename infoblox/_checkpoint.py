@@ -0,0 +1,69 @@
+import json
+import os
+from typing import Any
+
+from .exceptions import BadParameterError
+
+
+class PagingCheckpoint:
+    """
+    Persists the progress of a paged query (cursor of the next page, number of objects already emitted and data of
+    the caller) in a json file, so that an interrupted iteration can be resumed.
+    """
+
+    def __init__(self, path: str, name: str, query: dict):
+        """
+        :param path: path of the state file.
+        :param name: name of the queried infoblox object.
+        :param query: query string parameters of the first page.
+        """
+        if not isinstance(path, str):
+            raise BadParameterError(f'checkpoint_file must be a string but you provide {path}')
+        self._path = path
+        self._name = name
+        # we normalize the query like it will be read from the file
+        self._query = json.loads(json.dumps(query, sort_keys=True, default=str))
+        self.page_id: str = None
+        self.emitted = 0
+        self.data: Any = None
+        self._load()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _load(self) -> None:
+        """Loads the state of a previous iteration if it exists."""
+        if not os.path.isfile(self._path):
+            return
+        try:
+            with open(self._path) as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            raise BadParameterError(f'{self._path} is not a valid checkpoint file')
+        if state.get('object') != self._name or state.get('query') != self._query:
+            raise BadParameterError(f'{self._path} is the checkpoint of another query, remove it or use another file')
+        self.page_id = state.get('page_id')
+        self.emitted = state.get('emitted', 0)
+        self.data = state.get('data')
+
+    def save(self, page_id: str, emitted: int, data: Any = None) -> None:
+        """
+        Records the cursor of the next page to fetch, the number of objects emitted before it and json serializable
+        data of the caller. The file is replaced atomically so that it is never left half written.
+        """
+        self.page_id = page_id
+        self.emitted = emitted
+        self.data = data
+        state = {'object': self._name, 'query': self._query, 'page_id': page_id, 'emitted': emitted}
+        if data is not None:
+            state['data'] = data
+        temporary_path = f'{self._path}.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary_path, self._path)
+
+    def remove(self) -> None:
+        """Removes the state file once the iteration is complete."""
+        if os.path.isfile(self._path):
+            os.remove(self._path)
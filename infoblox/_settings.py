@@ -5,3 +5,12 @@ DEFAULT_READ_TIMEOUT = 3.1
 DEFAULT_MAX_RETRIES = 3
 
 DEFAULT_BACKOFF_FACTOR = 0.2
+
+# a value of 0 disables the negative cache of missing object references
+DEFAULT_NEGATIVE_CACHE_TTL = 0.0
+
+# minimum duration in seconds of requests written by the slow request logger
+DEFAULT_SLOW_REQUEST_THRESHOLD = 1.0
+
+# maximum number of characters of request and response bodies written by the slow request logger
+DEFAULT_SLOW_REQUEST_BODY_SIZE = 4096
@@ -0,0 +1,88 @@
+import copy
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    """Represents an in-flight call whose outcome is shared with all the callers waiting for it."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        # number of callers waiting for the outcome, only updated under the SingleFlight lock
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key, so that only one of them is really executed while the
+    others wait for its outcome.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        # number of calls really executed and number of calls which waited for the outcome of another one
+        self.executed = 0
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    @staticmethod
+    def make_key(url: str, params: dict = None) -> Tuple[str, str]:
+        """
+        Returns a hashable key identifying a GET request.
+        :param url: url of the request.
+        :param params: query string parameters of the request.
+        """
+        return url, json.dumps(params or {}, sort_keys=True, default=str)
+
+    def do(self, key: Hashable, function: Callable, *args, **kwargs) -> Any:
+        """
+        Executes function unless a call with the same key is already in progress, in which case we wait for it
+        and return its result (or raise its error).
+        :param key: key identifying the call.
+        :param function: the function to call.
+        :param args: positional arguments of the function.
+        :param kwargs: keyword arguments of the function.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            # waiters get their own copy, this way nobody can alter the result of another caller
+            return copy.deepcopy(call.result)
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+            raise
+
+        with self._lock:
+            # once the call is removed, no caller can join it anymore
+            del self._calls[key]
+            waiters = call.waiters
+        if waiters:
+            # waiters copy a private version of the result, so that the leader can alter its own while they do it
+            call.result = copy.deepcopy(result)
+        call.event.set()
+        return result
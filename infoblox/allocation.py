@@ -0,0 +1,232 @@
+"""Allocation of many ip addresses or networks with few requests."""
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List
+
+from .exceptions import AllocationError, BadParameterError
+from .resource import Resource
+
+# output field of each allocation function
+ALLOCATION_FUNCTIONS = {'next_available_ip': 'ips', 'next_available_network': 'networks'}
+
+
+class _Pool:
+    """Values of an object fetched from infoblox, handed out locally."""
+
+    def __init__(self):
+        self.available = deque()
+        self.reserved = set()
+        # values handed out by infoblox are not reserved on its side, they are excluded from next function calls
+        self.known = set()
+        # time until which the object is considered full because infoblox returned less values than requested
+        self.exhausted_until = 0.0
+        # True while a thread fetches values of the object
+        self.fetching = False
+
+    @property
+    def exhausted(self) -> bool:
+        return time.monotonic() < self.exhausted_until
+
+
+class Allocator:
+    """
+    Allocates ip addresses (or networks) of many networks (or network containers) with few requests. Values are
+    requested in bulk with the "num" argument of next_available_ip / next_available_network functions, calls on many
+    objects are packed in the same wapi "request" call, and values are handed out from a local pool.
+    Infoblox does not reserve values returned by these functions, so the allocator excludes values it already got from
+    next calls, and a value is given to one caller only until it is released or forgotten.
+    """
+
+    def __init__(self, client, function_name: str = 'next_available_ip', arguments: dict = None,
+                 max_num: int = 1000, max_calls_per_request: int = 100, exhausted_ttl: float = 60.0):
+        """
+        :param client: the Client object used to perform requests.
+        :param function_name: next_available_ip or next_available_network.
+        :param arguments: other arguments of the function, e.g. {'cidr': 24} for next_available_network.
+        :param max_num: maximum number of values requested by a function call.
+        :param max_calls_per_request: maximum number of function calls packed in a wapi request call.
+        :param exhausted_ttl: time in seconds during which an object which had not enough free values is not asked
+        again, unless values are released or forgotten.
+        """
+        if function_name not in ALLOCATION_FUNCTIONS:
+            raise BadParameterError(f'function_name must be one of {", ".join(ALLOCATION_FUNCTIONS)} but you provide'
+                                    f' {function_name}')
+        if arguments is not None and not isinstance(arguments, dict):
+            raise BadParameterError(f'arguments must be a dict but you provide {arguments}')
+        for name, value in (('max_num', max_num), ('max_calls_per_request', max_calls_per_request)):
+            if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                raise BadParameterError(f'{name} must be a positive integer but you provide {value}')
+        if not isinstance(exhausted_ttl, (int, float)) or isinstance(exhausted_ttl, bool) or exhausted_ttl < 0:
+            raise BadParameterError(f'exhausted_ttl must be a non negative number but you provide {exhausted_ttl}')
+        arguments = arguments or {}
+        if {'num', 'exclude'} & arguments.keys():
+            raise BadParameterError('num and exclude arguments are handled by the allocator')
+        self._client = client
+        self._function_name = function_name
+        self._output_field = ALLOCATION_FUNCTIONS[function_name]
+        self._arguments = arguments
+        self._max_num = max_num
+        self._max_calls_per_request = max_calls_per_request
+        self._exhausted_ttl = exhausted_ttl
+        self._resources: Dict[str, Resource] = {}
+        self._pools: Dict[str, _Pool] = {}
+        self._lock = threading.Lock()
+        # notified when a thread ends fetching values, the lock is not held during http requests
+        self._fetched = threading.Condition(self._lock)
+
+    def _check_references(self, references: Iterable[str]) -> None:
+        """Checks object references and loads the resources of their object types, the lock must not be held."""
+        for object_ref in references:
+            if object_ref in self._pools:
+                continue
+            if not isinstance(object_ref, str) or '/' not in object_ref:
+                raise BadParameterError(f'{object_ref} is not a valid object reference')
+            name = object_ref.split('/')[0]
+            if name not in self._resources:
+                resource = self._client.get_object(name)
+                # function arguments are checked once per object type
+                resource.get_function_signature(self._function_name).check_arguments({**self._arguments, 'num': 1})
+                self._resources[name] = resource
+
+    def _get_pool(self, object_ref: str) -> _Pool:
+        """Returns the pool of an object reference already checked, the lock must be held."""
+        if object_ref not in self._pools:
+            self._pools[object_ref] = _Pool()
+        return self._pools[object_ref]
+
+    def _make_call(self, object_ref: str, num: int) -> dict:
+        data = {**self._arguments, 'num': num}
+        known = self._pools[object_ref].known
+        if known:
+            data['exclude'] = sorted(known)
+        return {'method': 'POST', 'object': object_ref, 'args': {'_function': self._function_name}, 'data': data}
+
+    def _fetch(self, counts: Dict[str, int]) -> None:
+        """
+        Gets values from infoblox until pools have at least the given number of available values or are exhausted,
+        each round asks at most max_num values per object. The lock must be held, it is released during http requests
+        and the values of an object are fetched by one thread at a time.
+        """
+        while True:
+            needs = {ref: count - len(self._pools[ref].available) for ref, count in counts.items()}
+            needs = {ref: count for ref, count in needs.items() if count > 0 and not self._pools[ref].exhausted}
+            if not needs:
+                return
+            if any(self._pools[ref].fetching for ref in needs):
+                # values received by the other thread may be enough
+                self._fetched.wait()
+                continue
+            chunk = list(needs)[:self._max_calls_per_request]
+            calls = [self._make_call(ref, min(needs[ref], self._max_num)) for ref in chunk]
+            for ref in chunk:
+                self._pools[ref].fetching = True
+            self._lock.release()
+            try:
+                results = self._client.custom_request(calls)
+            finally:
+                self._lock.acquire()
+                for ref in chunk:
+                    self._pools[ref].fetching = False
+                self._fetched.notify_all()
+            if not isinstance(results, list) or len(results) != len(calls):
+                raise AllocationError(f'unexpected response to the request call: {results}')
+            for ref, call, result in zip(chunk, calls, results):
+                pool = self._pools[ref]
+                received = result.get(self._output_field, []) if isinstance(result, dict) else []
+                values = [value for value in received if value not in pool.known]
+                pool.known.update(values)
+                pool.available.extend(values)
+                # without new values, asking again would loop forever
+                if len(received) < call['data']['num'] or not values:
+                    pool.exhausted_until = time.monotonic() + self._exhausted_ttl
+
+    def prefetch(self, counts: Dict[str, int]) -> None:
+        """
+        Fills local pools so that they have at least the given number of available values.
+        :param counts: number of values by object reference.
+        """
+        self._check_counts(counts)
+        self._check_references(counts)
+        with self._lock:
+            for ref in counts:
+                self._get_pool(ref)
+            self._fetch(counts)
+
+    @staticmethod
+    def _check_counts(counts: Dict[str, int]) -> None:
+        if not isinstance(counts, dict):
+            raise BadParameterError(f'counts must be a dict but you provide {counts}')
+        for count in counts.values():
+            if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+                raise BadParameterError(f'a count must be a non negative integer but you provide {count}')
+
+    def reserve_many(self, counts: Dict[str, int]) -> Dict[str, List[str]]:
+        """
+        Reserves values of many objects at once and returns them by object reference. Nothing is reserved if an
+        object has not enough available values.
+        :param counts: number of values by object reference.
+        """
+        self._check_counts(counts)
+        self._check_references(counts)
+        with self._lock:
+            pools = {ref: self._get_pool(ref) for ref in counts}
+            self._fetch(counts)
+            missing = [ref for ref, count in counts.items() if len(pools[ref].available) < count]
+            if missing:
+                raise AllocationError(f'not enough available values for: {", ".join(missing)}')
+            reserved = {}
+            for ref, count in counts.items():
+                pool = pools[ref]
+                values = [pool.available.popleft() for _ in range(count)]
+                pool.reserved.update(values)
+                reserved[ref] = values
+            return reserved
+
+    def reserve(self, object_ref: str, count: int = 1) -> List[str]:
+        """
+        Reserves values of an object and returns them.
+        :param object_ref: reference of the network or network container.
+        :param count: number of values to reserve.
+        """
+        return self.reserve_many({object_ref: count})[object_ref]
+
+    def _get_reserving_pool(self, object_ref: str, values: List[str]) -> _Pool:
+        """Returns the pool of an object after checking that values are reserved, the lock must be held."""
+        pool = self._pools.get(object_ref)
+        unknown = [value for value in values if pool is None or value not in pool.reserved]
+        if unknown:
+            raise BadParameterError(f'values not reserved for {object_ref}: {", ".join(map(str, unknown))}')
+        return pool
+
+    def release(self, object_ref: str, values: List[str]) -> None:
+        """
+        Gives back reserved values, they are handed out again by next reservations.
+        :param object_ref: reference of the network or network container.
+        :param values: reserved values which are not used.
+        """
+        with self._lock:
+            pool = self._get_reserving_pool(object_ref, values)
+            pool.reserved.difference_update(values)
+            # released values are handed out first
+            pool.available.extendleft(reversed(values))
+            pool.exhausted_until = 0.0
+
+    def forget(self, object_ref: str, values: List[str]) -> None:
+        """
+        Removes reserved values from the allocator once they are used in infoblox or no longer needed. They are not
+        excluded from next function calls anymore, infoblox does not return values which are used.
+        :param object_ref: reference of the network or network container.
+        :param values: reserved values.
+        """
+        with self._lock:
+            pool = self._get_reserving_pool(object_ref, values)
+            pool.reserved.difference_update(values)
+            pool.known.difference_update(values)
+            pool.exhausted_until = 0.0
+
+    def available(self, object_ref: str) -> int:
+        """Returns the number of values of an object held in the local pool and not reserved."""
+        with self._lock:
+            pool = self._pools.get(object_ref)
+            return len(pool.available) if pool is not None else 0
@@ -0,0 +1,159 @@
+"""Execution of many object operations with a single client."""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Tuple
+
+import requests
+
+from .exceptions import BadParameterError, HttpError, IBError, MandatoryFieldError
+from .resource import Resource
+
+OPERATIONS = ('get', 'create', 'update', 'delete', 'func-call')
+SCHEDULE_AND_APPROVAL_KEYS = (
+    'schedule_time', 'schedule_now', 'schedule_predecessor_task', 'schedule_warn_level', 'approval_comment',
+    'approval_query_mode', 'approval_ticket_number'
+)
+OPERATION_KEYS = {
+    'get': ('object', 'ref', 'params', 'return_fields', 'return_fields_plus', 'proxy_search'),
+    'create': ('object', 'data', 'return_fields', 'return_fields_plus', *SCHEDULE_AND_APPROVAL_KEYS),
+    'update': ('object', 'ref', 'data', 'return_fields', 'return_fields_plus', *SCHEDULE_AND_APPROVAL_KEYS),
+    'delete': ('object', 'ref', *SCHEDULE_AND_APPROVAL_KEYS),
+    'func-call': ('object', 'ref', 'function', 'arguments'),
+}
+
+
+class BatchResult(NamedTuple):
+    """Outcome of a batch operation."""
+    line: int
+    result: Any = None
+    error: Any = None
+    status_code: int = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        """Returns the result as a json serializable dict."""
+        if self.ok:
+            return {'line': self.line, 'ok': True, 'result': self.result}
+        data = {'line': self.line, 'ok': False, 'error': self.error}
+        if self.status_code is not None:
+            data['status_code'] = self.status_code
+        return data
+
+
+class Batch:
+    """
+    Executes object operations (get, create, update, delete and func-call) concurrently with one client. Resources
+    are created once per object type, so the schema of each object is downloaded only once.
+
+    An operation is a dict with an "op" key and keys depending on the operation:
+    - get: object, ref, params, return_fields, return_fields_plus, proxy_search
+    - create: object, data, return_fields, return_fields_plus and schedule / approval keys
+    - update: ref, data, return_fields, return_fields_plus and schedule / approval keys
+    - delete: ref and schedule / approval keys
+    - func-call: object, ref, function, arguments
+    The object name can be omitted when it can be deduced from the reference.
+    """
+
+    def __init__(self, client, concurrency: int = 4):
+        """
+        :param client: the Client object used to perform operations.
+        :param concurrency: maximum number of operations running at the same time.
+        """
+        if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+            raise BadParameterError(f'concurrency must be a positive integer but you provide {concurrency}')
+        self._client = client
+        self._concurrency = concurrency
+        self._resources: Dict[str, Resource] = {}
+        # one lock per object name, so that the schema load of an object does not delay operations on other objects
+        self._resource_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    def _get_resource(self, name: str) -> Resource:
+        with self._lock:
+            lock = self._resource_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self._resources:
+                self._resources[name] = self._client.get_object(name)
+            return self._resources[name]
+
+    @staticmethod
+    def _check_operation(operation: dict) -> Tuple[str, str]:
+        """Checks the operation structure and returns the operation type and the object name."""
+        if not isinstance(operation, dict):
+            raise BadParameterError(f'an operation must be a json object but you provide {operation}')
+        op = operation.get('op')
+        if op not in OPERATIONS:
+            raise BadParameterError(f'op must be one of {", ".join(OPERATIONS)} but you provide {op}')
+        unknown_keys = set(operation) - {'op', *OPERATION_KEYS[op]}
+        if unknown_keys:
+            raise BadParameterError(f'unknown keys for {op} operation: {", ".join(sorted(unknown_keys))}')
+        for key in ('data', 'arguments', 'params'):
+            if operation.get(key) is not None and not isinstance(operation[key], dict):
+                raise BadParameterError(f'{key} must be a json object but you provide {operation[key]}')
+
+        name = operation.get('object')
+        object_ref = operation.get('ref')
+        if name is None and isinstance(object_ref, str):
+            name = object_ref.split('/')[0]
+        if name is None:
+            raise MandatoryFieldError(f'object is missing for {op} operation')
+        return op, name
+
+    def execute(self, operation: dict) -> Any:
+        """
+        Executes an operation and returns the infoblox response.
+        :param operation: the operation to execute.
+        """
+        op, name = self._check_operation(operation)
+        resource = self._get_resource(name)
+        options = {key: operation[key] for key in SCHEDULE_AND_APPROVAL_KEYS if key in operation}
+        if op == 'get':
+            return resource.get(operation.get('ref'), operation.get('params'), operation.get('return_fields'),
+                                operation.get('return_fields_plus'), operation.get('proxy_search'))
+        if op == 'create':
+            return resource.create(return_fields=operation.get('return_fields'),
+                                   return_fields_plus=operation.get('return_fields_plus'), **options,
+                                   **operation.get('data') or {})
+        if op == 'update':
+            return resource.update(operation.get('ref'), return_fields=operation.get('return_fields'),
+                                   return_fields_plus=operation.get('return_fields_plus'), **options,
+                                   **operation.get('data') or {})
+        if op == 'delete':
+            return resource.delete(operation.get('ref'), **options)
+        return resource.func_call(operation.get('ref'), operation.get('function'), **operation.get('arguments') or {})
+
+    def _run_operation(self, line: int, operation: Any) -> BatchResult:
+        if isinstance(operation, Exception):
+            # the operation could not be read, the error is reported at its line
+            return BatchResult(line, error=str(operation))
+        try:
+            return BatchResult(line, result=self.execute(operation))
+        except HttpError as e:
+            return BatchResult(line, error=e.error_message, status_code=e.status_code)
+        except (IBError, TypeError, requests.RequestException) as e:
+            return BatchResult(line, error=str(e))
+
+    def run(self, operations: Iterable[Tuple[int, Any]]) -> Iterator[BatchResult]:
+        """
+        Executes operations concurrently and yields their results in input order. Operations are read lazily, so
+        only a few of them are held in memory at the same time. A failed operation does not stop the batch.
+        :param operations: iterable of (line number, operation) tuples. An exception can be given instead of an
+        operation to report an input error at this line.
+        """
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+            for line, operation in operations:
+                pending.append(executor.submit(self._run_operation, line, operation))
+                # we bound the number of waiting results, a slow operation must not make memory grow indefinitely
+                while len(pending) > 2 * self._concurrency:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
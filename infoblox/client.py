@@ -1,7 +1,7 @@
 import os
 import re
 import warnings
-from typing import List
+from typing import Callable, List
 from typing import Union, Tuple
 from urllib.parse import urlparse
 
@@ -11,9 +11,17 @@ from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 from ._helpers import handle_http_error, url_join
-from ._settings import DEFAULT_CONNECT_TIMEOUT, DEFAULT_MAX_RETRIES, DEFAULT_READ_TIMEOUT, DEFAULT_BACKOFF_FACTOR
+from ._cache import NegativeCache
+from ._settings import (
+    DEFAULT_CONNECT_TIMEOUT, DEFAULT_MAX_RETRIES, DEFAULT_READ_TIMEOUT, DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_NEGATIVE_CACHE_TTL, DEFAULT_SLOW_REQUEST_THRESHOLD
+)
+from ._singleflight import SingleFlight
 from .exceptions import IncompatibleApiError, BadParameterError, ObjectNotFoundError, FileError
+from .instrumentation import Event, Instrumentation
 from .resource import Resource
+from .slowlog import SlowRequestLogger
+from .tracing import Tracer
 from .types import Schema, Json
 
 URL_PATH_REGEX = re.compile(r'/wapi/v\d\.\d+')
@@ -22,19 +30,48 @@ URL_PATH_REGEX = re.compile(r'/wapi/v\d\.\d+')
 class Client:
 
     def __init__(self, url: str = None, cert: Union[str, Tuple[str, str]] = None, dot_env_path: str = None,
-                 user: str = None, password: str = None):
+                 user: str = None, password: str = None, negative_cache_ttl: float = None,
+                 hooks: List[Callable[[Event], None]] = None, tracer: Tracer = None,
+                 slow_request_logger: SlowRequestLogger = None):
         self._handle_dot_env_file(dot_env_path)
         self._user = user if user is not None else os.getenv('IB_USER')
         self._password = password if password is not None else os.getenv('IB_PASSWORD')
         self._timeout = (float(os.getenv('IB_REQUEST_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
                          float(os.getenv('IB_REQUEST_READ_TIMOUT', DEFAULT_READ_TIMEOUT)))
         self._session = requests.Session()
-        self._configure_request_retries()
-        self._set_session_credentials_and_certificate(cert)
-        self._url: str = self._get_start_url(url)
-        self._schema: Schema = None
-        # we load the api schema
-        self._load_schema()
+        # hooks are registered before the api schema is loaded, so that its request is reported
+        self._instrumentation = Instrumentation(self._session)
+        for hook in hooks or []:
+            self.add_hook(hook)
+        if tracer is not None:
+            self.set_tracer(tracer)
+        self._slow_request_logger: SlowRequestLogger = None
+        self._owns_slow_request_logger = False
+        if slow_request_logger is not None:
+            self.set_slow_request_logger(slow_request_logger)
+        else:
+            self.set_slow_request_logger(self._get_slow_request_logger())
+            # the logger configured by environment variables may hold a file, the client closes it
+            self._owns_slow_request_logger = self._slow_request_logger is not None
+        try:
+            # shared by all resources to coalesce concurrent identical GET requests
+            self._single_flight = SingleFlight()
+            self._negative_cache: NegativeCache = self._get_negative_cache(negative_cache_ttl)
+            self._configure_request_retries()
+            self._set_session_credentials_and_certificate(cert)
+            self._url: str = self._get_start_url(url)
+            self._schema: Schema = None
+            # we load the api schema
+            self._load_schema()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
 
     @property
     def api_schema(self) -> Schema:
@@ -48,6 +85,70 @@ class Client:
     def session(self):
         return self._session
 
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def negative_cache(self) -> NegativeCache:
+        return self._negative_cache
+
+    @property
+    def single_flight(self) -> SingleFlight:
+        return self._single_flight
+
+    @property
+    def slow_request_logger(self) -> SlowRequestLogger:
+        return self._slow_request_logger
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        return self._instrumentation
+
+    def set_tracer(self, tracer: Tracer = None) -> None:
+        """
+        Sets the tracer creating spans for operations of the client and its resources, with children spans for
+        validations, HTTP requests, get_multiple pages and json decoding.
+        :param tracer: the tracer, e.g. Tracer(InMemoryExporter()) or OpenTelemetryTracer(). None disables tracing.
+        """
+        self._instrumentation.set_tracer(tracer)
+
+    def set_slow_request_logger(self, slow_request_logger: SlowRequestLogger = None) -> None:
+        """
+        Sets the logger of HTTP requests slower than its threshold, replacing the current one. A logger given by the
+        caller is not closed by the client.
+        :param slow_request_logger: the logger, None disables the log of slow requests.
+        """
+        hooks = self._session.hooks['response']
+        if self._slow_request_logger is not None:
+            hooks.remove(self._slow_request_logger)
+            if self._owns_slow_request_logger:
+                self._slow_request_logger.close()
+        if slow_request_logger is not None:
+            hooks.append(slow_request_logger)
+        self._slow_request_logger = slow_request_logger
+        self._owns_slow_request_logger = False
+
+    def close(self) -> None:
+        """Closes the http session and the file of the slow request logger configured by environment variables."""
+        self.set_slow_request_logger(None)
+        self._session.close()
+
+    def add_hook(self, hook: Callable[[Event], None]) -> None:
+        """
+        Registers a callable receiving an Event for each HTTP request, validation, page and json decoding performed
+        by the client and its resources, e.g. a MetricsCollector.
+        :param hook: the callable to register.
+        """
+        self._instrumentation.add_callback(hook)
+
+    def remove_hook(self, hook: Callable[[Event], None]) -> None:
+        """
+        Unregisters a callable previously registered with add_hook.
+        :param hook: the callable to unregister.
+        """
+        self._instrumentation.remove_callback(hook)
+
     @staticmethod
     def _handle_dot_env_file(dot_env_path: str = None) -> None:
         """Checks .env file presence and loads it."""
@@ -59,6 +160,25 @@ class Client:
             raise FileError(f'{dot_env_path} is not a valid path')
         load_dotenv(dotenv_path=dot_env_path)
 
+    @staticmethod
+    def _get_slow_request_logger() -> SlowRequestLogger:
+        """Returns the slow request logger configured by environment variables or None if it is not configured."""
+        threshold = os.getenv('IB_SLOW_REQUEST_THRESHOLD')
+        if threshold is None:
+            return None
+        return SlowRequestLogger(float(threshold or DEFAULT_SLOW_REQUEST_THRESHOLD),
+                                 output=os.getenv('IB_SLOW_REQUEST_LOG'),
+                                 sample_rate=float(os.getenv('IB_SLOW_REQUEST_SAMPLE_RATE', 0.0)))
+
+    @staticmethod
+    def _get_negative_cache(ttl: float = None) -> NegativeCache:
+        """Returns the cache of missing object references or None if it is disabled."""
+        if ttl is None:
+            ttl = float(os.getenv('IB_NEGATIVE_CACHE_TTL', DEFAULT_NEGATIVE_CACHE_TTL))
+        if ttl == 0:
+            return None
+        return NegativeCache(ttl)
+
     def _configure_request_retries(self) -> None:
         """Configure requests retries mechanism."""
         max_retries = int(os.getenv('IB_REQUEST_MAX_RETRIES', DEFAULT_MAX_RETRIES))
@@ -124,7 +244,10 @@ class Client:
         """Gets a resource object given an object name supported by wapi."""
         if name not in self.available_objects:
             raise ObjectNotFoundError(f'{name} is not a valid infoblox object')
-        return Resource(self._session, self._url, name)
+        # the creation loads the object schema
+        with self._instrumentation.measure('operation', name, 'get_object'):
+            return Resource(self._session, self._url, name, single_flight=self._single_flight,
+                            negative_cache=self._negative_cache, instrumentation=self._instrumentation)
 
     def custom_request(self, data: Json = None) -> Json:
         """
@@ -133,6 +256,7 @@ class Client:
         """
         if data is None:
             raise BadParameterError('data must not be empty')
-        response = self._session.post(url_join(self._url, 'request'), json=data, timeout=self._timeout)
-        handle_http_error(response)
-        return response.json()
+        with self._instrumentation.measure('operation', 'request', 'custom_request'):
+            response = self._session.post(url_join(self._url, 'request'), json=data, timeout=self._timeout)
+            handle_http_error(response)
+            return response.json()
@@ -17,6 +17,10 @@ class IncompatibleApiError(IBError):
     pass
 
 
+class AllocationError(IBError):
+    pass
+
+
 class IncompatibleOperationError(BadParameterError):
     pass
 
@@ -0,0 +1,90 @@
+"""Object functions described once and called like python methods."""
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Tuple
+
+from .exceptions import BadParameterError
+from .types import Json, Schema
+
+
+class FunctionSignature(NamedTuple):
+    """Immutable description of an object function, computed once per resource."""
+    name: str
+    doc: str
+    # input field information by name
+    input_fields: Mapping[str, Schema]
+    output_fields: Tuple[str, ...]
+    # value checker of each input field by name
+    validators: Mapping[str, Callable[[Any], None]]
+
+    def check_arguments(self, arguments: Dict[str, Any]) -> None:
+        """
+        Checks that arguments are known input fields of the function with correct values.
+        :param arguments: function input parameters.
+        """
+        for key, value in arguments.items():
+            validator = self.validators.get(key)
+            if validator is None:
+                raise BadParameterError(f'{key} is not a valid argument for {self.name} function')
+            validator(value)
+
+
+def make_function_signature(function_info: Schema,
+                            check_field_value: Callable[[str, Any, Schema], None]) -> FunctionSignature:
+    """
+    Builds the signature of a function.
+    :param function_info: function information given by Resource.get_function_information.
+    :param check_field_value: callable checking a field value given the field name, the value and the field
+    information.
+    """
+    input_fields = {field['name']: field for field in function_info['schema']['input_fields']}
+
+    def make_validator(name: str, field_info: Schema) -> Callable[[Any], None]:
+        return lambda value: check_field_value(name, value, field_info)
+
+    return FunctionSignature(
+        name=function_info['name'],
+        doc=function_info.get('doc', ''),
+        input_fields=MappingProxyType(input_fields),
+        output_fields=tuple(field['name'] for field in function_info['schema']['output_fields']),
+        validators=MappingProxyType({name: make_validator(name, info) for name, info in input_fields.items()})
+    )
+
+
+class FunctionsApi:
+    """
+    Exposes the functions of an object as attributes, e.g. resource.functions_api.next_available_ip(ref, num=5).
+    Normally you don't instantiate this class directly, but you use the resource property "functions_api".
+    """
+
+    def __init__(self, resource):
+        """
+        :param resource: the Resource object whose functions are called.
+        """
+        self._resource = resource
+        self._stubs: Dict[str, Callable[..., Json]] = {}
+
+    def _make_stub(self, name: str) -> Callable[..., Json]:
+        resource = self._resource
+        signature = resource.get_function_signature(name)
+
+        def stub(object_ref: str = None, **kwargs) -> Json:
+            return resource.func_call(object_ref, name, **kwargs)
+
+        stub.__name__ = stub.__qualname__ = name
+        arguments = ', '.join(signature.input_fields)
+        stub.__doc__ = f'{signature.doc}\nArguments: {arguments or "none"}.'
+        return stub
+
+    def __getattr__(self, name: str) -> Callable[..., Json]:
+        # only called for attributes which are not found normally, so private ones are never functions
+        if name.startswith('_') or name not in self._resource.functions:
+            raise AttributeError(f'{name} is an unknown function for {self._resource.name} object')
+        if name not in self._stubs:
+            self._stubs[name] = self._make_stub(name)
+        return self._stubs[name]
+
+    def __dir__(self) -> List[str]:
+        return list(self._resource.functions)
+
+    def __repr__(self) -> str:
+        return f'<FunctionsApi of {self._resource.name}: {", ".join(self._resource.functions)}>'
@@ -0,0 +1,337 @@
+"""Hooks reporting what happens inside the client: operations, HTTP requests, validation, pages and json decoding."""
+import bisect
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+
+from .tracing import Span, Tracer
+
+# path of an url after the wapi version, e.g. "network/ZG5...:10.1.0.0/16/default"
+WAPI_PATH_REGEX = re.compile(r'^.*?/wapi/v\d\.\d+/?')
+HTTP_OPERATIONS = {'GET': 'get', 'POST': 'create', 'PUT': 'update', 'DELETE': 'delete'}
+# upper bounds in seconds of latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Event(NamedTuple):
+    """
+    Something measured inside the client. The kind is one of:
+    - operation: a call of a Resource or Client method like get or create, with attribute results for the number of
+    objects returned.
+    - request: an HTTP request, with attributes method, path, status_code, request_bytes, response_bytes and retries.
+    - validation: the check of parameters or payload before a request.
+    - page: a page fetched by get_multiple, with attribute items.
+    - retry: a page fetched again by get_multiple after an error, with attribute error.
+    - decode: the json decoding of a response, with attribute bytes.
+    Measured blocks which raised an exception have an attribute error.
+    """
+    kind: str
+    object_name: str
+    operation: str
+    duration: float
+    attributes: Dict[str, Any]
+
+
+class _NullMeasure:
+    """Context manager used when instrumentation is disabled."""
+    span = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NULL_MEASURE = _NullMeasure()
+
+
+class _Measure:
+    def __init__(self, instrumentation: 'Instrumentation', kind: str, object_name: str, operation: str,
+                 attributes: Dict[str, Any], activate: bool = True, parent: '_Measure' = None):
+        self._instrumentation = instrumentation
+        self._event = (kind, object_name, operation)
+        self.attributes = attributes
+        self._activate = activate
+        self._parent = parent
+        self._start = 0.0
+        self.span: Span = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Adds an attribute to the event and the span."""
+        self.attributes[key] = value
+
+    def __enter__(self):
+        tracer = self._instrumentation.tracer
+        if tracer is not None:
+            kind, object_name, operation = self._event
+            name = f'infoblox.{operation}' if kind == 'operation' else f'infoblox.{kind}'
+            parent = self._parent.span if self._parent is not None else None
+            self.span = tracer.start_span(name, {'infoblox.object': object_name, 'infoblox.operation': operation},
+                                          parent)
+            if self._activate:
+                tracer.activate(self.span)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        duration = time.perf_counter() - self._start
+        # a generator closed before its end is not an error
+        if exc_value is not None and not isinstance(exc_value, GeneratorExit):
+            self.attributes['error'] = str(exc_value)
+        else:
+            exc_value = None
+        kind, object_name, operation = self._event
+        if self.span is not None:
+            tracer = self._instrumentation.tracer
+            for key, value in self.attributes.items():
+                if key != 'error':
+                    self.span.set_attribute(f'infoblox.{key}', value)
+            if self._activate:
+                tracer.deactivate(self.span)
+            tracer.end_span(self.span, error=exc_value)
+        self._instrumentation.emit(kind, object_name, operation, duration, **self.attributes)
+
+
+def get_object_and_operation(method: str, url: str) -> Tuple[str, str]:
+    """
+    Deduces the infoblox object name and the operation of an HTTP request.
+    :param method: the HTTP method.
+    :param url: the request url.
+    """
+    parts = urlparse(url)
+    path = WAPI_PATH_REGEX.sub('', parts.path)
+    object_name = path.split('/')[0]
+    query = dict(parse_qsl(parts.query))
+    if '_schema' in query:
+        operation = 'schema'
+    elif '_function' in query:
+        operation = 'func_call'
+    elif object_name == 'request':
+        operation = 'request'
+    else:
+        operation = HTTP_OPERATIONS.get(method, method.lower())
+    return object_name, operation
+
+
+def get_retries(response: requests.Response) -> int:
+    """Returns the number of retries made by urllib3 before getting the response."""
+    retries = getattr(response.raw, 'retries', None)
+    return len(getattr(retries, 'history', ()) or ())
+
+
+class Instrumentation:
+    """
+    Dispatches events measured inside the client to callbacks and to a tracer. Without callbacks and tracer nothing
+    is measured, so it costs almost nothing when it is not used.
+    """
+
+    def __init__(self, session: requests.Session = None):
+        """
+        :param session: the session whose HTTP requests are reported.
+        """
+        self._session = session
+        self._callbacks: List[Callable[[Event], None]] = []
+        self._lock = threading.Lock()
+        self.tracer: Optional[Tracer] = None
+        self.enabled = False
+
+    @property
+    def callbacks(self) -> List[Callable[[Event], None]]:
+        return list(self._callbacks)
+
+    def _update_enabled(self) -> None:
+        """Hooks the session when there is something to report to, unhooks it otherwise."""
+        enabled = bool(self._callbacks) or self.tracer is not None
+        if enabled != self.enabled and self._session is not None:
+            if enabled:
+                self._session.hooks['response'].append(self._response_hook)
+            else:
+                self._session.hooks['response'].remove(self._response_hook)
+        self.enabled = enabled
+
+    def set_tracer(self, tracer: Optional[Tracer]) -> None:
+        """
+        Sets the tracer creating spans for operations, validations, HTTP requests, pages and json decoding.
+        :param tracer: the tracer, None disables tracing.
+        """
+        with self._lock:
+            self.tracer = tracer
+            self._update_enabled()
+
+    def add_callback(self, callback: Callable[[Event], None]) -> None:
+        """
+        Registers a callable receiving each Event. It is called in the thread which performs the operation.
+        :param callback: the callable to register.
+        """
+        with self._lock:
+            # the list is replaced, so emit can iterate on it without lock
+            self._callbacks = [*self._callbacks, callback]
+            self._update_enabled()
+
+    def remove_callback(self, callback: Callable[[Event], None]) -> None:
+        """
+        Unregisters a callable, when there are no more callbacks and no tracer the session is no longer hooked.
+        :param callback: the callable to unregister.
+        """
+        with self._lock:
+            self._callbacks = [item for item in self._callbacks if item != callback]
+            self._update_enabled()
+
+    def emit(self, kind: str, object_name: str, operation: str, duration: float, **attributes: Any) -> None:
+        """Sends an event to callbacks, retries are also recorded as events of the active span."""
+        tracer = self.tracer
+        if kind == 'retry' and tracer is not None and tracer.current_span is not None:
+            tracer.current_span.add_event('infoblox.retry', attributes)
+        event = Event(kind, object_name, operation, duration, attributes)
+        for callback in self._callbacks:
+            callback(event)
+
+    def measure(self, kind: str, object_name: str, operation: str, activate: bool = True, parent: _Measure = None,
+                **attributes: Any):
+        """
+        Returns a context manager emitting an event with the duration of its block and tracing it in a span.
+        Attributes can be added inside the block with its set method.
+        :param activate: if False, the span is not the parent of spans started in the block. It must be False when
+        the block yields, e.g. in a generator.
+        :param parent: measure whose span is the parent, by default the active span of the current thread.
+        """
+        if not self.enabled:
+            return _NULL_MEASURE
+        return _Measure(self, kind, object_name, operation, attributes, activate, parent)
+
+    def _response_hook(self, response: requests.Response, **kwargs) -> requests.Response:
+        """Session hook reporting HTTP requests."""
+        if not self.enabled:
+            return response
+        start = time.perf_counter()
+        # the body is read by requests just after hooks, we read it here to include it in the duration
+        response_bytes = len(response.content) if not kwargs.get('stream') else 0
+        duration = response.elapsed.total_seconds() + time.perf_counter() - start
+        request = response.request
+        body = request.body or b''
+        object_name, operation = get_object_and_operation(request.method, request.url)
+        attributes = {'method': request.method, 'path': urlparse(request.url).path,
+                      'status_code': response.status_code, 'request_bytes': len(body),
+                      'response_bytes': response_bytes, 'retries': get_retries(response)}
+        tracer = self.tracer
+        if tracer is not None:
+            end_time = time.time()
+            span_attributes = {f'http.{key}': value for key, value in attributes.items()}
+            tracer.record_span('infoblox.http', end_time - duration, end_time,
+                               {'infoblox.object': object_name, 'infoblox.operation': operation, **span_attributes})
+        self.emit('request', object_name, operation, duration, **attributes)
+        return response
+
+
+class Histogram:
+    """Distribution of observed values in buckets, with their count and sum."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # the last count is for values greater than the last bucket
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def copy(self) -> 'Histogram':
+        histogram = Histogram(self.buckets)
+        histogram.bucket_counts = list(self.bucket_counts)
+        histogram.count, histogram.sum, histogram.max = self.count, self.sum, self.max
+        return histogram
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'max': self.max,
+            'buckets': {str(bound): count for bound, count in zip((*self.buckets, '+Inf'), self.bucket_counts)}
+        }
+
+
+class MetricsCollector:
+    """
+    Built-in callback aggregating events by object and operation: latency histograms of requests, validations and
+    json decoding, request and response sizes, status codes, retries and pages.
+    Usage: collector = MetricsCollector(); client.add_hook(collector); ...; collector.snapshot()
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param buckets: upper bounds in seconds of latency histogram buckets.
+        """
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # histograms by (event kind, object name, operation)
+            self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+            # counters by (counter name, object name, operation)
+            self._counters: Dict[Tuple[str, str, str], int] = {}
+            # number of responses by (object name, operation, status code)
+            self._status_codes: Dict[Tuple[str, str, int], int] = {}
+
+    def _increment(self, name: str, object_name: str, operation: str, value: int = 1) -> None:
+        key = (name, object_name, operation)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def __call__(self, event: Event) -> None:
+        key = (event.kind, event.object_name, event.operation)
+        attributes = event.attributes
+        with self._lock:
+            if event.kind != 'retry':
+                if key not in self._histograms:
+                    self._histograms[key] = Histogram(self._buckets)
+                self._histograms[key].observe(event.duration)
+            if event.kind == 'request':
+                for name in ('request_bytes', 'response_bytes', 'retries'):
+                    self._increment(name, event.object_name, event.operation, attributes.get(name, 0))
+                status_key = (event.object_name, event.operation, attributes.get('status_code'))
+                self._status_codes[status_key] = self._status_codes.get(status_key, 0) + 1
+            elif event.kind == 'page' and 'error' not in attributes:
+                self._increment('pages', event.object_name, event.operation)
+                self._increment('items', event.object_name, event.operation, attributes.get('items', 0))
+            elif event.kind == 'retry':
+                self._increment('retries', event.object_name, event.operation)
+
+    def collect(self) -> Tuple[Dict[Tuple[str, str, str], Histogram], Dict[Tuple[str, str, str], int],
+                               Dict[Tuple[str, str, int], int]]:
+        """
+        Returns copies of histograms by (event kind, object name, operation), counters by (counter name, object name,
+        operation) and response counts by (object name, operation, status code).
+        """
+        with self._lock:
+            return ({key: histogram.copy() for key, histogram in self._histograms.items()}, dict(self._counters),
+                    dict(self._status_codes))
+
+    def snapshot(self) -> dict:
+        """Returns a json serializable copy of the metrics, grouped by object and operation."""
+        data: Dict[str, Dict[str, dict]] = {}
+
+        def get_entry(object_name: str, operation: str) -> dict:
+            return data.setdefault(object_name or '_', {}).setdefault(operation, {})
+
+        with self._lock:
+            for (kind, object_name, operation), histogram in self._histograms.items():
+                get_entry(object_name, operation)[f'{kind}_seconds'] = histogram.to_dict()
+            for (name, object_name, operation), value in self._counters.items():
+                get_entry(object_name, operation)[name] = value
+            for (object_name, operation, status_code), value in self._status_codes.items():
+                get_entry(object_name, operation).setdefault('status_codes', {})[str(status_code)] = value
+        return data
@@ -0,0 +1,307 @@
+"""Load generation with a mix of network operations, to measure the capacity of a grid."""
+import ipaddress
+import itertools
+import math
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from ._singleflight import SingleFlight
+from .exceptions import BadParameterError, HttpError, IBError
+from .instrumentation import Event
+from .resource import Resource
+
+WORKLOAD_OPERATIONS = ('read', 'search', 'create', 'delete', 'func-call')
+DEFAULT_MIX = {'read': 40, 'search': 30, 'create': 10, 'delete': 10, 'func-call': 10}
+# a shared address space (RFC 6598), unlikely to be used by the networks of a grid
+DEFAULT_CREATE_RANGE = '100.64.0.0/16'
+DEFAULT_DURATION = 10.0
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """
+    Returns the weights of operations given as text e.g. "read=70,search=20,create=5,delete=5".
+    :param value: comma-separated operation=weight pairs.
+    """
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        try:
+            mix[name.strip()] = float(weight)
+        except ValueError:
+            raise BadParameterError(f'mix must be a comma-separated list of operation=weight but you provide {value}')
+    return mix
+
+
+def percentile(values: List[float], rank: float) -> float:
+    """Returns the percentile of sorted values with the nearest-rank method."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values), math.ceil(rank / 100 * len(values))) - 1)
+    return values[index]
+
+
+class OperationStats:
+    """Outcomes of an operation of the workload."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.retries = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    def to_dict(self, duration: float) -> dict:
+        """
+        Returns the statistics as a json serializable dict, latencies in seconds.
+        :param duration: the duration of the load in seconds, used to compute the throughput.
+        """
+        latencies = sorted(self.latencies)
+        error_count = sum(self.errors.values())
+        latency = {'min': latencies[0] if latencies else 0.0, 'mean': sum(latencies) / len(latencies) if latencies
+                   else 0.0}
+        latency.update((f'p{rank}', percentile(latencies, rank)) for rank in PERCENTILES)
+        latency['max'] = latencies[-1] if latencies else 0.0
+        return {
+            'count': self.count,
+            'throughput': self.count / duration if duration else 0.0,
+            'errors': error_count,
+            'error_rate': error_count / self.count if self.count else 0.0,
+            'retries': self.retries,
+            'latency': latency,
+            'error_types': dict(self.errors)
+        }
+
+
+class LoadReport(NamedTuple):
+    """Result of a load, with the statistics of each operation."""
+    duration: float
+    concurrency: int
+    rate: Optional[float]
+    operations: Dict[str, OperationStats]
+
+    def to_dict(self) -> dict:
+        """Returns the report as a json serializable dict, the "total" entry aggregates all operations."""
+        total = OperationStats()
+        for stats in self.operations.values():
+            total.latencies.extend(stats.latencies)
+            total.errors.update(stats.errors)
+            total.retries += stats.retries
+        return {
+            'duration': self.duration,
+            'concurrency': self.concurrency,
+            'target_rate': self.rate,
+            'total': total.to_dict(self.duration),
+            'operations': {name: stats.to_dict(self.duration) for name, stats in self.operations.items()}
+        }
+
+
+class LoadGenerator:
+    """
+    Runs a mix of network operations with one client, at a target rate or as fast as the concurrency allows, and
+    reports throughput, latency percentiles, errors and retries of each operation.
+
+    The operations are:
+    - read: get of an existing network by reference.
+    - search: get of an existing network by its address.
+    - create: creation of a /29 network in the create range.
+    - delete: deletion of a network created by the load, a create is made instead if there is none.
+    - func-call: call of next_available_ip on an existing network, it does not allocate the address.
+    Existing networks are sampled before the load starts. Networks created by the load and not deleted are removed
+    at the end. Each worker thread has its own resource, so identical concurrent reads are all sent to the grid
+    instead of being coalesced, and the negative cache of the client is not used.
+    """
+
+    def __init__(self, client, mix: Dict[str, float] = None, concurrency: int = 4, rate: float = None,
+                 duration: float = DEFAULT_DURATION, max_operations: int = None,
+                 create_range: str = DEFAULT_CREATE_RANGE, sample_size: int = 1000, seed: int = None):
+        """
+        :param client: the Client object used to perform operations.
+        :param mix: weight of each operation, by default 40% of reads, 30% of searches and 10% of creates, deletes
+        and function calls.
+        :param concurrency: number of operations running at the same time.
+        :param rate: target number of operations per second. Latencies are measured from the time an operation
+        should have started, so they include the wait when the grid cannot keep up. By default, operations are
+        started as soon as a previous one ends.
+        :param duration: maximum duration of the load in seconds.
+        :param max_operations: maximum number of operations.
+        :param create_range: network in which created networks are allocated.
+        :param sample_size: number of existing networks used by reads, searches and function calls.
+        :param seed: seed of the random choice of operations, to replay the same sequence.
+        """
+        mix = DEFAULT_MIX if mix is None else mix
+        unknown = set(mix) - set(WORKLOAD_OPERATIONS)
+        if unknown:
+            raise BadParameterError(f'operations must be in {", ".join(WORKLOAD_OPERATIONS)} but you provide '
+                                    f'{", ".join(sorted(unknown))}')
+        if not mix or any(not isinstance(weight, (int, float)) or weight < 0 for weight in mix.values()) or \
+                not sum(mix.values()):
+            raise BadParameterError(f'mix must have positive weights but you provide {mix}')
+        if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+            raise BadParameterError(f'concurrency must be a positive integer but you provide {concurrency}')
+        for name, value in (('rate', rate), ('duration', duration), ('max_operations', max_operations)):
+            if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+                raise BadParameterError(f'{name} must be a positive number but you provide {value}')
+        if duration is None and max_operations is None:
+            raise BadParameterError('duration or max_operations must be given')
+        try:
+            network = ipaddress.IPv4Network(create_range)
+        except ValueError:
+            network = None
+        if network is None or network.prefixlen > 29:
+            raise BadParameterError(f'create_range must be an IPv4 network with a prefix length of at most 29 but '
+                                    f'you provide {create_range}')
+        self._subnets: Iterator = network.subnets(new_prefix=29)
+
+        self._client = client
+        self._mix = {name: weight for name, weight in mix.items() if weight}
+        self._concurrency = concurrency
+        self._rate = rate
+        self._duration = duration
+        self._max_operations = max_operations
+        self._sample_size = sample_size
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._network = None
+        self._samples: List[dict] = []
+        self._created: List[str] = []
+        self._stats: Dict[str, OperationStats] = {}
+        self._issued = 0
+        self._start = 0.0
+        self._operations: Dict[str, Callable[[], Any]] = {
+            'read': self._read,
+            'search': self._search,
+            'create': self._create,
+            'delete': self._delete,
+            'func-call': self._func_call
+        }
+
+    def _get_network(self) -> Resource:
+        """Returns the network resource of the current worker thread, created on first use."""
+        network = getattr(self._local, 'network', None)
+        if network is None:
+            # a thread performs one request at a time, so its single flight never shares a request
+            network = Resource(self._client.session, self._client.url, 'network', single_flight=SingleFlight(),
+                               schema=self._network.documentation, instrumentation=self._client.instrumentation)
+            self._local.network = network
+        return network
+
+    def _read(self) -> Any:
+        return self._get_network().get(self._random_sample()['_ref'])
+
+    def _search(self) -> Any:
+        return self._get_network().get(params={'network': self._random_sample()['network']})
+
+    def _create(self) -> Any:
+        with self._lock:
+            subnet = next(self._subnets, None)
+        if subnet is None:
+            raise BadParameterError('create_range has no more free networks')
+        ref = self._get_network().create(network=str(subnet), comment='ib bench')
+        with self._lock:
+            self._created.append(ref)
+        return ref
+
+    def _delete(self) -> Any:
+        with self._lock:
+            ref = self._created.pop() if self._created else None
+        if ref is None:
+            self._local.operation = 'create'
+            return self._create()
+        return self._get_network().delete(ref)
+
+    def _func_call(self) -> Any:
+        return self._get_network().func_call(self._random_sample()['_ref'], 'next_available_ip', num=1)
+
+    def _random_sample(self) -> dict:
+        with self._lock:
+            return self._random.choice(self._samples)
+
+    def _record_retries(self, event: Event) -> None:
+        if event.kind != 'request' or not event.attributes.get('retries'):
+            return
+        operation = getattr(self._local, 'operation', None)
+        if operation is not None:
+            with self._lock:
+                self._stats[operation].retries += event.attributes['retries']
+
+    def _next_operation(self) -> Optional[Tuple[str, float]]:
+        """Returns the next operation and the time it should start, or None when the load is over."""
+        with self._lock:
+            now = time.perf_counter()
+            if (self._max_operations is not None and self._issued >= self._max_operations) or \
+                    (self._duration is not None and now - self._start >= self._duration):
+                return None
+            scheduled = now if self._rate is None else self._start + self._issued / self._rate
+            self._issued += 1
+            names = list(self._mix)
+            return self._random.choices(names, weights=[self._mix[name] for name in names])[0], scheduled
+
+    def _worker(self) -> None:
+        while True:
+            item = self._next_operation()
+            if item is None:
+                return
+            name, scheduled = item
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._local.operation = name
+            error = None
+            try:
+                self._operations[name]()
+            except HttpError as e:
+                error = f'HTTP {e.status_code}'
+            except (IBError, requests.RequestException) as e:
+                error = type(e).__name__
+            latency = time.perf_counter() - scheduled
+            with self._lock:
+                # a delete may have been replaced by a create
+                stats = self._stats[self._local.operation]
+                stats.latencies.append(latency)
+                if error is not None:
+                    stats.errors[error] += 1
+            self._local.operation = None
+
+    def _prepare(self) -> None:
+        self._network = self._client.get_object('network')
+        self._stats = {name: OperationStats() for name in WORKLOAD_OPERATIONS}
+        if set(self._mix) & {'read', 'search', 'func-call'}:
+            objects = self._network.get_multiple(return_fields=['network'], page_size=min(self._sample_size, 1000))
+            self._samples = list(itertools.islice(objects, self._sample_size))
+            if not self._samples:
+                raise BadParameterError('there is no network to read, search or call functions on')
+
+    def _cleanup(self) -> None:
+        for ref in self._created:
+            try:
+                self._network.delete(ref)
+            except (IBError, requests.RequestException):
+                pass
+        self._created = []
+
+    def run(self) -> LoadReport:
+        """Runs the load and returns its report."""
+        self._prepare()
+        self._client.add_hook(self._record_retries)
+        try:
+            self._issued = 0
+            self._start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+                for future in [executor.submit(self._worker) for _ in range(self._concurrency)]:
+                    future.result()
+            duration = time.perf_counter() - self._start
+        finally:
+            self._client.remove_hook(self._record_retries)
+            self._cleanup()
+        stats = {name: stats for name, stats in self._stats.items() if stats.count}
+        return LoadReport(duration, self._concurrency, self._rate, stats)
@@ -0,0 +1,191 @@
+"""Local in-memory copy of infoblox objects of a given type."""
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set
+
+from .exceptions import BadParameterError
+from .search import EqualityIndex
+
+
+class MirrorChanges(NamedTuple):
+    """References of the objects added, changed and removed during a mirror refresh."""
+    added: Set[str]
+    changed: Set[str]
+    removed: Set[str]
+
+
+def _deep_size(data: Any, seen: Set[int] = None) -> int:
+    """Returns an approximation of the memory used by a json-like structure."""
+    seen = set() if seen is None else seen
+    if id(data) in seen:
+        return 0
+    seen.add(id(data))
+    size = sys.getsizeof(data)
+    if isinstance(data, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(value, seen) for key, value in data.items())
+    elif isinstance(data, (list, tuple)):
+        size += sum(_deep_size(item, seen) for item in data)
+    return size
+
+
+class Mirror:
+    """
+    Keeps in memory all the objects matching a query, indexed by their reference. Lookups are dictionary hits and
+    the mirror can be refreshed on demand or periodically in a background thread.
+    Normally you don't instantiate this class directly, but you use the resource method "mirror".
+    """
+
+    def __init__(self, resource, params: dict = None, return_fields: List[str] = None,
+                 return_fields_plus: List[str] = None, semaphore: threading.Semaphore = None):
+        """
+        :param resource: the Resource object used to fetch objects.
+        :param params: query parameters to filter objects, the same as those of Resource.get.
+        :param return_fields: object fields to keep in memory.
+        :param return_fields_plus: additional object fields to keep in memory.
+        :param semaphore: semaphore limiting the number of refreshes running at the same time. It can be shared
+        between many mirrors. By default, a mirror never runs two refreshes at the same time.
+        """
+        self._resource = resource
+        self._params = params
+        self._return_fields = return_fields
+        self._return_fields_plus = return_fields_plus
+        self._semaphore = semaphore if semaphore is not None else threading.BoundedSemaphore(1)
+        self._records: Dict[str, dict] = {}
+        self._indexes: Dict[str, EqualityIndex] = {}
+        self._thread: threading.Thread = None
+        self._stop_event = threading.Event()
+        self.refresh_count = 0
+        self.last_refresh: float = None
+        self.last_refresh_duration: float = None
+        self.last_error: Exception = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, object_ref: str) -> bool:
+        return object_ref in self._records
+
+    def __iter__(self) -> Iterator[dict]:
+        # we iterate over a snapshot, so a concurrent refresh does not break the iteration
+        return iter(list(self._records.values()))
+
+    def __enter__(self) -> 'Mirror':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    @property
+    def name(self) -> str:
+        return self._resource.name
+
+    @property
+    def references(self) -> Set[str]:
+        return set(self._records)
+
+    def get(self, object_ref: str, default: Any = None) -> Optional[dict]:
+        """
+        Returns the object having the given reference.
+        :param object_ref: the object reference.
+        :param default: value returned if the object is unknown.
+        """
+        return self._records.get(object_ref, default)
+
+    @staticmethod
+    def _compact(record: dict) -> dict:
+        """Interns field names, this way all records share the same key strings."""
+        return {sys.intern(key): value for key, value in record.items()}
+
+    def refresh(self) -> MirrorChanges:
+        """Fetches again the objects and replaces the records which changed. Returns the changes made."""
+        with self._semaphore:
+            start = time.perf_counter()
+            records = {}
+            for record in self._resource.get_multiple(self._params, self._return_fields, self._return_fields_plus):
+                records[record['_ref']] = self._compact(record)
+
+            current = self._records
+            added = records.keys() - current.keys()
+            removed = current.keys() - records.keys()
+            changed = set()
+            for object_ref in records.keys() & current.keys():
+                if records[object_ref] == current[object_ref]:
+                    # we keep the old object, the new copy will be garbage collected
+                    records[object_ref] = current[object_ref]
+                else:
+                    changed.add(object_ref)
+            # replacing the dicts is atomic, readers see either the old or the new records
+            self._indexes = {field: EqualityIndex(field, records.values()) for field in self._indexes}
+            self._records = records
+
+            self.refresh_count += 1
+            self.last_refresh = time.time()
+            self.last_refresh_duration = time.perf_counter() - start
+            return MirrorChanges(added, changed, removed)
+
+    def create_index(self, field: str) -> None:
+        """
+        Indexes records by the value of a field, exact match searches on this field will be faster.
+        Indexes are rebuilt after each refresh.
+        :param field: the field to index.
+        """
+        with self._semaphore:
+            self._indexes = {**self._indexes, field: EqualityIndex(field, self._records.values())}
+
+    def search(self, params: dict = None) -> List[dict]:
+        """
+        Returns the records matching search parameters. Parameters are validated and interpreted like in Resource.get
+        method, but no request is sent to infoblox.
+        :param params: search parameters e.g. {'comment~:': 'gateway', 'network_view!': 'default'}.
+        """
+        query = self._resource.local_query(params)
+        return list(query.filter(list(self._records.values()), self._indexes))
+
+    def _run(self, interval: float, callback: Callable[[MirrorChanges], Any] = None) -> None:
+        """Refreshes the mirror until it is stopped."""
+        while not self._stop_event.wait(interval):
+            try:
+                changes = self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # we keep the current records and retry at the next period
+                self.last_error = e
+                continue
+            if callback is not None:
+                callback(changes)
+
+    def start(self, interval: float, callback: Callable[[MirrorChanges], Any] = None) -> None:
+        """
+        Refreshes the mirror periodically in a background thread.
+        :param interval: time in seconds between two refreshes.
+        :param callback: function called with the changes after each refresh.
+        """
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise BadParameterError(f'interval must be a positive number but you provide {interval}')
+        if self._thread is not None and self._thread.is_alive():
+            raise BadParameterError(f'the mirror of {self.name} objects is already refreshed periodically')
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval, callback), daemon=True,
+                                        name=f'ib-mirror-{self.name}')
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the periodic refresh if it is running."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        """Returns the number of records, an approximation of the memory they use and refresh information."""
+        records = self._records
+        return {
+            'records': len(records),
+            'indexes': sorted(self._indexes),
+            'memory_bytes': _deep_size(records),
+            'refresh_count': self.refresh_count,
+            'last_refresh': self.last_refresh,
+            'last_refresh_duration': self.last_refresh_duration,
+            'last_error': None if self.last_error is None else repr(self.last_error)
+        }
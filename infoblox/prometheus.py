@@ -0,0 +1,215 @@
+"""Exposition of client metrics in Prometheus text format."""
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, Iterator, List, Tuple
+
+from .instrumentation import Histogram, MetricsCollector
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'infoblox_client'
+# metric name and help of each event kind histogram
+HISTOGRAMS = {
+    'operation': ('operation_duration_seconds', 'Duration of Resource and Client operations.'),
+    'request': ('request_duration_seconds', 'Duration of HTTP requests, retries included.'),
+    'validation': ('validation_duration_seconds', 'Duration of parameters and payloads validation.'),
+    'page': ('page_duration_seconds', 'Duration of get_multiple pages fetching.'),
+    'decode': ('decode_duration_seconds', 'Duration of json responses decoding.'),
+}
+# metric name and help of each collector counter
+COUNTERS = {
+    'request_bytes': ('request_bytes_total', 'Size of HTTP request bodies.'),
+    'response_bytes': ('response_bytes_total', 'Size of HTTP response bodies.'),
+    'retries': ('retries_total', 'Retries of HTTP requests and get_multiple pages.'),
+    'pages': ('pages_total', 'Pages fetched by get_multiple.'),
+    'items': ('page_items_total', 'Objects fetched by get_multiple.'),
+}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    """Samples of a metric with its help and type."""
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = f'{PREFIX}_{name}'
+        self.metric_type = metric_type
+        self.help_text = help_text
+        self.samples: List[Tuple[str, Dict[str, str], float]] = []
+
+    def add(self, labels: Dict[str, str], value: float, suffix: str = '') -> None:
+        self.samples.append((suffix, labels, value))
+
+    def add_histogram(self, labels: Dict[str, str], histogram: Histogram) -> None:
+        cumulative_count = 0
+        for bound, count in zip((*histogram.buckets, float('inf')), histogram.bucket_counts):
+            cumulative_count += count
+            le = '+Inf' if bound == float('inf') else _format_value(float(bound))
+            self.add({**labels, 'le': le}, cumulative_count, '_bucket')
+        self.add(labels, histogram.sum, '_sum')
+        self.add(labels, histogram.count, '_count')
+
+    def lines(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} {self.metric_type}'
+        for suffix, labels, value in self.samples:
+            yield f'{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}'
+
+
+def _get_collector(client) -> MetricsCollector:
+    for callback in client.instrumentation.callbacks:
+        if isinstance(callback, MetricsCollector):
+            return callback
+    return None
+
+
+def _collector_families(collector: MetricsCollector) -> List[_Family]:
+    histograms, counters, status_codes = collector.collect()
+    requests = _Family('requests_total', 'counter', 'HTTP requests by object, operation and status class.')
+    by_status_class: Dict[Tuple[str, str, str], int] = {}
+    for (object_name, operation, status_code), count in sorted(status_codes.items(), key=str):
+        key = (object_name, operation, f'{str(status_code)[0]}xx')
+        by_status_class[key] = by_status_class.get(key, 0) + count
+    for (object_name, operation, status_class), count in by_status_class.items():
+        requests.add({'object': object_name, 'operation': operation, 'status_class': status_class}, count)
+    families = [requests]
+
+    for kind, (name, help_text) in HISTOGRAMS.items():
+        family = _Family(name, 'histogram', help_text)
+        for (event_kind, object_name, operation), histogram in sorted(histograms.items()):
+            if event_kind == kind:
+                family.add_histogram({'object': object_name, 'operation': operation}, histogram)
+        families.append(family)
+
+    for counter, (name, help_text) in COUNTERS.items():
+        family = _Family(name, 'counter', help_text)
+        for (counter_name, object_name, operation), value in sorted(counters.items()):
+            if counter_name == counter:
+                family.add({'object': object_name, 'operation': operation}, value)
+        families.append(family)
+    return families
+
+
+def _pool_families(client) -> List[_Family]:
+    in_flight = _Family('in_flight_requests', 'gauge', 'HTTP requests waiting for their response.')
+    connections = _Family('pool_connections', 'gauge', 'Connections of pools by host and state.')
+    saturation = _Family('pool_saturation_ratio', 'gauge', 'Connections in use divided by the pool size.')
+    total_in_use = 0
+    # http and https share the same adapter
+    adapters = {id(adapter): adapter for adapter in client.session.adapters.values()}
+    for adapter in adapters.values():
+        pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+        if pools is None:
+            continue
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            size = pool.pool.maxsize
+            idle = pool.pool.qsize()
+            in_use = max(size - idle, 0)
+            total_in_use += in_use
+            labels = {'host': f'{pool.host}:{pool.port}' if pool.port else pool.host}
+            connections.add({**labels, 'state': 'in_use'}, in_use)
+            connections.add({**labels, 'state': 'idle'}, idle)
+            saturation.add(labels, in_use / size if size else 0.0)
+    in_flight.add({}, total_in_use)
+    return [in_flight, connections, saturation]
+
+
+def _cache_families(client) -> List[_Family]:
+    single_flight = client.single_flight
+    coalesced = _Family('coalesced_requests_total', 'counter',
+                        'GET calls by outcome: executed or shared with an identical concurrent call.')
+    coalesced.add({'outcome': 'executed'}, single_flight.executed)
+    coalesced.add({'outcome': 'shared'}, single_flight.shared)
+    families = [coalesced]
+    negative_cache = client.negative_cache
+    if negative_cache is not None:
+        lookups = _Family('negative_cache_lookups_total', 'counter', 'Negative cache lookups by result.')
+        lookups.add({'result': 'hit'}, negative_cache.hits)
+        lookups.add({'result': 'miss'}, negative_cache.misses)
+        entries = _Family('negative_cache_entries', 'gauge', 'Object references known to be missing.')
+        entries.add({}, len(negative_cache))
+        families.extend([lookups, entries])
+    return families
+
+
+def generate_metrics(client, collector: MetricsCollector = None) -> str:
+    """
+    Returns the metrics of a client in Prometheus text format: requests by object, operation and status class,
+    latency histograms, sizes, retries and pages (given by a MetricsCollector), in-flight requests, connection pools
+    saturation and cache hits.
+    :param client: the Client object.
+    :param collector: the collector of client events, by default the first MetricsCollector hook of the client.
+    Without collector, only pools and caches metrics are returned.
+    """
+    collector = collector or _get_collector(client)
+    families = _collector_families(collector) if collector is not None else []
+    families.extend(_pool_families(client))
+    families.extend(_cache_families(client))
+    return ''.join(f'{line}\n' for family in families for line in family.lines())
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = generate_metrics(self.server.client, self.server.collector).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        # scrapes are frequent, we don't write them on stderr
+        pass
+
+
+class MetricsServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server exposing the metrics of a client on /metrics."""
+    daemon_threads = True
+
+    def __init__(self, client, collector: MetricsCollector = None, address: str = '127.0.0.1', port: int = 9466):
+        """
+        :param client: the Client object.
+        :param collector: the collector of client events, by default the first MetricsCollector hook of the client.
+        :param address: the listening address, by default only local connections are accepted.
+        :param port: the listening port, 0 to let the system choose a free port.
+        """
+        self.client = client
+        self.collector = collector
+        super().__init__((address, port), _MetricsRequestHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/metrics'
+
+
+def start_metrics_server(client, collector: MetricsCollector = None, address: str = '127.0.0.1',
+                         port: int = 9466) -> MetricsServer:
+    """
+    Starts a MetricsServer in a background thread and returns it, call its shutdown method to stop it.
+    The description of parameters is the same as that of MetricsServer.
+    """
+    server = MetricsServer(client, collector, address, port)
+    thread = threading.Thread(target=server.serve_forever, name='infoblox-metrics', daemon=True)
+    thread.start()
+    return server
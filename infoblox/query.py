@@ -0,0 +1,93 @@
+"""Searches validated once and executed many times."""
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Set, Tuple
+
+from ._helpers import url_join
+from .exceptions import BadParameterError, MandatoryFieldError
+from .types import Json
+
+
+class Placeholder(NamedTuple):
+    """Marks a value of a prepared query parameters template which is given at each execution."""
+    name: str
+
+
+class PreparedQuery:
+    """
+    A search whose parameters are validated and whose query string is built once. At each execution, only the values
+    of placeholders are checked and substituted, so repeated searches with the same shape are cheap.
+    Normally you don't instantiate this class directly, but you use the resource method "prepare_query".
+    """
+
+    def __init__(self, resource, params_template: dict = None, return_fields: List[str] = None,
+                 return_fields_plus: List[str] = None, proxy_search: str = None):
+        """
+        :param resource: the Resource object to query.
+        :param params_template: query parameters where some values can be Placeholder objects.
+        The description of other parameters is the same as that of Resource.get method.
+        """
+        if params_template is not None and not isinstance(params_template, dict):
+            raise BadParameterError(f'params_template must be a dict but you provide {params_template}')
+        params_template = params_template or {}
+        self._resource = resource
+        fixed_params = {key: value for key, value in params_template.items() if not isinstance(value, Placeholder)}
+        # the complete validation is done here, only once
+        self._parameters = resource._process_get_parameters(None, fixed_params or None, return_fields,
+                                                            return_fields_plus, proxy_search)
+        # for each placeholder, the parameter name, the placeholder name, the field name and its information
+        self._variables: List[Tuple[str, str, str, dict]] = []
+        for key, value in params_template.items():
+            if not isinstance(value, Placeholder):
+                continue
+            if key[0] == '*':  # extensible attributes are not checked
+                self._variables.append((key, value.name, key, None))
+                continue
+            field_name, field_info = resource._get_search_field_information(key)
+            self._variables.append((key, value.name, field_name, field_info))
+        self._placeholders = {placeholder for _, placeholder, _, _ in self._variables}
+        self._url = url_join(resource._url, resource.name)
+
+    @property
+    def placeholders(self) -> Set[str]:
+        return set(self._placeholders)
+
+    def build_parameters(self, **values: Any) -> Dict[str, Any]:
+        """
+        Returns the query string parameters with the values of placeholders.
+        :param values: value of each placeholder by name.
+        """
+        unknown = values.keys() - self._placeholders
+        if unknown:
+            raise BadParameterError(f'unknown placeholders: {", ".join(sorted(unknown))}')
+        parameters = dict(self._parameters)
+        for key, placeholder, field_name, field_info in self._variables:
+            if placeholder not in values:
+                raise MandatoryFieldError(f'value of placeholder {placeholder} is missing')
+            value = values[placeholder]
+            if field_info is not None:
+                self._resource._check_field_value(field_name, value, field_info)
+            parameters[key] = value
+        return parameters
+
+    def get(self, **values: Any) -> Json:
+        """
+        Executes the query like Resource.get method does.
+        :param values: value of each placeholder by name.
+        """
+        resource = self._resource
+        with resource._instrumentation.measure('operation', resource.name, 'get') as operation:
+            result = resource._coalesced_get(self._url, self.build_parameters(**values))
+            operation.set('results', len(result) if isinstance(result, list) else 1)
+            return result
+
+    def get_multiple(self, values: Dict[str, Any] = None, checkpoint_file: str = None, page_retries: int = 0,
+                     page_size: int = 1000, before_checkpoint: Callable[[], Any] = None) -> Iterator[dict]:
+        """
+        Executes the query like Resource.get_multiple method does.
+        :param values: value of each placeholder by name.
+        The description of other parameters is the same as that of Resource.get_multiple method.
+        """
+        resource = self._resource
+        with resource._instrumentation.measure('operation', resource.name, 'get_multiple', activate=False) as operation:
+            parameters = self.build_parameters(**(values or {}))
+            yield from resource._iter_pages(parameters, checkpoint_file, page_retries, page_size, operation,
+                                            before_checkpoint)
@@ -1,29 +1,72 @@
+import functools
 import os
-import re
+import threading
 import time
-from typing import List, Dict, Any, Iterator
+from typing import List, Dict, Any, Callable, Iterator, Tuple
 
 import requests
 
+from ._cache import NegativeCache
+from ._checkpoint import PagingCheckpoint
 from ._helpers import url_join, handle_http_error
-from ._settings import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from ._settings import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_BACKOFF_FACTOR
+from ._singleflight import SingleFlight
 from .exceptions import (
     FieldNotFoundError, FunctionNotFoundError, BadParameterError, SearchOnlyFieldError,
-    FieldError, IncompatibleOperationError, MandatoryFieldError, NotSearchableFieldError
+    FieldError, IncompatibleOperationError, MandatoryFieldError, NotSearchableFieldError, HttpError
 )
+from .functions import FunctionSignature, FunctionsApi, make_function_signature
+from .instrumentation import Instrumentation
+from .mirror import Mirror
+from .query import PreparedQuery
+from .search import LocalQuery, parse_search_key
 from .types import Schema, Json
 
 
+def _operation(name: str) -> Callable:
+    """Decorator measuring a resource method as an operation, with the number of objects it returns."""
+
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._instrumentation.measure('operation', self._name, name) as operation:
+                result = method(self, *args, **kwargs)
+                operation.set('results', len(result) if isinstance(result, list) else 1)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
 class Resource:
 
-    def __init__(self, session: requests.Session, wapi_url: str, name: str):
+    def __init__(self, session: requests.Session, wapi_url: str, name: str, single_flight: SingleFlight = None,
+                 negative_cache: NegativeCache = None, schema: Schema = None, instrumentation: Instrumentation = None):
+        """
+        :param session: the session used to perform requests.
+        :param wapi_url: the wapi url.
+        :param name: the infoblox object name.
+        :param single_flight: object used to share identical concurrent GET requests.
+        :param negative_cache: optional cache of object references known to be missing.
+        :param schema: the object schema if it is already known e.g. read from a file, in this case it is not
+        downloaded. With a schema and no session, the resource can only be used to validate data offline.
+        :param instrumentation: object reporting validations, pages and json decoding to hooks.
+        """
         self._url = wapi_url
         self._name = name
         self._session = session
         self._timeout = (float(os.getenv('IB_REQUEST_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT)),
                          float(os.getenv('IB_REQUEST_READ_TIMOUT', DEFAULT_READ_TIMEOUT)))
-        self._schema: Schema = None
-        self._load_schema()
+        self._backoff_factor = float(os.getenv('IB_REQUEST_BACKOFF_FACTOR', DEFAULT_BACKOFF_FACTOR))
+        # concurrent identical GET requests share the same HTTP call
+        self._single_flight = single_flight if single_flight is not None else SingleFlight()
+        # optional cache of object references known to be missing
+        self._negative_cache = negative_cache
+        self._instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self._schema: Schema = schema
+        if schema is None:
+            self._load_schema()
         # fields we get by default when we fetch resource objects without changing
         # returned fields
         self._standard_fields: List[str] = []
@@ -32,6 +75,10 @@ class Resource:
         # list of all functions inside the schema
         self._functions: List[str] = []
         self._compute_fields_and_functions()
+        self._payload_field_information: Dict[str, dict] = {}
+        # function signatures are computed once, by function name
+        self._function_signatures: Dict[str, FunctionSignature] = {}
+        self._functions_api: FunctionsApi = None
 
     @property
     def documentation(self) -> Schema:
@@ -45,16 +92,40 @@ class Resource:
     def fields(self) -> List[str]:
         return self._fields
 
+    @property
+    def standard_fields(self) -> List[str]:
+        return self._standard_fields
+
     @property
     def functions(self) -> List[str]:
         return self._functions
 
+    @property
+    def functions_api(self) -> FunctionsApi:
+        """Object functions callable as methods, e.g. resource.functions_api.next_available_ip(ref, num=5)."""
+        if self._functions_api is None:
+            self._functions_api = FunctionsApi(self)
+        return self._functions_api
+
+    def _fetch(self, url: str, params: dict = None) -> Json:
+        """Performs a GET request and returns the decoded json body."""
+        response = self._session.get(url, params=params, timeout=self._timeout)
+        handle_http_error(response)
+        return self._decode(response, 'schema' if params and '_schema' in params else 'get')
+
+    def _decode(self, response: requests.Response, operation: str) -> Json:
+        """Returns the json body of a response."""
+        with self._instrumentation.measure('decode', self._name, operation, bytes=len(response.content)):
+            return response.json()
+
+    def _coalesced_get(self, url: str, params: dict = None) -> Json:
+        """Performs a GET request, sharing the HTTP call with concurrent identical requests."""
+        return self._single_flight.do(SingleFlight.make_key(url, params), self._fetch, url, params)
+
     def _load_schema(self) -> None:
         """Loads the model schema."""
         params = {'_schema': 1, '_schema_version': 2, '_get_doc': 1, '_schema_searchable': 1}
-        response = self._session.get(url_join(self._url, self._name), params=params, timeout=self._timeout)
-        handle_http_error(response)
-        self._schema = response.json()
+        self._schema = self._coalesced_get(url_join(self._url, self._name), params)
 
     def _compute_fields_and_functions(self) -> None:
         """Computes the lists of available fields and functions."""
@@ -82,16 +153,19 @@ class Resource:
     def _get_struct_field_information(self, field: dict) -> dict:
         """
         Get struct field information
-        :param field: dict representing field information
+        :param field: dict representing field information, its nested schema is replaced by a transformed copy.
         """
+        struct_fields = []
         for struct_info in field['schema']['fields']:
             if struct_info.get('wapi_primitive', '') == 'struct':
-                self._get_struct_field_information(struct_info)
+                struct_fields.append(self._get_struct_field_information(dict(struct_info)))
             else:
-                struct_info['supports'] = self._get_field_support_information(struct_info.get('supports', ''))
-                struct_info['searchable_by'] = self._get_field_searchable_information(
-                    struct_info.get('searchable_by', '')
-                )
+                struct_fields.append({
+                    **struct_info,
+                    'supports': self._get_field_support_information(struct_info.get('supports', '')),
+                    'searchable_by': self._get_field_searchable_information(struct_info.get('searchable_by', ''))
+                })
+        field['schema'] = {**field['schema'], 'fields': struct_fields}
         return field
 
     def _get_field_information(self, field: dict) -> dict:
@@ -99,6 +173,7 @@ class Resource:
         Process, transform and return field information.
         :param field: a dictionary representing non struct field information.
         """
+        # only the transformed values are copied, the schema must not be modified
         new_field = dict(field)
         new_field['supports'] = self._get_field_support_information(new_field.get('supports', ''))
 
@@ -131,6 +206,7 @@ class Resource:
         for field in self._schema['fields']:
             if field['name'] == name:
                 new_field: Schema = dict(field)
+                new_field['schema'] = dict(field['schema'])
                 new_field['schema']['input_fields'] = [self._get_field_information(field)
                                                        for field in new_field['schema']['input_fields']]
                 new_field['schema']['output_fields'] = [self._get_field_information(field)
@@ -138,6 +214,17 @@ class Resource:
                 new_field['supports'] = self._get_field_support_information(new_field.get('supports', ''))
                 return new_field
 
+    def get_function_signature(self, name: str) -> FunctionSignature:
+        """
+        Returns the immutable signature of a function, computed on first use.
+        :param name: function name.
+        """
+        signature = self._function_signatures.get(name)
+        if signature is None:
+            signature = make_function_signature(self.get_function_information(name), self._check_field_value)
+            self._function_signatures[name] = signature
+        return signature
+
     def _validate_return_fields(self, fields: List[str] = None) -> None:
         """
         Validates returned fields passed for rest operations.
@@ -240,18 +327,24 @@ class Resource:
         for name, value in params.items():
             if name[0] == '*':  # we don't handle extensible attributes
                 continue
-            parts = re.split(r'([~<>!])', name)
-            search_modifiers = parts[1::2]
-            field_name = parts[0]
-            field_info = self.get_field_information(field_name)
+            field_name, field_info = self._get_search_field_information(name)
+            self._check_field_value(field_name, value, field_info)
 
-            if not field_info['searchable_by']:
-                raise NotSearchableFieldError(f'{field_name} is not searchable')
-            for modifier in search_modifiers:
-                if modifier not in field_info['searchable_by']:
-                    raise FieldError(f'{modifier} is not a valid modifier for field {field_name}')
+    def _get_search_field_information(self, name: str) -> Tuple[str, dict]:
+        """
+        Checks that a search parameter name uses a searchable field with valid modifiers and returns the field name
+        and its information.
+        :param name: the parameter name e.g. "comment~:".
+        """
+        field_name, search_modifiers = parse_search_key(name)
+        field_info = self.get_field_information(field_name)
 
-            self._check_field_value(field_name, value, field_info)
+        if not field_info['searchable_by']:
+            raise NotSearchableFieldError(f'{field_name} is not searchable')
+        for modifier in search_modifiers:
+            if modifier not in field_info['searchable_by']:
+                raise FieldError(f'{modifier} is not a valid modifier for field {field_name}')
+        return field_name, field_info
 
     @staticmethod
     def _check_proxy_search_value(proxy_search: str):
@@ -299,11 +392,14 @@ class Resource:
 
         return parameters
 
+    @_operation('get')
     def get(self, object_ref: str = None, params: dict = None, return_fields: List[str] = None,
             return_fields_plus: List[str] = None, proxy_search: str = None) -> Json:
         """
         Performs get operations. Useful to get a specific object using its reference or just a few objects.
         If you know, you will get many objects, it is better to use the method "get_multiple".
+        Concurrent identical calls (same url and parameters) share a single HTTP request.
+        If a negative cache is configured, references recently reported as missing fail without HTTP request.
         :param object_ref: reference of the object to fetch.
         :param params: query parameters to filter results. Look wapi documentation, for more information.
         :param return_fields: object fields to return.
@@ -317,33 +413,131 @@ class Resource:
             url = url_join(self._url, object_ref)
         else:
             url = url_join(self._url, self._name)
-        parameters = self._process_get_parameters(object_ref, params, return_fields, return_fields_plus, proxy_search)
-        response = self._session.get(url, params=parameters, timeout=self._timeout)
-        handle_http_error(response)
-        return response.json()
+        with self._instrumentation.measure('validation', self._name, 'get'):
+            parameters = self._process_get_parameters(object_ref, params, return_fields, return_fields_plus,
+                                                      proxy_search)
+        if object_ref is None or self._negative_cache is None:
+            return self._coalesced_get(url, parameters)
+
+        error = self._negative_cache.get(object_ref)
+        if error is not None:
+            raise error
+        try:
+            return self._coalesced_get(url, parameters)
+        except HttpError as e:
+            if e.status_code == 404:
+                self._negative_cache.add(object_ref, e)
+            raise
+
+    def _fetch_page(self, url: str, parameters: dict, page_retries: int = 0) -> dict:
+        """
+        Fetches a page of objects, retrying it on network errors and server errors.
+        :param url: url of the objects.
+        :param parameters: query string parameters of the page.
+        :param page_retries: number of retries before giving up.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self._fetch(url, parameters)
+            except (requests.RequestException, HttpError) as e:
+                if attempt >= page_retries or (isinstance(e, HttpError) and e.status_code < 500):
+                    raise
+                if self._instrumentation.enabled:
+                    self._instrumentation.emit('retry', self._name, 'get_multiple', 0.0, error=str(e))
+                time.sleep(self._backoff_factor * (2 ** attempt))
+                attempt += 1
 
     def get_multiple(self, params: dict = None, return_fields: List[str] = None,
-                     return_fields_plus: List[str] = None, proxy_search: str = None) -> Iterator[dict]:
+                     return_fields_plus: List[str] = None, proxy_search: str = None, checkpoint_file: str = None,
+                     page_retries: int = 0, page_size: int = 1000,
+                     before_checkpoint: Callable[[], Any] = None) -> Iterator[dict]:
         """
         Helper function to get multiple objects with memory efficiency.
-        The description of parameters is the same as that of the get method.
-        """
-        parameters = self._process_get_parameters(object_ref=None, params=params, return_fields=return_fields,
-                                                  return_fields_plus=return_fields_plus, proxy_search=proxy_search)
-        parameters['_return_as_object'] = 1
+        The description of parameters params, return_fields, return_fields_plus and proxy_search is the same as that
+        of the get method.
+        :param checkpoint_file: path of a file where the progress of the iteration is saved after each page. If the
+        iteration is interrupted, calling again the method with the same query and file resumes it from the last
+        page not completely consumed, so some objects of this page may be yielded twice. The file is removed at the
+        end of the iteration.
+        :param page_retries: number of times a page is fetched again after a network or server error.
+        :param page_size: maximum number of objects fetched per request.
+        :param before_checkpoint: callable invoked before the progress is saved in checkpoint_file, e.g. to flush the
+        objects already written to a file. Its json serializable result, if not None, is saved under the "data" key.
+        """
+        # the span is not active since the generator yields, children are attached explicitly
+        with self._instrumentation.measure('operation', self._name, 'get_multiple', activate=False) as operation:
+            with self._instrumentation.measure('validation', self._name, 'get_multiple', parent=operation):
+                parameters = self._process_get_parameters(object_ref=None, params=params,
+                                                          return_fields=return_fields,
+                                                          return_fields_plus=return_fields_plus,
+                                                          proxy_search=proxy_search)
+            yield from self._iter_pages(parameters, checkpoint_file, page_retries, page_size, operation,
+                                        before_checkpoint)
+
+    def _fetch_traced_page(self, url: str, parameters: dict, page_retries: int, operation=None) -> dict:
+        """Fetches a page of objects like _fetch_page does, measuring it as a child of the operation."""
+        with self._instrumentation.measure('page', self._name, 'get_multiple', parent=operation) as page:
+            json_response = self._fetch_page(url, parameters, page_retries)
+            page.set('items', len(json_response['result']))
+            return json_response
+
+    def _iter_pages(self, parameters: dict, checkpoint_file: str = None, page_retries: int = 0,
+                    page_size: int = 1000, operation=None,
+                    before_checkpoint: Callable[[], Any] = None) -> Iterator[dict]:
+        """
+        Yields objects matching query string parameters already validated, page by page.
+        :param operation: the measure of the calling operation, pages are its children.
+        The description of other parameters is the same as that of the get_multiple method.
+        """
+        if not isinstance(page_size, int) or page_size <= 0:
+            raise BadParameterError(f'page_size must be a positive integer but you provide {page_size}')
+        parameters = {**parameters, '_return_as_object': 1}
         parameters['_paging'] = 1
-        parameters['_max_results'] = 1000
-        next_page = True
-
-        while next_page:
-            response = self._session.get(url_join(self._url, self._name), params=parameters, timeout=self._timeout)
-            handle_http_error(response)
-            json_response = response.json()
-            if 'next_page_id' in json_response:
-                parameters = {'_page_id': json_response['next_page_id']}
-            else:
-                next_page = False
-            yield from json_response['result']
+        parameters['_max_results'] = page_size
+        query = parameters
+        url = url_join(self._url, self._name)
+        checkpoint = None if checkpoint_file is None else PagingCheckpoint(checkpoint_file, self._name, query)
+        emitted = 0
+        # number of objects to drop because they were already emitted before the query was started again
+        skip = 0
+        # number of objects emitted when the query was last started again, a cursor which expires before new objects
+        # are emitted does not restart the query a second time
+        restarted_at = None
+        if checkpoint is not None and checkpoint.page_id is not None:
+            parameters = {'_page_id': checkpoint.page_id}
+            emitted = checkpoint.emitted
+
+        while True:
+            try:
+                json_response = self._fetch_traced_page(url, parameters, page_retries, operation)
+            except HttpError as e:
+                if '_page_id' not in parameters or e.status_code not in (400, 404) or restarted_at == emitted:
+                    raise
+                # the cursor has expired, we start again the query and skip the objects already emitted
+                restarted_at = emitted
+                parameters = query
+                skip = emitted
+                continue
+            results = json_response['result']
+            if skip:
+                skipped = min(skip, len(results))
+                results = results[skipped:]
+                skip -= skipped
+            for item in results:
+                emitted += 1
+                if operation is not None:
+                    operation.set('results', emitted)
+                yield item
+            if 'next_page_id' not in json_response:
+                break
+            parameters = {'_page_id': json_response['next_page_id']}
+            if checkpoint is not None:
+                data = None if before_checkpoint is None else before_checkpoint()
+                checkpoint.save(json_response['next_page_id'], emitted, data)
+
+        if checkpoint is not None:
+            checkpoint.remove()
 
     def count(self, params: dict = None, proxy_search: str = None) -> int:
         """
@@ -360,6 +554,44 @@ class Resource:
             total += 1
         return total
 
+    def prepare_query(self, params_template: dict = None, return_fields: List[str] = None,
+                      return_fields_plus: List[str] = None, proxy_search: str = None) -> PreparedQuery:
+        """
+        Validates a search once and returns a PreparedQuery which can be executed many times with different values.
+        Values which change between executions are given by Placeholder objects in the parameters template.
+        Example: resource.prepare_query({'name': Placeholder('name'), 'view': 'default'}).get(name='foo.com')
+        :param params_template: query parameters, the same as those of the get method where some values can be
+        placeholders.
+        The description of other parameters is the same as that of the get method.
+        """
+        return PreparedQuery(self, params_template, return_fields, return_fields_plus, proxy_search)
+
+    def local_query(self, params: dict = None) -> LocalQuery:
+        """
+        Validates search parameters like the get method does and returns a LocalQuery object evaluating them against
+        objects held locally (e.g. in a mirror or a snapshot).
+        :param params: a dict representing query parameters. It is the same which is passed in get method.
+        """
+        if params is not None:
+            self._validate_params(params)
+        return LocalQuery(params)
+
+    def mirror(self, params: dict = None, return_fields: List[str] = None, return_fields_plus: List[str] = None,
+               refresh_interval: float = None, semaphore: threading.Semaphore = None) -> Mirror:
+        """
+        Loads all the objects matching the query parameters in memory and returns the Mirror object holding them.
+        :param params: query parameters to filter objects. It is the same which is passed in get method.
+        :param return_fields: object fields to keep in memory.
+        :param return_fields_plus: additional object fields to keep in memory.
+        :param refresh_interval: if provided, time in seconds between two refreshes performed in background.
+        :param semaphore: semaphore bounding the number of concurrent refreshes, it can be shared between mirrors.
+        """
+        mirror = Mirror(self, params, return_fields, return_fields_plus, semaphore)
+        mirror.refresh()
+        if refresh_interval is not None:
+            mirror.start(refresh_interval)
+        return mirror
+
     @staticmethod
     def _process_schedule_and_approval_info(schedule_time: int = None, schedule_now: bool = False,
                                             schedule_predecessor_task: str = None, schedule_warn_level: str = None,
@@ -422,6 +654,60 @@ class Resource:
 
         return parameters
 
+    def _check_standard_field_presence(self, payload: dict) -> None:
+        """Checks that at least one standard field is present in the payload of an object to create."""
+        if not any(field in self._standard_fields for field in payload):
+            raise MandatoryFieldError(f'you have not provided any standard field for the {self._name} object.'
+                                      f' You probably forget to specify a mandatory field')
+
+    def _check_payload_field(self, name: str, value: Any, support: str) -> None:
+        """
+        Checks that a field is known, supports the operation and that its value is correct.
+        :param name: field name.
+        :param value: field value.
+        :param support: the operation, "write" for creation or "update".
+        """
+        if name not in self._fields:
+            raise FieldNotFoundError(f'{name} is not a {self._name} field')
+        # field information is computed once, bulk validations check the same fields many times
+        field_info = self._payload_field_information.get(name)
+        if field_info is None:
+            field_info = self._payload_field_information[name] = self.get_field_information(name)
+        if support not in field_info['supports']:
+            operation = 'written' if support == 'write' else 'updated'
+            raise FieldError(f'{name} cannot be {operation}, operations supported by this '
+                             f'field are: {field_info["supports"]}')
+        self._check_field_value(name, value, field_info)
+
+    def validate(self, payload: dict, operation: str = 'create') -> List[str]:
+        """
+        Checks the payload of a creation or an update like create and update methods do, without sending any
+        request. Returns the list of errors, it is empty if the payload is valid.
+        :param payload: the object fields with their value.
+        :param operation: "create" or "update". For an update, the payload can have the object reference in
+        key "_ref".
+        """
+        if operation not in ('create', 'update'):
+            raise BadParameterError(f'operation must be create or update but you provide {operation}')
+        if not isinstance(payload, dict):
+            return [f'payload must be a json object but you provide {payload}']
+        errors = []
+        fields = dict(payload)
+        if operation == 'create':
+            try:
+                self._check_standard_field_presence(fields)
+            except MandatoryFieldError as e:
+                errors.append(str(e))
+        elif '_ref' in fields and not isinstance(fields.pop('_ref'), str):
+            errors.append(f'_ref must be a string but you provide {payload["_ref"]}')
+        for name, value in fields.items():
+            try:
+                self._check_payload_field(name, value, 'write' if operation == 'create' else 'update')
+            except (FieldError, FieldNotFoundError) as e:
+                errors.append(str(e))
+        return errors
+
+    @_operation('create')
     def create(self, schedule_time: int = None, schedule_now: bool = False, schedule_predecessor_task: str = None,
                schedule_warn_level: str = None, approval_comment: str = None, approval_query_mode: str = None,
                approval_ticket_number: int = None, return_fields: List[str] = None,
@@ -432,27 +718,13 @@ class Resource:
         kwargs representing fields used to create object with their value.
         To know the description of other parameters, refer to the methods _process_schedule_and_approval_info and get.
         """
-        payload = {}
-        # we check if there is no standard field passed
-        standard_field_used = False
-        for field, value in kwargs.items():
-            if field in self._standard_fields:
-                standard_field_used = True
-                break
-        if not standard_field_used:
-            raise MandatoryFieldError(f'you have not provided any standard field for the {self._name} object.'
-                                      f' You probably forget to specify a mandatory field')
-
-        # we check if field is known and supports write operation
-        for field, value in kwargs.items():
-            if field not in self._fields:
-                raise FieldNotFoundError(f'{field} is not a {self._name} field')
-            field_info = self.get_field_information(field)
-            if 'write' not in field_info['supports']:
-                raise FieldError(f'{field} cannot be written, operations supported by this '
-                                 f'field are: {field_info["supports"]}')
-            self._check_field_value(field, value, field_info)
-            payload[field] = value
+        with self._instrumentation.measure('validation', self._name, 'create'):
+            self._check_standard_field_presence(kwargs)
+            # we check if field is known and supports write operation
+            payload = {}
+            for field, value in kwargs.items():
+                self._check_payload_field(field, value, 'write')
+                payload[field] = value
 
         # we process schedule and approval information
         parameters = self._process_schedule_and_approval_info(schedule_time=schedule_time, schedule_now=schedule_now,
@@ -467,7 +739,10 @@ class Resource:
         response = self._session.post(url_join(self._url, self._name), params=parameters, json=payload,
                                       timeout=self._timeout)
         handle_http_error(response)
-        return response.json()
+        # the new object may have the reference of an object previously reported as missing
+        if self._negative_cache is not None:
+            self._negative_cache.invalidate_object(self._name)
+        return self._decode(response, 'create')
 
     @staticmethod
     def _check_object_reference(object_ref=None) -> None:
@@ -477,6 +752,7 @@ class Resource:
         if not isinstance(object_ref, str):
             raise BadParameterError(f'object_ref must be a string but you provide {object_ref}')
 
+    @_operation('update')
     def update(self, object_ref: str = None, schedule_time: int = None, schedule_now: bool = False,
                schedule_predecessor_task: str = None, schedule_warn_level: str = None, approval_comment: str = None,
                approval_query_mode: str = None, approval_ticket_number: int = None, return_fields: List[str] = None,
@@ -488,17 +764,12 @@ class Resource:
         kwargs: keyword arguments representing fields object to modify.
         To know the meaning of other parameters, refer to the methods _process_schedule_and_approval_info and get.
         """
-        self._check_object_reference(object_ref)
-        payload = {}
-        for key, value in kwargs.items():
-            if key not in self._fields:
-                raise FieldNotFoundError(f'{key} is not a {self._name} field')
-            field_info = self.get_field_information(key)
-            if 'update' not in field_info['supports']:
-                raise FieldError(f'{key} cannot be updated, operations supported by this'
-                                 f' field are: {field_info["supports"]}')
-            self._check_field_value(key, value, field_info)
-            payload[key] = value
+        with self._instrumentation.measure('validation', self._name, 'update'):
+            self._check_object_reference(object_ref)
+            payload = {}
+            for key, value in kwargs.items():
+                self._check_payload_field(key, value, 'update')
+                payload[key] = value
 
         # we process schedule and approval information
         parameters = self._process_schedule_and_approval_info(schedule_time=schedule_time, schedule_now=schedule_now,
@@ -514,8 +785,9 @@ class Resource:
         response = self._session.put(url_join(self._url, object_ref), params=parameters, json=payload,
                                      timeout=self._timeout)
         handle_http_error(response)
-        return response.json()
+        return self._decode(response, 'update')
 
+    @_operation('delete')
     def delete(self, object_ref: str = None, schedule_time: int = None, schedule_now: bool = False,
                schedule_predecessor_task: str = None, schedule_warn_level: str = None, approval_comment: str = None,
                approval_query_mode: str = None, approval_ticket_number: int = None) -> Json:
@@ -534,22 +806,9 @@ class Resource:
                                                               approval_ticket_number=approval_ticket_number)
         response = self._session.delete(url_join(self._url, object_ref), params=parameters, timeout=self._timeout)
         handle_http_error(response)
-        return response.json()
-
-    @staticmethod
-    def _get_field_info_from_function_info(function_info: dict = None, field_name: str = None,
-                                           field_type: str = 'input') -> dict:
-        """
-        Helper method to get input or output field information from function information.
-        :param function_info: a dict with function information.
-        :param field_name: the name of the field which information is requested.
-        :param field_type: specify if it an input of output field. The two possible values are "input" and "output".
-        By default it is assumed to be "input".
-        """
-        for field in function_info['schema'][f'{field_type}_fields']:
-            if field['name'] == field_name:
-                return field
+        return self._decode(response, 'delete')
 
+    @_operation('func_call')
     def func_call(self, object_ref: str = None, function_name: str = None, **kwargs) -> Json:
         """
         Calls a function on an object.
@@ -573,18 +832,11 @@ class Resource:
         if function_name not in self._functions:
             raise FunctionNotFoundError(f'{function_name} is an unknown function for {self._name} object')
 
-        function_info = self.get_function_information(function_name)
-        input_fields: List[str] = [field['name'] for field in function_info['schema']['input_fields']]
-
-        payload = {}
-        for key, value in kwargs.items():
-            if key not in input_fields:
-                raise BadParameterError(f'{key} is not a valid argument for {function_name} function')
-            self._check_field_value(key, value, self._get_field_info_from_function_info(function_info, key))
-            payload[key] = value
+        with self._instrumentation.measure('validation', self._name, 'func_call'):
+            self.get_function_signature(function_name).check_arguments(kwargs)
 
         parameters = {'_function': function_name}
-        response = self._session.post(url_join(self._url, path), params=parameters, json=payload,
+        response = self._session.post(url_join(self._url, path), params=parameters, json=kwargs,
                                       timeout=self._timeout)
         handle_http_error(response)
-        return response.json()
+        return self._decode(response, 'func_call')
@@ -1,13 +1,26 @@
+import functools
+import sys
+from typing import Dict, Optional
+
 import click
 import click_completion
 from click_didyoumean import DYMGroup
 from requests import ConnectionError
 
-# noinspection PyProtectedMember
 from infoblox import __version__, Client, Resource
+from infoblox.scripts.agent import agent, forward
+from infoblox.scripts.batch_commands import batch
+from infoblox.scripts.bench_commands import bench
+from infoblox.scripts.cache_commands import cache
 from infoblox.scripts.client_commands import api_schema, available_objects, custom_request
+from infoblox.scripts.profiling import Profiler, PROFILER_KEY, CLIENT, DOT_ENV, OBJECT_SCHEMA, profile_phase
 from infoblox.scripts.resource_commands import resource
-from infoblox.scripts.utils import check_environment, handle_dot_env_file
+from infoblox.scripts.shell import shell
+from infoblox.scripts.snapshot_commands import snapshot
+from infoblox.scripts.validate_commands import validate
+from infoblox.scripts.utils import (
+    check_environment, handle_dot_env_file, OUTPUT_FORMATS, OUTPUT_FORMAT_KEY, COMPACT_KEY
+)
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 click_completion.init()
@@ -15,26 +28,95 @@ click_completion.init()
 
 class Container:
     def __init__(self):
-        self.client = Client()
+        self._client: Client = None
+        self._resources: Dict[str, Resource] = {}
+        self._profiler: Profiler = None
         self.resource: Resource = None
+        # False when commands are executed by the agent, missing options cannot be prompted
+        self.interactive = True
+
+    @property
+    def client(self) -> Client:
+        # the client is created on first use, this way commands working on local data don't contact infoblox
+        if self._client is None:
+            hooks = [self._profiler] if self._profiler is not None else None
+            tracer = self._profiler.tracer if self._profiler is not None else None
+            try:
+                with profile_phase(CLIENT):
+                    self._client = Client(hooks=hooks, tracer=tracer)
+            except ConnectionError:
+                raise click.ClickException('The remote server is unreachable')
+            except ValueError:
+                raise click.ClickException('You have probably mistaken value for an environment variable')
+        return self._client
+
+    def get_resource(self, name: str) -> Resource:
+        """Returns the resource of an infoblox object, it is created once, so its schema is downloaded once."""
+        if name not in self._resources:
+            client = self.client
+            with profile_phase(OBJECT_SCHEMA):
+                self._resources[name] = client.get_object(name)
+        return self._resources[name]
+
+    def close(self) -> None:
+        """Closes the client if it was created."""
+        if self._client is not None:
+            self._client.close()
+
+    def set_profiler(self, profiler: Optional[Profiler]) -> None:
+        """Sets the profiler receiving events of the client, None removes the current one."""
+        if self._client is not None:
+            if self._profiler is not None:
+                self._client.remove_hook(self._profiler)
+            if profiler is not None:
+                self._client.add_hook(profiler)
+            self._client.set_tracer(profiler.tracer if profiler is not None else None)
+        self._profiler = profiler
+
+
+def _finish_profiling(context: click.Context, profiler: Profiler) -> None:
+    profiler.stop()
+    if isinstance(context.obj, Container):
+        context.obj.set_profiler(None)
+    profiler.dump()
+    click.echo(profiler.report(), err=True)
 
 
 @click.version_option(__version__)
 @click.group(context_settings=CONTEXT_SETTINGS, cls=DYMGroup)
+@click.option('--format', 'output_format', type=click.Choice(OUTPUT_FORMATS), default='auto', show_default=True,
+              help='Output format. "auto" is "pretty" on a terminal and compact "json" when the output is piped.')
+@click.option('--compact', is_flag=True, default=False, help='Does not indent json output.')
+@click.option('--profile', is_flag=True, default=False,
+              help='Prints on stderr the time spent in each phase of the command.')
+@click.option('--profile-output', type=click.Path(dir_okay=False, writable=True),
+              help='Writes a cProfile stats file, or a Chrome trace file if the path ends with ".json". It implies'
+                   ' --profile.')
 @click.pass_context
-def cli(context):
+def cli(context, output_format, compact, profile, profile_output):
     """
     Infoblox Command Line Interface. It allows you to interact with infoblox in the same way
     you will do with the python api client.
     """
-    handle_dot_env_file()
-    check_environment()
-    try:
+    context.meta[OUTPUT_FORMAT_KEY] = output_format
+    context.meta[COMPACT_KEY] = compact
+    profiler = None
+    if profile or profile_output:
+        profiler = Profiler(profile_output)
+        context.meta[PROFILER_KEY] = profiler
+        context.call_on_close(functools.partial(_finish_profiling, context, profiler))
+    with profile_phase(DOT_ENV):
+        handle_dot_env_file()
+    # the agent does not need infoblox settings, they are given by each command it executes
+    if context.invoked_subcommand != 'agent':
+        check_environment()
+    # in the interactive shell, commands share the container of the shell
+    if context.obj is None:
+        # the client is created on first use, connection errors are reported by Container.client
         context.obj = Container()
-    except ConnectionError:
-        raise click.ClickException('The remote server is unreachable')
-    except ValueError:
-        raise click.ClickException('You have probably mistaken value for an environment variable')
+        context.call_on_close(context.obj.close)
+    if profiler is not None:
+        context.obj.set_profiler(profiler)
 
 
 @cli.command('shell-completion')
@@ -52,7 +134,23 @@ def completion(append, case_insensitive, shell, path):
         raise click.ClickException(e)
 
 
+cli.add_command(agent)
 cli.add_command(api_schema)
+cli.add_command(batch)
+cli.add_command(bench)
+cli.add_command(cache)
 cli.add_command(available_objects)
 cli.add_command(custom_request)
 cli.add_command(resource)
+cli.add_command(shell)
+cli.add_command(snapshot)
+cli.add_command(validate)
+
+
+def main():
+    """Entry point of the ib command, commands are executed by the agent when it is running."""
+    exit_code = forward(sys.argv[1:])
+    if exit_code is None:
+        cli()
+    else:
+        sys.exit(exit_code)
@@ -0,0 +1,3 @@
+from infoblox.scripts import main
+
+main()
@@ -0,0 +1,308 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+import subprocess  # nosec
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import click
+from click.testing import CliRunner
+from click_didyoumean import DYMGroup
+
+from .utils import handle_dot_env_file, pretty_echo
+
+# commands which are always executed by the current process, the agent cannot stream their input or output and does
+# not know the working directory of the caller
+LOCAL_COMMANDS = ('agent', 'batch', 'bench', 'shell', 'shell-completion', 'snapshot', 'validate')
+# sub commands which are always executed by the current process, for the same reasons
+LOCAL_SUBCOMMANDS = ('export',)
+# options whose presence means the command is executed by the current process
+LOCAL_OPTIONS = ('-h', '--help', '--version', '--profile', '--profile-output', '-j')
+# global options taking a value
+GLOBAL_VALUE_OPTIONS = ('--format', '--profile-output')
+START_TIMEOUT = 5.0
+
+
+def get_socket_path() -> str:
+    """
+    Returns the path of the agent socket given by IB_AGENT_SOCKET environment variable or a per-user default, in
+    XDG_RUNTIME_DIR if it is set or in a private directory of the temporary directory.
+    """
+    if os.getenv('IB_AGENT_SOCKET'):
+        return os.environ['IB_AGENT_SOCKET']
+    if os.getenv('XDG_RUNTIME_DIR'):
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'ib-agent.sock')
+    return os.path.join(tempfile.gettempdir(), f'ib-agent-{getattr(os, "getuid", lambda: "user")()}', 'agent.sock')
+
+
+def _is_private_directory(path: str) -> bool:
+    """
+    Returns True if the directory belongs to the current user or root and other users cannot remove or rename its
+    files, e.g. because it is only writable by its owner or has the sticky bit like /tmp.
+    """
+    try:
+        directory_stat = os.stat(path)
+    except OSError:
+        return False
+    writable_by_others = directory_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    return directory_stat.st_uid in (os.getuid(), 0) and (not writable_by_others or
+                                                          bool(directory_stat.st_mode & stat.S_ISVTX))
+
+
+def is_private_socket(path: str) -> bool:
+    """
+    Returns True if the path is a socket of the current user that other users cannot replace, so the IB_* variables
+    of the caller, credentials included, are never sent to the process of another user.
+    """
+    try:
+        # a symbolic link is refused, we don't check where it points to
+        socket_stat = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(socket_stat.st_mode) and socket_stat.st_uid == os.getuid() and \
+        _is_private_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def send_request(path: str, request: dict, timeout: float = None) -> dict:
+    """
+    Sends a json request to the agent and returns its json response.
+    :param path: path of the agent socket.
+    :param request: the request to send.
+    :param timeout: time in seconds to wait for the response, by default there is no limit.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        client_socket.settimeout(timeout)
+        client_socket.connect(path)
+        with client_socket.makefile('rwb') as stream:
+            stream.write(json.dumps(request).encode() + b'\n')
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def _can_forward(args: List[str]) -> bool:
+    """Returns True if a command line can be executed by the agent."""
+    if not hasattr(socket, 'AF_UNIX') or os.getenv('IB_NO_AGENT'):
+        return False
+    if any(arg in LOCAL_OPTIONS for arg in args):
+        return False
+    # the agent cannot read the standard input of the caller
+    if '-' in args:
+        return False
+    for index, arg in enumerate(args):
+        if arg.startswith('-') or (index > 0 and args[index - 1] in GLOBAL_VALUE_OPTIONS):
+            continue
+        # the first argument which is not a global option is the command name, a sub command is searched in the
+        # following arguments, an option value equal to its name only makes the command run locally
+        return arg not in LOCAL_COMMANDS and not any(item in LOCAL_SUBCOMMANDS for item in args[index + 1:])
+    return False
+
+
+def forward(args: List[str]) -> Optional[int]:
+    """
+    Executes a command line with the agent if it is running and prints its output.
+    Returns the exit code of the command or None if the command must be executed by the current process.
+    :param args: the command line arguments without the program name.
+    """
+    if not _can_forward(args):
+        return None
+    path = get_socket_path()
+    if not os.path.exists(path):
+        return None
+    if not is_private_socket(path):
+        click.echo(f'Warning: {path} is not a socket of the current user in a private directory, the command is '
+                   f'not forwarded to the agent', err=True)
+        return None
+    # the agent must use the configuration of the caller
+    handle_dot_env_file()
+    request = {
+        'action': 'run',
+        'args': args,
+        'env': {key: value for key, value in os.environ.items() if key.startswith('IB_')},
+        'tty': click.get_text_stream('stdout').isatty()
+    }
+    try:
+        response = send_request(path, request)
+    except (OSError, ValueError):
+        # the agent is not running anymore, we fall back to direct mode
+        return None
+    click.echo(response['output'], nl=False, color=request['tty'])
+    click.echo(response['error_output'], nl=False, err=True)
+    return response['exit_code']
+
+
+class AgentServer(socketserver.UnixStreamServer):
+    """
+    Executes commands sent on a unix socket with warm clients. There is one client per set of IB_* environment
+    variables, so callers with different urls or credentials never share a session. Commands are executed one at a
+    time.
+    """
+
+    def __init__(self, path: str, cli: click.MultiCommand, container_class: type):
+        """
+        :param path: path of the unix socket.
+        :param cli: the cli group executing commands.
+        :param container_class: class of the object shared by commands of a same client, its interactive attribute
+        is set to False since the caller cannot answer prompts.
+        """
+        self.cli = cli
+        self.container_class = container_class
+        self.containers: Dict[tuple, object] = {}
+        self.started_at = time.time()
+        self.commands = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700)
+        if not _is_private_directory(directory):
+            raise click.ClickException(f'{directory} can be modified by other users, use another socket path')
+        if os.path.exists(path):
+            os.remove(path)
+        # only the current user can use the socket
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, AgentRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def get_container(self, env: Dict[str, str]):
+        key = tuple(sorted(env.items()))
+        if key not in self.containers:
+            container = self.container_class()
+            container.interactive = False
+            self.containers[key] = container
+        return self.containers[key]
+
+    def run_command(self, args: List[str], env: Dict[str, str], tty: bool = False) -> dict:
+        """
+        Executes a command line with the environment of the caller. Commands using files relative to the working
+        directory of the caller are never forwarded to the agent.
+        """
+        if tty and '--format' not in args:
+            # the caller output is a terminal, so we keep the pretty output
+            args = ['--format', 'pretty', *args]
+        command_env = {key: None for key in os.environ if key.startswith('IB_')}
+        command_env.update(env)
+        runner = CliRunner(mix_stderr=False)
+        # there is no input to answer prompts, the non interactive container makes prompted options required
+        result = runner.invoke(self.cli, args, input=None, obj=self.get_container(env), env=command_env, color=tty,
+                               prog_name='ib')
+        self.commands += 1
+        error_output = result.stderr
+        if result.exception is not None and not isinstance(result.exception, SystemExit):
+            error_output += f'Error: {result.exception!r}\n'
+        return {'exit_code': result.exit_code, 'output': result.stdout, 'error_output': error_output}
+
+    def status(self) -> dict:
+        return {
+            'pid': os.getpid(),
+            'socket': self.server_address,
+            'uptime': time.time() - self.started_at,
+            'sessions': len(self.containers),
+            'commands': self.commands
+        }
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class AgentRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        action = request.get('action')
+        if action == 'run':
+            response = self.server.run_command(request['args'], request.get('env', {}), request.get('tty', False))
+        elif action == 'status':
+            response = self.server.status()
+        elif action == 'stop':
+            response = {'stopped': True}
+            # shutdown waits for the end of serve_forever, so it cannot be called in the serving thread
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            response = {'error': f'unknown action {action}'}
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+def _get_status(path: str) -> Optional[dict]:
+    try:
+        return send_request(path, {'action': 'status'}, timeout=START_TIMEOUT)
+    except (OSError, ValueError):
+        return None
+
+
+socket_option = click.option('-s', '--socket', 'socket_path', type=click.Path(dir_okay=False),
+                             help='Path of the agent socket, by default IB_AGENT_SOCKET environment variable or a '
+                                  'file in XDG_RUNTIME_DIR or in a private directory of the temporary directory.')
+
+
+@click.group('agent', cls=DYMGroup)
+def agent():
+    """
+    Manages a background agent keeping warm clients. When it is running, ib commands are executed by the agent.
+    """
+
+
+@agent.command()
+@socket_option
+@click.pass_context
+def run(context, socket_path):
+    """Runs the agent in the foreground until it is stopped."""
+    path = socket_path or get_socket_path()
+    if _get_status(path) is not None:
+        raise click.ClickException(f'an agent is already listening on {path}')
+    with AgentServer(path, context.find_root().command, type(context.obj)) as server:
+        click.echo(f'agent listening on {path}', err=True)
+        server.serve_forever()
+
+
+@agent.command()
+@socket_option
+def start(socket_path):
+    """Starts the agent in the background."""
+    path = socket_path or get_socket_path()
+    if _get_status(path) is not None:
+        raise click.ClickException(f'an agent is already listening on {path}')
+    command = [sys.executable, '-m', 'infoblox.scripts', 'agent', 'run', '--socket', path]
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,  # nosec
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        status = _get_status(path)
+        if status is not None:
+            pretty_echo(status)
+            return
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    raise click.ClickException('unable to start the agent')
+
+
+@agent.command()
+@socket_option
+def stop(socket_path):
+    """Stops the agent."""
+    path = socket_path or get_socket_path()
+    try:
+        send_request(path, {'action': 'stop'}, timeout=START_TIMEOUT)
+    except (OSError, ValueError):
+        raise click.ClickException(f'no agent is listening on {path}')
+    click.echo('agent stopped')
+
+
+@agent.command()
+@socket_option
+def status(socket_path):
+    """Shows the agent process id, uptime, number of sessions and number of commands executed."""
+    path = socket_path or get_socket_path()
+    agent_status = _get_status(path)
+    if agent_status is None:
+        raise click.ClickException(f'no agent is listening on {path}')
+    pretty_echo(agent_status)
@@ -0,0 +1,39 @@
+import json
+
+import click
+
+from infoblox.batch import Batch
+from .utils import read_ndjson
+
+
+@click.command('batch')
+@click.option('-f', '--file', 'operations_file', type=click.File(), required=True,
+              help='Ndjson file with one operation per line, "-" reads operations from standard input.')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Maximum number of operations running at the same time.')
+@click.option('-o', '--output', type=click.File('w'), default='-',
+              help='File where results are written, by default the standard output.')
+@click.pass_obj
+def batch(obj, operations_file, concurrency, output):
+    """
+    Executes operations read from a ndjson file with a single client and writes one ndjson result per operation,
+    in input order. The command exits with status 1 if an operation failed.
+
+    \b
+    Each line is an operation, for example:
+    {"op": "get", "object": "network", "params": {"network": "10.1.0.0/16"}}
+    {"op": "create", "object": "network", "data": {"network": "10.2.0.0/16"}}
+    {"op": "update", "ref": "network/xxx", "data": {"comment": "foo"}}
+    {"op": "delete", "ref": "network/xxx"}
+    {"op": "func-call", "ref": "network/xxx", "function": "next_available_ip", "arguments": {"num": 2}}
+
+    \b
+    Example usage:
+    ib batch -f ops.ndjson -c 8 -o results.ndjson
+    """
+    failed = False
+    for result in Batch(obj.client, concurrency).run(read_ndjson(operations_file)):
+        failed = failed or not result.ok
+        click.echo(json.dumps(result.to_dict()), file=output)
+    if failed:
+        click.get_current_context().exit(1)
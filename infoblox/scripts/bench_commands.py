@@ -0,0 +1,49 @@
+import click
+
+from infoblox.exceptions import BadParameterError, HttpError, IBError
+from infoblox.loadgen import DEFAULT_CREATE_RANGE, DEFAULT_DURATION, LoadGenerator, parse_mix
+from .utils import pretty_echo
+
+
+def _parse_mix(_, __, value):
+    try:
+        return parse_mix(value)
+    except BadParameterError as e:
+        raise click.BadParameter(str(e))
+
+
+@click.command('bench')
+@click.option('-m', '--mix', default='read=40,search=30,create=10,delete=10,func-call=10', callback=_parse_mix,
+              show_default=True, help='Weight of each operation among read, search, create, delete and func-call.')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Number of operations running at the same time.')
+@click.option('-r', '--rate', type=click.FloatRange(min=0.001),
+              help='Target number of operations per second. By default, operations are sent as fast as possible.')
+@click.option('-d', '--duration', type=click.FloatRange(min=0.001),
+              help='Duration of the load in seconds, 10 if no number of operations is given. If both limits are given, '
+                   'the load stops at the first one reached.')
+@click.option('-n', '--operations', 'max_operations', type=click.IntRange(min=1),
+              help='Stops the load after this number of operations.')
+@click.option('--create-range', default=DEFAULT_CREATE_RANGE, show_default=True,
+              help='Network in which /29 networks are created, they are deleted at the end of the load.')
+@click.option('--seed', type=int, help='Seed of the random choice of operations.')
+@click.pass_obj
+def bench(obj, mix, concurrency, rate, duration, max_operations, create_range, seed):
+    """
+    Sends a load of network operations and reports the throughput, latency percentiles (in seconds), errors and
+    retries of each operation, to measure the capacity of infoblox.
+
+    \b
+    Example usage:
+    ib bench -m read=70,search=20,create=5,delete=5 -c 8 -r 50 -d 60
+    """
+    if duration is None and max_operations is None:
+        duration = DEFAULT_DURATION
+    try:
+        generator = LoadGenerator(obj.client, mix, concurrency, rate, duration, max_operations, create_range,
+                                  seed=seed)
+        pretty_echo(generator.run().to_dict())
+    except HttpError as e:
+        pretty_echo(e.error_message)
+    except IBError as e:
+        raise click.UsageError(e)
@@ -0,0 +1,47 @@
+import os
+import shutil
+
+import click
+from click_didyoumean import DYMGroup
+
+from infoblox.exceptions import HttpError
+from .schema_cache import OBJECTS_DIRECTORY, get_cache_path, refresh_schemas
+from .types import OBJECT_NAME
+from .utils import pretty_echo
+
+
+@click.group('cache', cls=DYMGroup)
+def cache():
+    """Manages the schemas cached on disk and used by shell completion."""
+
+
+@cache.command()
+@click.option('-n', '--name', 'wapi_objects', multiple=True, type=OBJECT_NAME,
+              help='Infoblox object whose schema is downloaded, this option can be repeated. By default, the schemas'
+                   ' of all objects are downloaded.')
+@click.pass_obj
+def refresh(obj, wapi_objects):
+    """
+    Downloads object schemas and stores them with their field and function names. The cache directory is given by
+    IB_CACHE_DIR environment variable or is the application directory of ib.
+
+    \b
+    Example usage:
+    ib cache refresh -n network -n record:host
+    """
+    try:
+        pretty_echo(refresh_schemas(obj.client, wapi_objects or None))
+    except HttpError as e:
+        pretty_echo(e.error_message)
+    except OSError as e:
+        raise click.ClickException(f'unable to write the cache: {e}')
+
+
+@cache.command()
+def clear():
+    """Removes the cached schemas."""
+    path = get_cache_path()
+    if os.path.isfile(path):
+        os.remove(path)
+    shutil.rmtree(os.path.join(os.path.dirname(path), OBJECTS_DIRECTORY), ignore_errors=True)
+    click.echo(f'{path} removed')
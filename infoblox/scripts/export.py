@@ -0,0 +1,139 @@
+"""Writers used to stream infoblox objects to files."""
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+import click
+
+EXPORT_FORMATS = ('ndjson', 'csv', 'json')
+
+
+@contextmanager
+def open_output(path: str, compress: bool = False, offset: int = None) -> Iterator[TextIO]:
+    """
+    Opens a text stream to write an export. The standard output is never closed.
+    :param path: path of the output file, "-" means standard output.
+    :param compress: if True, the content is compressed with gzip.
+    :param offset: if given, the uncompressed file is truncated to this size in bytes and the content is added after
+    it, e.g. to resume an interrupted export at the size returned by get_output_offset.
+    """
+    if path == '-' and not compress:
+        yield click.get_text_stream('stdout')
+        return
+    if path == '-':
+        # closing the gzip file does not close the underlying standard output
+        stream = io.TextIOWrapper(gzip.GzipFile(fileobj=click.get_binary_stream('stdout'), mode='wb'),
+                                  encoding='utf-8')
+    elif compress:
+        stream = gzip.open(path, 'wt', encoding='utf-8', newline='')
+    elif offset is not None:
+        stream = open(path, 'a', encoding='utf-8', newline='')
+        # content written after the offset was not saved in the checkpoint, it is written again
+        stream.truncate(offset)
+    else:
+        stream = open(path, 'w', encoding='utf-8', newline='')
+    with stream:
+        yield stream
+
+
+def get_output_offset(stream: TextIO) -> int:
+    """Flushes a file opened by open_output and returns its size in bytes."""
+    stream.flush()
+    return os.fstat(stream.fileno()).st_size
+
+
+def read_output_offset(checkpoint_file: str) -> Optional[int]:
+    """
+    Returns the size of the output saved in the checkpoint of an export, None if there is none.
+    :param checkpoint_file: the file given to the checkpoint_file parameter of Resource.get_multiple.
+    """
+    try:
+        with open(checkpoint_file) as f:
+            data = json.load(f).get('data')
+    except (OSError, ValueError, AttributeError):
+        return None
+    return data.get('output_offset') if isinstance(data, dict) else None
+
+
+class ProgressReporter:
+    """Prints on standard error the number of exported objects and the throughput."""
+
+    def __init__(self, interval: float = 0.5, enabled: bool = True):
+        self._interval = interval
+        self._enabled = enabled
+        self._start = time.perf_counter()
+        self._last_report = self._start
+        self.count = 0
+
+    def _report(self, final: bool = False) -> None:
+        elapsed = time.perf_counter() - self._start
+        rate = self.count / elapsed if elapsed else 0.0
+        click.echo(f'\rexported {self.count} objects in {elapsed:.1f}s ({rate:.0f} objects/s)', err=True,
+                   nl=final)
+
+    def update(self) -> None:
+        self.count += 1
+        if not self._enabled:
+            return
+        now = time.perf_counter()
+        if now - self._last_report >= self._interval:
+            self._last_report = now
+            self._report()
+
+    def finish(self) -> None:
+        if self._enabled:
+            self._report(final=True)
+
+
+def _to_csv_value(value) -> str:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def write_objects(objects: Iterable[dict], stream: TextIO, export_format: str, columns: List[str] = None,
+                  progress: ProgressReporter = None, resume: bool = False) -> int:
+    """
+    Writes objects one by one in the stream, so memory usage does not depend on the number of objects.
+    Returns the number of written objects.
+    :param objects: objects to write.
+    :param stream: the output stream.
+    :param export_format: one of "ndjson", "csv" or "json".
+    :param columns: columns of the csv format, nested values are written in json.
+    :param progress: optional progress reporter.
+    :param resume: if True, the stream continues an interrupted export, so the csv header and the opening bracket
+    of the json array are not written again.
+    """
+    progress = progress or ProgressReporter(enabled=False)
+    if export_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=columns, extrasaction='ignore')
+        if not resume:
+            writer.writeheader()
+        for item in objects:
+            writer.writerow({column: _to_csv_value(item.get(column)) for column in columns})
+            progress.update()
+    elif export_format == 'json':
+        if not resume:
+            stream.write('[')
+        for item in objects:
+            stream.write(',\n' if progress.count or resume else '\n')
+            stream.write(json.dumps(item))
+            progress.update()
+        stream.write('\n]\n' if progress.count or resume else ']\n')
+    else:
+        for item in objects:
+            stream.write(json.dumps(item))
+            stream.write('\n')
+            progress.update()
+    stream.flush()
+    progress.finish()
+    return progress.count
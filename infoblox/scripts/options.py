@@ -3,12 +3,25 @@ import click
 
 from .types import STRING_LIST, DICT
 
+
+class PromptOption(click.Option):
+    """
+    Option whose value is prompted when it is missing, unless the interactive attribute of the context object is
+    False, e.g. in the agent which cannot read the terminal of the caller. In this case, the option is required.
+    """
+
+    def prompt_for_value(self, ctx: click.Context):
+        if not getattr(ctx.obj, 'interactive', True):
+            raise click.MissingParameter(ctx=ctx, param=self)
+        return super().prompt_for_value(ctx)
+
+
 object_ref_option = click.option('-o', '--object-ref', help='Reference of the infoblox object.',
-                                 prompt='object reference')
+                                 prompt='object reference', cls=PromptOption)
 
 params_option = click.option('-p', '--params', help='Query parameters used to filter results.', type=DICT)
 
-arguments_option = click.option('-a', '--arguments', prompt='arguments', type=DICT,
+arguments_option = click.option('-a', '--arguments', prompt='arguments', type=DICT, cls=PromptOption,
                                 help='Arguments to pass to the function / command in json format.')
 
 return_fields_option = click.option('--return-fields', help='Comma-separated list of fields to be returned.',
@@ -0,0 +1,159 @@
+"""Profiling of a command line: time spent in each phase of the command, HTTP requests included."""
+import cProfile
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import click
+
+from infoblox.instrumentation import Event
+from infoblox.tracing import InMemoryExporter, Span, Tracer
+
+# key of the click context meta dict where the profiler of the current command is stored
+PROFILER_KEY = 'infoblox.profiler'
+# phases of a command
+DOT_ENV = '.env handling'
+CLIENT = 'client construction'
+OBJECT_SCHEMA = 'object schema load'
+RENDERING = 'output rendering'
+# event kinds reported in the breakdown and excluded from the time of the phase in which they occur
+EVENT_KINDS = {'validation': 'validation', 'request': 'HTTP requests', 'decode': 'JSON decoding'}
+# maximum number of requests detailed in the report, the slowest ones are kept
+MAX_DETAILED_REQUESTS = 20
+
+
+class Profiler:
+    """
+    Hook measuring the phases of a command and the HTTP requests, validations and json decodings it performs. The
+    time of a phase excludes the time of nested phases and events, so that nothing is counted twice.
+    """
+
+    def __init__(self, output_file: str = None):
+        """
+        :param output_file: path of a file where a cProfile stats file is written at the end of the command, or a
+        Chrome trace file (viewable in chrome://tracing or https://ui.perfetto.dev) if the path ends with ".json".
+        """
+        # CPU time consumed before the command, mostly by the interpreter start and imports
+        self.startup_time = time.process_time()
+        self.output_file = output_file
+        self.phases: Dict[str, float] = {}
+        # (method, path, status code, duration) of each HTTP request
+        self.requests: List[Tuple[str, str, int, float]] = []
+        self.events: Dict[str, List[float]] = {kind: [] for kind in EVENT_KINDS}
+        # name, start time and excluded time of phases being measured
+        self._stack: List[list] = []
+        self._start = time.perf_counter()
+        self._end: float = None
+        is_chrome_trace = output_file is not None and output_file.endswith('.json')
+        self.tracer: Optional[Tracer] = Tracer(InMemoryExporter()) if is_chrome_trace else None
+        self._profile = cProfile.Profile() if output_file is not None and not is_chrome_trace else None
+        if self._profile is not None:
+            self._profile.enable()
+
+    def __call__(self, event: Event) -> None:
+        if event.kind not in EVENT_KINDS:
+            return
+        self.events[event.kind].append(event.duration)
+        if event.kind == 'request':
+            attributes = event.attributes
+            self.requests.append((attributes['method'], attributes['path'], attributes['status_code'], event.duration))
+        if self._stack:
+            self._stack[-1][2] += event.duration
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measures a phase of the command, its time is added to that of previous phases with the same name."""
+        span = None
+        if self.tracer is not None:
+            span = self.tracer.start_span(f'ib.{name}')
+            self.tracer.activate(span)
+        entry = [name, time.perf_counter(), 0.0]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            duration = time.perf_counter() - entry[1]
+            self.phases[name] = self.phases.get(name, 0.0) + duration - entry[2]
+            if self._stack:
+                self._stack[-1][2] += duration
+            if span is not None:
+                self.tracer.deactivate(span)
+                self.tracer.end_span(span)
+
+    def stop(self) -> None:
+        """Stops the profiling, it must be called at the end of the command."""
+        if self._end is not None:
+            return
+        self._end = time.perf_counter()
+        if self._profile is not None:
+            self._profile.disable()
+
+    @property
+    def total_time(self) -> float:
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    def report(self) -> str:
+        """Returns the time breakdown of the command as text."""
+        rows = [('startup and imports (CPU time)', self.startup_time)]
+        rows.extend(self.phases.items())
+        for kind, label in EVENT_KINDS.items():
+            durations = self.events[kind]
+            rows.append((f'{label} ({len(durations)})', sum(durations)))
+        measured = sum(self.phases.values()) + sum(sum(durations) for durations in self.events.values())
+        rows.append(('other command code', max(self.total_time - measured, 0.0)))
+
+        width = max(len(label) for label, _ in rows) + 2
+        lines = ['Profile of the command:']
+        lines.extend(f'  {label:<{width}}{duration * 1000:>10.1f} ms' for label, duration in rows)
+        lines.append(f'  {"total":<{width}}{(self.startup_time + self.total_time) * 1000:>10.1f} ms')
+        if self.requests:
+            slowest = sorted(self.requests, key=lambda request: request[3], reverse=True)[:MAX_DETAILED_REQUESTS]
+            lines.append(f'Slowest HTTP requests ({len(slowest)} of {len(self.requests)}):')
+            for method, path, status_code, duration in slowest:
+                lines.append(f'  {duration * 1000:>10.1f} ms  {status_code} {method} {path}')
+        return '\n'.join(lines)
+
+    def dump(self) -> None:
+        """Writes the cProfile stats or the Chrome trace in the output file if one was given."""
+        if self._profile is not None:
+            self._profile.dump_stats(self.output_file)
+        elif self.tracer is not None:
+            spans = self.tracer.exporter.get_spans()
+            with open(self.output_file, 'w') as f:
+                json.dump({'traceEvents': [_get_trace_event(span) for span in spans]}, f)
+
+
+def _get_trace_event(span: Span) -> dict:
+    """Returns a complete event of the Chrome trace event format."""
+    return {
+        'name': span.name,
+        'cat': 'infoblox',
+        'ph': 'X',
+        # timestamps and durations are in microseconds
+        'ts': span.start_time * 1e6,
+        'dur': span.duration * 1e6,
+        'pid': os.getpid(),
+        'tid': 0,
+        'args': {**span.attributes, **({'error': span.error} if span.error is not None else {})}
+    }
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Returns the profiler of the current command or None if it is not profiled."""
+    context = click.get_current_context(silent=True)
+    return context.meta.get(PROFILER_KEY) if context is not None else None
+
+
+@contextmanager
+def profile_phase(name: str) -> Iterator[None]:
+    """Measures a phase of the current command if it is profiled."""
+    profiler = get_profiler()
+    if profiler is None:
+        yield
+    else:
+        with profiler.phase(name):
+            yield
@@ -1,3 +1,5 @@
+import os
+
 import click
 from click_didyoumean import DYMGroup
 
@@ -5,19 +7,21 @@ from infoblox.exceptions import ObjectNotFoundError, FieldNotFoundError, Functio
 from .options import (
     return_fields_option, return_fields_plus_option, proxy_search_option, params_option, object_ref_option,
     schedule_time_option, schedule_now_option, schedule_predecessor_option, schedule_warn_level_option,
-    approval_comment_option, approval_query_mode_option, approval_ticket_number_option, arguments_option
+    approval_comment_option, approval_query_mode_option, approval_ticket_number_option, arguments_option, PromptOption
 )
+from .export import EXPORT_FORMATS, ProgressReporter, get_output_offset, open_output, read_output_offset, write_objects
+from .types import OBJECT_NAME, FIELD_NAME, FUNCTION_NAME
 from .utils import pretty_echo
 
 
 @click.group('object', cls=DYMGroup)
-@click.option('-n', '--name', 'wapi_object', nargs=1, prompt='infoblox object',
-              help='Infoblox object with which you want to interact.')
+@click.option('-n', '--name', 'wapi_object', nargs=1, prompt='infoblox object', type=OBJECT_NAME,
+              cls=PromptOption, help='Infoblox object with which you want to interact.')
 @click.pass_obj
 def resource(obj, wapi_object):
     """Performs various object operations."""
     try:
-        obj.resource = obj.client.get_object(wapi_object)
+        obj.resource = obj.get_resource(wapi_object)
     except ObjectNotFoundError as e:
         raise click.UsageError(e)
 
@@ -44,7 +48,8 @@ def functions(obj):
 
 
 @resource.command('field-info')
-@click.option('-n', '--name', prompt='field name', help='Name of the field whose information is wanted.')
+@click.option('-n', '--name', prompt='field name', type=FIELD_NAME, cls=PromptOption,
+              help='Name of the field whose information is wanted.')
 @click.pass_obj
 def get_field_information(obj, name):
     """Shows the documentation of the object field."""
@@ -55,7 +60,8 @@ def get_field_information(obj, name):
 
 
 @resource.command('func-info')
-@click.option('-n', '--name', prompt='function name', help='Name of the function whose information is wanted.')
+@click.option('-n', '--name', prompt='function name', type=FUNCTION_NAME, cls=PromptOption,
+              help='Name of the function whose information is wanted.')
 @click.pass_obj
 def get_function_information(obj, name):
     """Shows the documentation of the object function."""
@@ -83,6 +89,64 @@ def get(obj, object_ref=None, params=None, return_fields=None, return_fields_plu
         raise click.UsageError(e)
 
 
+@resource.command(short_help='Streams objects matching given criteria to a file.')
+@params_option
+@return_fields_option
+@return_fields_plus_option
+@proxy_search_option
+@click.option('-f', '--format', 'export_format', type=click.Choice(EXPORT_FORMATS), default='ndjson',
+              show_default=True, help='Output format.')
+@click.option('--output', default='-', type=click.Path(dir_okay=False, allow_dash=True), show_default=True,
+              help='Output file, "-" means the standard output.')
+@click.option('--gzip', 'compress', is_flag=True, default=False, help='Compresses the output with gzip.')
+@click.option('--page-size', type=click.IntRange(min=1), default=1000, show_default=True,
+              help='Number of objects fetched per request.')
+@click.option('--checkpoint', type=click.Path(dir_okay=False),
+              help='File where the progress is saved to resume an interrupted export, it requires --output.')
+@click.option('--page-retries', type=click.IntRange(min=0), default=0, show_default=True,
+              help='Number of times a page is fetched again after a network or server error.')
+@click.option('--quiet', is_flag=True, default=False, help='Does not print the progress on standard error.')
+@click.pass_obj
+def export(obj, params=None, return_fields=None, return_fields_plus=None, proxy_search=None, export_format=None,
+           output=None, compress=False, page_size=None, checkpoint=None, page_retries=None, quiet=False):
+    """
+    Streams objects matching given criteria page by page to a file with constant memory usage.
+    The progress and the throughput are printed on standard error.
+
+    \b
+    Example usage:
+    ib object -n record:host export -f csv --return-fields name,comment --output hosts.csv.gz --gzip
+    """
+    if checkpoint is not None and output == '-':
+        raise click.BadOptionUsage('checkpoint', '--checkpoint requires an --output file')
+    if checkpoint is not None and compress:
+        # a gzip stream interrupted before its end cannot be completed
+        raise click.BadOptionUsage('checkpoint', '--checkpoint cannot be used with --gzip')
+    # the reference is always returned by infoblox
+    fields = return_fields or [*obj.resource.standard_fields,
+                               *[field for field in return_fields_plus or [] if field not in
+                                 obj.resource.standard_fields]]
+    columns = ['_ref', *[field for field in fields if field != '_ref']]
+    # an existing checkpoint means that the output already holds the beginning of the export
+    resume = checkpoint is not None and os.path.isfile(checkpoint)
+    offset = read_output_offset(checkpoint) if resume else None
+    if resume and (offset is None or not os.path.isfile(output) or os.path.getsize(output) < offset):
+        raise click.ClickException(f'{output} does not hold the objects saved in {checkpoint}, remove the checkpoint '
+                                   f'to start the export again')
+    try:
+        with open_output(output, compress, offset) as stream:
+            objects = obj.resource.get_multiple(
+                params, return_fields, return_fields_plus, proxy_search, checkpoint_file=checkpoint,
+                page_retries=page_retries, page_size=page_size,
+                before_checkpoint=lambda: {'output_offset': get_output_offset(stream)}
+            )
+            write_objects(objects, stream, export_format, columns, ProgressReporter(enabled=not quiet), resume)
+    except HttpError as e:
+        raise click.ClickException(f'unable to export objects: {e.error_message}')
+    except IBError as e:
+        raise click.UsageError(e)
+
+
 @resource.command(short_help='Counts infoblox objects.')
 @params_option
 @proxy_search_option
@@ -102,7 +166,8 @@ def count(obj, params=None, proxy_search=None):
 @resource.command('func-call')
 # We don't use custom object_ref_option because object_ref is not required here (no prompt is necessary)
 @click.option('-o', '--object-ref', help='Reference of the object to fetch.', default=None)
-@click.option('-n', '--name', prompt='function name', help='Name of the function to call.')
+@click.option('-n', '--name', prompt='function name', type=FUNCTION_NAME, cls=PromptOption,
+              help='Name of the function to call.')
 @arguments_option
 @click.pass_obj
 def function_call(obj, object_ref, name, arguments):
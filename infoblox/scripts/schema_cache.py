@@ -0,0 +1,146 @@
+"""Schemas stored on disk, used by shell completion and payload validation without contacting infoblox."""
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import click
+
+from infoblox.exceptions import IBError
+from infoblox.types import Schema
+from .utils import handle_dot_env_file
+
+CACHE_FILE = 'schemas.json'
+# full object schemas are stored in separate files, this way completion only reads a small file
+OBJECTS_DIRECTORY = 'objects'
+NON_FILENAME_REGEX = re.compile(r'[^0-9a-zA-Z._-]')
+
+
+def get_cache_path() -> str:
+    """Returns the path of the cache file, its directory is given by IB_CACHE_DIR environment variable."""
+    directory = os.getenv('IB_CACHE_DIR') or click.get_app_dir('ib')
+    return os.path.join(directory, CACHE_FILE)
+
+
+def _get_url() -> Optional[str]:
+    url = os.getenv('IB_URL')
+    return url.rstrip('/') if url else None
+
+
+def _read_cache(path: str) -> Dict[str, dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _get_object_schema_path(name: str, url: str = None) -> str:
+    url = url or _get_url() or 'default'
+    directory = os.path.dirname(get_cache_path())
+    return os.path.join(directory, OBJECTS_DIRECTORY, NON_FILENAME_REGEX.sub('_', url),
+                        f'{NON_FILENAME_REGEX.sub("_", name)}.json')
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Writes a json file atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temporary_path, path)
+
+
+def save_object_schema(name: str, schema: Schema, url: str = None) -> None:
+    """
+    Stores the complete schema of an infoblox object.
+    :param name: the object name.
+    :param schema: the object schema, given by Resource.documentation.
+    :param url: the wapi url, by default the one given by IB_URL environment variable.
+    """
+    _write_json(_get_object_schema_path(name, url), schema)
+
+
+def load_object_schema(name: str, url: str = None) -> Optional[Schema]:
+    """
+    Returns the cached schema of an infoblox object or None if it is not cached.
+    :param name: the object name.
+    :param url: the wapi url, by default the one given by IB_URL environment variable.
+    """
+    try:
+        with open(_get_object_schema_path(name, url)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_schemas(url: str = None) -> dict:
+    """
+    Returns the cached schemas of a wapi url: a dict with the keys "objects" (list of object names), "fields" and
+    "functions" (lists of field and function names by object name). It is empty if nothing is cached.
+    :param url: the wapi url, by default the one given by IB_URL environment variable. If the cache does not
+    know this url but knows only one other url, the schemas of the latter are returned.
+    """
+    cache = _read_cache(get_cache_path())
+    url = url or _get_url()
+    if url in cache:
+        return cache[url]
+    if len(cache) == 1:
+        return next(iter(cache.values()))
+    return {}
+
+
+def refresh_schemas(client, names: Iterable[str] = None, max_workers: int = 8) -> dict:
+    """
+    Downloads schemas of infoblox objects and stores them with their field and function names in the cache.
+    Returns the number of objects whose schema is cached and the objects whose schema could not be downloaded.
+    :param client: the Client object used to download schemas.
+    :param names: objects whose schema is downloaded, by default all available objects.
+    :param max_workers: number of schemas downloaded at the same time.
+    """
+    url = _get_url()
+    path = get_cache_path()
+    cache = _read_cache(path)
+    entry = cache.get(url, {}) if names else {}
+    fields: Dict[str, List[str]] = entry.get('fields', {})
+    functions: Dict[str, List[str]] = entry.get('functions', {})
+    errors = []
+
+    def load(name: str) -> None:
+        try:
+            resource = client.get_object(name)
+        except IBError as e:
+            errors.append(f'{name}: {e}')
+            return
+        fields[name] = resource.fields
+        functions[name] = resource.functions
+        save_object_schema(name, resource.documentation, url)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # list consumes the iterator to propagate unexpected errors
+        list(executor.map(load, names or client.available_objects))
+
+    cache[url] = {'objects': client.available_objects, 'fields': fields, 'functions': functions,
+                  'refreshed_at': time.time()}
+    _write_json(path, cache)
+    return {'path': path, 'objects': len(fields), 'errors': sorted(errors)}
+
+
+def complete_names(kind: str, object_name: str = None, incomplete: str = '') -> List[str]:
+    """
+    Returns cached object, field or function names starting with incomplete. It never raises an error, since it is
+    called during shell completion.
+    :param kind: "objects", "fields" or "functions".
+    :param object_name: the object whose field or function names are wanted.
+    :param incomplete: the beginning of the name typed by the user.
+    """
+    try:
+        # the url may be defined in a .env file
+        handle_dot_env_file()
+        schemas = load_schemas()
+        names = schemas.get(kind, []) if kind == 'objects' else schemas.get(kind, {}).get(object_name, [])
+        return [name for name in names if name.startswith(incomplete)]
+    except Exception:
+        return []
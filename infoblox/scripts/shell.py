@@ -0,0 +1,159 @@
+import shlex
+from typing import List
+
+import click
+import requests
+
+from infoblox.exceptions import IBError
+
+try:
+    import readline
+except ImportError:  # not available on Windows
+    readline = None
+
+EXIT_COMMANDS = ('exit', 'quit')
+NAME_OPTIONS = ('-n', '--name')
+FIELD_OPTIONS = ('--return-fields', '--return-fields-plus')
+
+
+class ShellCompleter:
+    """Completes command and option names, as well as object, field and function names from loaded schemas."""
+
+    def __init__(self, root: click.MultiCommand, obj):
+        """
+        :param root: the cli group.
+        :param obj: the container shared by shell commands.
+        """
+        self._root = root
+        self._obj = obj
+        self._matches: List[str] = []
+
+    def _get_names(self, command: click.Command, object_name: str = None) -> List[str]:
+        """Returns names which can follow a -n option of the command."""
+        try:
+            if command.name in ('object', 'sync'):
+                return self._obj.client.available_objects
+            if object_name is None:
+                return []
+            if command.name == 'field-info':
+                return self._obj.get_resource(object_name).fields
+            if command.name in ('func-info', 'func-call'):
+                return self._obj.get_resource(object_name).functions
+        except (click.ClickException, IBError):
+            pass
+        return []
+
+    def _get_fields(self, object_name: str = None) -> List[str]:
+        if object_name is None:
+            return []
+        try:
+            return self._obj.get_resource(object_name).fields
+        except (click.ClickException, IBError):
+            return []
+
+    def candidates(self, line: str) -> List[str]:
+        """
+        Returns the possible completions of the last word of a command line.
+        :param line: the command line typed until the cursor.
+        """
+        words = line.split()
+        text = '' if not words or line[-1].isspace() else words.pop()
+        command = self._root
+        object_name = None
+        for index, word in enumerate(words):
+            if isinstance(command, click.MultiCommand) and word in command.commands:
+                command = command.commands[word]
+            elif index > 0 and words[index - 1] in NAME_OPTIONS and command.name == 'object':
+                object_name = word
+
+        previous = words[-1] if words else None
+        prefix = ''
+        if previous in NAME_OPTIONS:
+            names = self._get_names(command, object_name)
+        elif previous in FIELD_OPTIONS:
+            # fields are separated by commas, we only complete the last one
+            prefix, _, text = text.rpartition(',')
+            prefix = f'{prefix},' if prefix else ''
+            names = self._get_fields(object_name)
+        elif text.startswith('-'):
+            names = [option for parameter in command.params for option in parameter.opts]
+            names.extend(self._root.context_settings.get('help_option_names', ['--help']))
+        elif isinstance(command, click.MultiCommand):
+            names = list(command.commands)
+            if command is self._root:
+                names.extend(EXIT_COMMANDS)
+        else:
+            names = []
+        return sorted(f'{prefix}{name}' for name in names if name.startswith(text))
+
+    def complete(self, text: str, state: int) -> str:
+        """Completion function used by readline."""
+        if state == 0:
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            # comma is a delimiter for readline, so it only expects the part after the last comma
+            self._matches = [match.rpartition(',')[2] for match in self.candidates(line)]
+        return self._matches[state] if state < len(self._matches) else None
+
+
+def run_command(root: click.MultiCommand, obj, line: str) -> None:
+    """
+    Runs a command line with the container of the shell, errors are printed and do not stop the shell.
+    :param root: the cli group.
+    :param obj: the container shared by shell commands.
+    :param line: the command line without the "ib" prefix.
+    """
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        click.secho(f'Error: {e}', fg='red', err=True)
+        return
+    if not args:
+        return
+    if args[0] == 'shell':
+        click.secho('Error: you are already in the shell', fg='red', err=True)
+        return
+    try:
+        root.main(args, prog_name='ib', obj=obj, standalone_mode=False)
+    except click.ClickException as e:
+        e.show()
+    except click.Abort:
+        click.echo('Aborted!', err=True)
+    except requests.RequestException as e:
+        click.secho(f'Error: {e}', fg='red', err=True)
+    except Exception as e:
+        # an unexpected error in a command must not stop the shell
+        click.secho(f'Error: unexpected {type(e).__name__}: {e}', fg='red', err=True)
+
+
+@click.command('shell')
+@click.pass_context
+def shell(context):
+    """
+    Starts an interactive shell where commands are typed without the "ib" prefix. The client, object schemas and
+    http connections are kept between commands. Type "exit" or press Ctrl-D to quit.
+
+    \b
+    Example usage:
+    ib shell
+    ib> object -n network get -p '{"network": "10.1.0.0/16"}'
+    """
+    root = context.find_root().command
+    if readline is not None:
+        completer = ShellCompleter(root, context.obj)
+        readline.set_completer(completer.complete)
+        # options and field lists must stay in one word
+        readline.set_completer_delims(' \t\n,')
+        readline.parse_and_bind('tab: complete')
+
+    while True:
+        try:
+            line = input('ib> ')
+        except KeyboardInterrupt:
+            click.echo()
+            continue
+        except EOFError:
+            click.echo()
+            break
+        if line.strip() in EXIT_COMMANDS:
+            break
+        run_command(root, context.obj, line)
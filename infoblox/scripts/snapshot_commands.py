@@ -0,0 +1,76 @@
+import sqlite3
+
+import click
+from click_didyoumean import DYMGroup
+
+from infoblox.exceptions import HttpError, IBError
+from infoblox.snapshot import Snapshot
+from .options import params_option, return_fields_option, return_fields_plus_option
+from .types import OBJECT_NAME
+from .utils import pretty_echo
+
+
+@click.group('snapshot', cls=DYMGroup)
+@click.option('-d', '--database', default='ib-snapshot.db', show_default=True, type=click.Path(dir_okay=False),
+              help='Path of the SQLite database holding the snapshot.')
+@click.pass_obj
+def snapshot(obj, database):
+    """Stores infoblox objects in a local SQLite database and queries them."""
+    obj.snapshot_path = database
+
+
+@snapshot.command()
+@click.option('-n', '--name', 'wapi_objects', multiple=True, required=True, type=OBJECT_NAME,
+              help='Infoblox object to store, this option can be repeated.')
+@params_option
+@return_fields_option
+@return_fields_plus_option
+@click.pass_obj
+def sync(obj, wapi_objects, params=None, return_fields=None, return_fields_plus=None):
+    """
+    Synchronizes objects in the snapshot. Only new or modified objects are written and objects which no longer exist
+    are removed.
+
+    \b
+    Example usage:
+    ib snapshot -d grid.db sync -n record:host -n network --return-fields-plus extattrs
+    """
+    result = {}
+    with Snapshot(obj.snapshot_path) as local_snapshot:
+        for wapi_object in wapi_objects:
+            try:
+                resource = obj.get_resource(wapi_object)
+                result[wapi_object] = local_snapshot.sync(resource, params, return_fields, return_fields_plus)
+            except HttpError as e:
+                result[wapi_object] = e.error_message
+            except IBError as e:
+                raise click.UsageError(e)
+    pretty_echo(result)
+
+
+@snapshot.command()
+@click.argument('sql')
+@click.pass_obj
+def query(obj, sql):
+    """
+    Executes a SQL query on the snapshot, no request is sent to infoblox.
+    Each object type is stored in a table whose name is the object name where special characters are replaced by
+    underscores e.g. record_host for record:host.
+
+    \b
+    Example usage:
+    ib snapshot query "SELECT name, ipv4addrs FROM record_host WHERE name LIKE '%.example.com'"
+    """
+    with Snapshot(obj.snapshot_path) as local_snapshot:
+        try:
+            pretty_echo(local_snapshot.query(sql))
+        except sqlite3.Error as e:
+            raise click.UsageError(f'unable to execute the query: {e}')
+
+
+@snapshot.command()
+@click.pass_obj
+def info(obj):
+    """Shows the object types stored in the snapshot."""
+    with Snapshot(obj.snapshot_path) as local_snapshot:
+        pretty_echo(local_snapshot.synced_objects())
@@ -3,6 +3,8 @@ import json
 
 import click
 
+from .schema_cache import complete_names
+
 
 class StringListParamType(click.ParamType):
     """Converts a comma-separated list of strings and returns a list of strings."""
@@ -23,5 +25,29 @@ class JsonParamType(click.ParamType):
             self.fail(f'{value} is not a valid json value', param, ctx)
 
 
+class InfobloxNameParamType(click.ParamType):
+    """
+    Name of an infoblox object, field or function. Shell completion suggests names from the schemas cached on disk.
+    """
+    name = 'text'
+
+    def __init__(self, kind: str):
+        """
+        :param kind: "objects", "fields" or "functions".
+        """
+        self.kind = kind
+
+    def convert(self, value, param, ctx):
+        return value
+
+    def complete(self, ctx, incomplete):
+        # during completion, the object name is parsed by the "object" group but its callback is not called
+        object_name = ctx.parent.params.get('wapi_object') if ctx.parent is not None else None
+        return complete_names(self.kind, object_name, incomplete)
+
+
 STRING_LIST = StringListParamType()
 DICT = JsonParamType()
+OBJECT_NAME = InfobloxNameParamType('objects')
+FIELD_NAME = InfobloxNameParamType('fields')
+FUNCTION_NAME = InfobloxNameParamType('functions')
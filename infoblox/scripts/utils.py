@@ -1,6 +1,7 @@
 import os
 import json
-from typing import Any, Sequence, Optional
+import textwrap
+from typing import Any, Sequence, Optional, Iterator, TextIO, Tuple
 
 import click
 from pygments.formatters import get_formatter_by_name
@@ -9,16 +10,87 @@ from pygments import highlight
 from dotenv import load_dotenv
 
 from infoblox.exceptions import HttpError
+from .profiling import RENDERING, profile_phase
 
 DELIMITERS = ('=', ':=')
 JSON_ERROR_MESSAGE = 'unable to parse json data, this input is not correct: {}'
+OUTPUT_FORMATS = ('auto', 'pretty', 'json', 'ndjson')
+# keys of the click context meta dict where global output options are stored
+OUTPUT_FORMAT_KEY = 'infoblox.output_format'
+COMPACT_KEY = 'infoblox.compact'
+
+
+def _get_output_options(output_format: str = None, compact: bool = None) -> tuple:
+    """Returns output format and compact flag, using global options of the current command if not provided."""
+    context = click.get_current_context(silent=True)
+    meta = context.meta if context is not None else {}
+    output_format = output_format or meta.get(OUTPUT_FORMAT_KEY) or 'auto'
+    compact = compact if compact is not None else meta.get(COMPACT_KEY, False)
+    if output_format == 'auto':
+        # highlighting and indentation are only useful for humans, we skip them when the output is piped
+        output_format = 'pretty' if click.get_text_stream('stdout').isatty() else 'json'
+        compact = compact or output_format == 'json'
+    return output_format, compact
+
+
+def _iter_json_chunks(data: Any, output_format: str, compact: bool) -> Iterator[str]:
+    """Yields json text chunks, lists and iterators being serialized element by element."""
+    indent = None if compact else 4
+    if output_format == 'ndjson':
+        if isinstance(data, (dict, str)) or not hasattr(data, '__iter__'):
+            yield f'{json.dumps(data)}\n'
+            return
+        for item in data:
+            yield f'{json.dumps(item)}\n'
+        return
+
+    if isinstance(data, (dict, str)) or not hasattr(data, '__iter__'):
+        yield json.dumps(data, indent=indent)
+        return
+    separator = ', ' if compact else ',\n'
+    empty = True
+    for item in data:
+        text = json.dumps(item, indent=indent)
+        if empty:
+            yield '[' if compact else '[\n'
+        else:
+            yield separator
+        empty = False
+        yield text if compact else textwrap.indent(text, ' ' * 4)
+    if empty:
+        yield '[]'
+    else:
+        yield ']' if compact else '\n]'
 
 
-def pretty_echo(data: Any) -> None:
-    """Returns formatted and colored output on console."""
-    json_lexer = get_lexer_by_name('json')
-    console_formatter = get_formatter_by_name('console')
-    click.echo(highlight(json.dumps(data, indent=4), json_lexer, console_formatter))
+def pretty_echo(data: Any, output_format: str = None, compact: bool = None) -> None:
+    """
+    Writes data in json on console. Lists and iterators are written element by element.
+    :param data: data to write.
+    :param output_format: "pretty" (indented and colored json), "json", "ndjson" (one element per line) or "auto"
+    (pretty if the standard output is a terminal, compact json otherwise). By default, it is the format given by the
+    global --format option of the CLI or "auto".
+    :param compact: if True, json is not indented. By default, it is given by the global --compact option of the CLI.
+    """
+    with profile_phase(RENDERING):
+        _echo_json(data, *_get_output_options(output_format, compact))
+
+
+def _echo_json(data: Any, output_format: str, compact: bool) -> None:
+    if output_format == 'pretty':
+        # chunks are highlighted as they are, without the newline handling done by default by pygments
+        json_lexer = get_lexer_by_name('json', stripnl=False, ensurenl=False)
+        console_formatter = get_formatter_by_name('console')
+        for chunk in _iter_json_chunks(data, output_format, compact):
+            click.echo(highlight(chunk, json_lexer, console_formatter), nl=False)
+        click.echo()
+    elif output_format == 'ndjson':
+        for chunk in _iter_json_chunks(data, output_format, compact):
+            click.echo(chunk, nl=False)
+    else:
+        for chunk in _iter_json_chunks(data, output_format, compact):
+            click.echo(chunk, nl=False)
+        click.echo()
 
 
 # noinspection PyUnusedLocal
@@ -125,3 +197,18 @@ def handle_dot_env_file(dot_env_file='.env') -> None:
             load_dotenv(dotenv_path=dot_env_file)
         except Exception:
             raise click.FileError('There was an error when processing the .env file, please check it out.')
+
+
+def read_ndjson(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """
+    Yields (line number, json value) tuples from a ndjson stream, blank lines are skipped. When a line cannot be
+    parsed, a ValueError is yielded instead of the json value, so that the error can be reported at its line.
+    :param stream: the ndjson stream.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f'unable to parse json data: {e}')
@@ -0,0 +1,63 @@
+import json
+
+import click
+
+from infoblox.exceptions import HttpError, ObjectNotFoundError
+from infoblox.resource import Resource
+from infoblox.validation import validate_payloads
+from .schema_cache import load_object_schema, save_object_schema
+from .types import OBJECT_NAME
+from .utils import read_ndjson
+
+
+def get_offline_resource(obj, name: str) -> Resource:
+    """
+    Returns a resource built from the cached schema of the object. If the schema is not cached, it is downloaded
+    and cached for the next times.
+    """
+    schema = load_object_schema(name)
+    if schema is not None:
+        return Resource(None, None, name, schema=schema)
+    click.echo(f'the schema of {name} is not cached, it is downloaded', err=True)
+    try:
+        resource = obj.get_resource(name)
+    except ObjectNotFoundError as e:
+        raise click.UsageError(e)
+    except HttpError as e:
+        raise click.ClickException(f'unable to download the schema of {name}: {e.error_message}')
+    try:
+        save_object_schema(name, resource.documentation)
+    except OSError:
+        # the validation can be done even if the cache is not writable
+        pass
+    return resource
+
+
+@click.command('validate')
+@click.option('-n', '--name', 'wapi_object', required=True, type=OBJECT_NAME,
+              help='Infoblox object whose payloads are validated.')
+@click.option('-f', '--file', 'payloads_file', type=click.File(), required=True,
+              help='Ndjson file with one payload per line, "-" reads payloads from standard input.')
+@click.option('--operation', type=click.Choice(['create', 'update']), default='create', show_default=True,
+              help='Operation performed with the payloads.')
+@click.option('-p', '--processes', type=click.IntRange(min=1),
+              help='Number of processes validating payloads, by default the number of processors.')
+@click.pass_obj
+def validate(obj, wapi_object, payloads_file, operation, processes):
+    """
+    Checks payloads of creations or updates against the cached object schema, without sending them to infoblox.
+    For each invalid payload, a json line is written with the line number and all its errors. The command exits with
+    status 1 if a payload is invalid.
+
+    \b
+    Example usage:
+    ib validate -n record:host -f payloads.ndjson
+    """
+    resource = get_offline_resource(obj, wapi_object)
+    invalid = 0
+    for payload_errors in validate_payloads(resource, read_ndjson(payloads_file), operation, processes):
+        invalid += 1
+        click.echo(json.dumps({'line': payload_errors.line, 'errors': payload_errors.errors}))
+    if invalid:
+        click.echo(f'{invalid} invalid payload(s)', err=True)
+        click.get_current_context().exit(1)
@@ -0,0 +1,194 @@
+"""Evaluation of wapi search parameters against local objects."""
+import ipaddress
+import re
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from .exceptions import BadParameterError
+
+SEARCH_MODIFIER_REGEX = re.compile(r'([~<>!:])')
+
+
+def parse_search_key(key: str) -> Tuple[str, List[str]]:
+    """
+    Splits a search parameter name into the field name and its search modifiers.
+    For example "comment~:" gives ("comment", ["~", ":"]).
+    :param key: the parameter name.
+    """
+    parts = SEARCH_MODIFIER_REGEX.split(key)
+    return parts[0], parts[1::2]
+
+
+class Condition(NamedTuple):
+    """A search parameter parsed once to be evaluated many times."""
+    field: str
+    value: Any
+    is_extattr: bool = False
+    negate: bool = False
+    case_insensitive: bool = False
+    pattern: Any = None
+    less: bool = False
+    greater: bool = False
+
+    @property
+    def is_equality(self) -> bool:
+        return not (self.is_extattr or self.negate or self.case_insensitive or self.pattern or self.less or
+                    self.greater)
+
+
+def _comparable(left: Any, right: Any) -> Tuple[Any, Any]:
+    """Converts two values to types which can be ordered like infoblox does (ip addresses, numbers, strings)."""
+    if isinstance(left, str) and isinstance(right, str):
+        try:
+            return ipaddress.ip_address(left), ipaddress.ip_address(right)
+        except ValueError:
+            pass
+        try:
+            return ipaddress.ip_network(left, strict=False), ipaddress.ip_network(right, strict=False)
+        except ValueError:
+            return left, right
+    if isinstance(left, (int, float)) and isinstance(right, str):
+        try:
+            return left, float(right)
+        except ValueError:
+            return str(left), right
+    return left, right
+
+
+class LocalQuery:
+    """
+    Evaluates wapi search parameters (with modifiers "~", ":", "<", ">" and "!", and extensible attributes
+    prefixed by "*") against objects held locally, for example in a Mirror or a Snapshot.
+    Only fields present in objects can be evaluated, an object missing a searched field does not match.
+    """
+
+    def __init__(self, params: Dict[str, Any] = None):
+        """
+        :param params: search parameters, the same as those passed to Resource.get.
+        """
+        if params is not None and not isinstance(params, dict):
+            raise BadParameterError(f'params must be a dict but you provide {params}')
+        self._params = params or {}
+        self._conditions: List[Condition] = [self._parse_condition(key, value) for key, value in self._params.items()]
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self._params
+
+    @property
+    def conditions(self) -> List[Condition]:
+        return self._conditions
+
+    @staticmethod
+    def _parse_condition(key: str, value: Any) -> Condition:
+        is_extattr = key.startswith('*')
+        field, modifiers = parse_search_key(key.lstrip('*'))
+        case_insensitive = ':' in modifiers
+        pattern = None
+        if '~' in modifiers:
+            try:
+                pattern = re.compile(str(value), re.IGNORECASE if case_insensitive else 0)
+            except re.error as e:
+                raise BadParameterError(f'{value} is not a valid regular expression for {key}: {e}')
+        return Condition(field, value, is_extattr, '!' in modifiers, case_insensitive, pattern, '<' in modifiers,
+                         '>' in modifiers)
+
+    @staticmethod
+    def _get_values(record: dict, condition: Condition) -> list:
+        """Returns the values of the record on which the condition applies."""
+        if condition.is_extattr:
+            extattr = record.get('extattrs', {}).get(condition.field)
+            if extattr is None:
+                return []
+            value = extattr.get('value') if isinstance(extattr, dict) else extattr
+        else:
+            if condition.field not in record:
+                return []
+            value = record[condition.field]
+        return value if isinstance(value, list) else [value]
+
+    @staticmethod
+    def _match_value(value: Any, condition: Condition) -> bool:
+        expected_values = condition.value if isinstance(condition.value, list) else [condition.value]
+        for expected in expected_values:
+            if condition.pattern is not None:
+                if condition.pattern.search(str(value)):
+                    return True
+            elif condition.less or condition.greater:
+                left, right = _comparable(value, expected)
+                try:
+                    if (condition.less and left <= right) or (condition.greater and left >= right):
+                        return True
+                except TypeError:
+                    continue
+            elif condition.case_insensitive:
+                if str(value).casefold() == str(expected).casefold():
+                    return True
+            elif value == expected or (isinstance(value, str) and not isinstance(expected, str)
+                                       and value == str(expected)):
+                return True
+        return False
+
+    def _match_condition(self, record: dict, condition: Condition) -> bool:
+        values = self._get_values(record, condition)
+        if not values:
+            return condition.negate
+        matched = any(self._match_value(value, condition) for value in values)
+        return not matched if condition.negate else matched
+
+    def match(self, record: dict) -> bool:
+        """Returns True if the object satisfies all search parameters."""
+        return all(self._match_condition(record, condition) for condition in self._conditions)
+
+    def filter(self, records: Iterable[dict], indexes: Dict[str, 'EqualityIndex'] = None) -> Iterator[dict]:
+        """
+        Yields objects satisfying all search parameters.
+        :param records: objects to filter.
+        :param indexes: optional indexes by field name. When a search parameter is an exact match on an indexed
+        field, only the objects found in the index are examined.
+        """
+        if indexes:
+            for condition in self._conditions:
+                index = indexes.get(condition.field)
+                if condition.is_equality and index is not None and not isinstance(condition.value, list):
+                    records = index.lookup(condition.value)
+                    break
+        return (record for record in records if self.match(record))
+
+
+class EqualityIndex:
+    """Index of objects by the value of a field, used to speed up exact match searches."""
+
+    def __init__(self, field: str, records: Iterable[dict] = ()):
+        """
+        :param field: the indexed field.
+        :param records: objects to index.
+        """
+        self._field = field
+        self._index: Dict[Any, List[dict]] = {}
+        for record in records:
+            self.add(record)
+
+    @property
+    def field(self) -> str:
+        return self._field
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, record: dict) -> None:
+        """Adds an object to the index."""
+        if self._field not in record:
+            return
+        value = record[self._field]
+        for item in value if isinstance(value, list) else [value]:
+            try:
+                self._index.setdefault(item, []).append(record)
+            except TypeError:  # structs cannot be indexed
+                continue
+
+    def lookup(self, value: Any) -> List[dict]:
+        """Returns objects whose field has the given value."""
+        try:
+            return self._index.get(value, [])
+        except TypeError:
+            return []
@@ -0,0 +1,124 @@
+"""Log of slow HTTP requests in JSON lines, with sampled and redacted payloads."""
+import json
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, TextIO, Union
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+
+from ._settings import DEFAULT_SLOW_REQUEST_THRESHOLD, DEFAULT_SLOW_REQUEST_BODY_SIZE
+from .exceptions import BadParameterError
+from .instrumentation import get_object_and_operation, get_retries
+
+# keys whose values are replaced in logged parameters and payloads
+SENSITIVE_KEY_REGEX = re.compile(r'pass|secret|token|key|auth|credential|community|cookie', re.IGNORECASE)
+REDACTED = '***'
+
+
+def redact(data: Any) -> Any:
+    """Returns a copy of json data where values of sensitive keys like password or secret are replaced."""
+    if isinstance(data, dict):
+        return {key: REDACTED if SENSITIVE_KEY_REGEX.search(str(key)) else redact(value)
+                for key, value in data.items()}
+    if isinstance(data, list):
+        return [redact(item) for item in data]
+    return data
+
+
+class SlowRequestLogger:
+    """
+    Session hook writing a json line for each HTTP request slower than a threshold. A line has the keys timestamp,
+    method, object, operation, path, params, status_code, request_bytes, response_bytes, retries and duration (in
+    seconds), and for sampled requests request_body and response_body.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_SLOW_REQUEST_THRESHOLD, output: Union[str, TextIO] = None,
+                 sample_rate: float = 0.0, max_body_size: int = DEFAULT_SLOW_REQUEST_BODY_SIZE):
+        """
+        :param threshold: minimum duration in seconds of logged requests.
+        :param output: path of a file where lines are appended, or a text stream. By default, it is the standard
+        error.
+        :param sample_rate: probability between 0 and 1 that bodies of a logged request are included in its line.
+        Values of sensitive keys like password or secret are redacted.
+        :param max_body_size: maximum number of characters of a logged body, longer bodies are truncated.
+        """
+        if not isinstance(threshold, (int, float)) or threshold < 0:
+            raise BadParameterError(f'threshold must be a positive number but you provide {threshold}')
+        if not isinstance(sample_rate, (int, float)) or not 0 <= sample_rate <= 1:
+            raise BadParameterError(f'sample_rate must be a number between 0 and 1 but you provide {sample_rate}')
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.max_body_size = max_body_size
+        self._lock = threading.Lock()
+        self._owns_output = isinstance(output, str)
+        self._output: TextIO = open(output, 'a') if self._owns_output else output
+
+    def __call__(self, response: requests.Response, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        stream = kwargs.get('stream', False)
+        # the body is read by requests just after hooks, we read it here to include it in the duration
+        if not stream:
+            response.content
+        duration = response.elapsed.total_seconds() + time.perf_counter() - start
+        if duration >= self.threshold:
+            self.write(self.make_record(response, duration, stream))
+        return response
+
+    def _format_body(self, body: Union[bytes, str]) -> Any:
+        if not body:
+            return None
+        try:
+            data = redact(json.loads(body))
+        except ValueError:
+            # other bodies like uploaded files cannot be redacted
+            return f'<{len(body)} bytes>'
+        text = json.dumps(data)
+        if len(text) <= self.max_body_size:
+            return data
+        return text[:self.max_body_size] + '...'
+
+    def make_record(self, response: requests.Response, duration: float, stream: bool = False) -> dict:
+        """
+        Returns the logged data of a request.
+        :param response: the response of the request.
+        :param duration: the duration of the request in seconds.
+        :param stream: True if the response body is streamed, in this case it is not read.
+        """
+        request = response.request
+        parts = urlparse(request.url)
+        object_name, operation = get_object_and_operation(request.method, request.url)
+        body = request.body or b''
+        record = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'method': request.method,
+            'object': object_name,
+            'operation': operation,
+            'path': parts.path,
+            'params': redact(dict(parse_qsl(parts.query, keep_blank_values=True))),
+            'status_code': response.status_code,
+            'request_bytes': len(body),
+            'response_bytes': 0 if stream else len(response.content),
+            'retries': get_retries(response),
+            'duration': round(duration, 6)
+        }
+        if self.sample_rate and random.random() < self.sample_rate:
+            record['request_body'] = self._format_body(body)
+            record['response_body'] = None if stream else self._format_body(response.content)
+        return record
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            output = self._output if self._output is not None else sys.stderr
+            output.write(line)
+            output.flush()
+
+    def close(self) -> None:
+        """Closes the output file if it was given as a path."""
+        if self._owns_output:
+            self._output.close()
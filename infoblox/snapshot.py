@@ -0,0 +1,246 @@
+"""Local SQLite copy of infoblox objects which can be queried with SQL."""
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List
+
+from .exceptions import BadParameterError
+from .search import parse_search_key
+
+INDEXED_COLUMN_REGEX = re.compile(r'(^name$|^network$|ip|addr|mac)')
+NON_IDENTIFIER_REGEX = re.compile(r'[^0-9a-zA-Z_]')
+META_TABLE = '_snapshot_objects'
+
+
+def get_table_name(name: str) -> str:
+    """
+    Returns the table name used to store objects of an infoblox type e.g. record_host for record:host.
+    :param name: the infoblox object name.
+    """
+    return NON_IDENTIFIER_REGEX.sub('_', name)
+
+
+def _quote(identifier: str) -> str:
+    """Quotes a SQL identifier."""
+    return '"{}"'.format(identifier.replace('"', '""'))
+
+
+def _to_column_value(value: Any) -> Any:
+    """Converts a field value to a value storable in a SQLite column."""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def _to_field_type(value: Any, field_types: List[str]) -> Any:
+    """
+    Converts a search value given as text (e.g. on the command line) to the type of the field, like infoblox
+    interprets query strings, so that "3600" matches a stored ttl of 3600.
+    """
+    if isinstance(value, list):
+        return [_to_field_type(item, field_types) for item in value]
+    if not isinstance(value, str):
+        return value
+    if any(field_type in ('int', 'uint', 'timestamp') for field_type in field_types):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    if 'bool' in field_types and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return value
+
+
+def _is_scalar_field(resource, field: str) -> bool:
+    """
+    Returns True if values of the field are stored as is in its column, other values are stored in json and cannot
+    be compared by SQLite with search values.
+    """
+    if field not in resource.fields:
+        return False
+    information = resource.get_field_information(field)
+    return not information.get('is_array', False) and \
+        information.get('wapi_primitive', '') not in ('struct', 'object', 'funccall')
+
+
+def _coerce_search_params(resource, params: dict = None) -> dict:
+    """Converts text values of search parameters to the types of their fields."""
+    if not params:
+        return params
+    coerced = {}
+    for key, value in params.items():
+        field, _ = parse_search_key(key)
+        # extensible attributes and unknown fields are kept as is, the latter are reported by the validation
+        if not key.startswith('*') and field in resource.fields:
+            value = _to_field_type(value, resource.get_field_information(field).get('type', []))
+        coerced[key] = value
+    return coerced
+
+
+class Snapshot:
+    """
+    Stores infoblox objects in a SQLite database. Each object type has its own table with the reference in
+    column "_ref", a column for each standard or requested field and the complete object serialized in json in
+    column "_data". Columns related to names and ip addresses are indexed.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: path of the SQLite database, it is created if it does not exist.
+        """
+        if not isinstance(path, str):
+            raise BadParameterError(f'path must be a string but you provide {path}')
+        self._path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {META_TABLE} (name TEXT PRIMARY KEY, table_name TEXT, generation INTEGER,'
+                f' synced_at REAL, duration REAL, count INTEGER, params TEXT)'
+            )
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+    def _get_columns(self, table: str) -> List[str]:
+        return [row['name'] for row in self._connection.execute(f'PRAGMA table_info({_quote(table)})')]
+
+    def _prepare_table(self, table: str, fields: List[str]) -> None:
+        """Creates the table of an object type or adds the missing field columns."""
+        self._connection.execute(
+            f'CREATE TABLE IF NOT EXISTS {_quote(table)} (_ref TEXT PRIMARY KEY, _data TEXT, _generation INTEGER)'
+        )
+        existing_columns = self._get_columns(table)
+        for field in fields:
+            if field in existing_columns:
+                continue
+            self._connection.execute(f'ALTER TABLE {_quote(table)} ADD COLUMN {_quote(field)}')
+            if INDEXED_COLUMN_REGEX.search(field):
+                index = _quote(f'ix_{table}_{field}')
+                self._connection.execute(f'CREATE INDEX IF NOT EXISTS {index} ON {_quote(table)} ({_quote(field)})')
+
+    def _get_generation(self, name: str) -> int:
+        row = self._connection.execute(f'SELECT generation FROM {META_TABLE} WHERE name = ?', (name,)).fetchone()
+        return 0 if row is None else row['generation']
+
+    def sync(self, resource, params: dict = None, return_fields: List[str] = None,
+             return_fields_plus: List[str] = None) -> Dict[str, int]:
+        """
+        Streams the objects matching the query parameters into the database. Only new or modified objects are
+        written and objects which no longer exist are deleted. The synchronization is done in a single transaction,
+        so if it fails, the previous content of the snapshot is kept.
+        Returns the number of objects inserted, updated, deleted and unchanged.
+        :param resource: the Resource object whose objects are stored.
+        The description of other parameters is the same as that of Resource.get method.
+        """
+        start = time.perf_counter()
+        name = resource.name
+        table = get_table_name(name)
+        if return_fields is not None:
+            fields = [field for field in return_fields if '.' not in field and field != '_ref']
+        else:
+            extra_fields = [field for field in return_fields_plus or []
+                            if field not in resource.standard_fields and '.' not in field]
+            fields = list(resource.standard_fields) + extra_fields
+        quoted_table = _quote(table)
+        stats = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+        with self._lock, self._connection:
+            self._prepare_table(table, fields)
+            generation = self._get_generation(name) + 1
+            quoted_fields = ', '.join(_quote(field) for field in fields)
+            assignments = ', '.join(f'{_quote(field)} = ?' for field in ['_data', '_generation', *fields])
+            placeholders = ', '.join('?' for _ in range(len(fields) + 3))
+            touch_query = f'UPDATE {quoted_table} SET _generation = ? WHERE _ref = ? AND _data = ?'
+            update_query = f'UPDATE {quoted_table} SET {assignments} WHERE _ref = ?'
+            insert_query = (f'INSERT INTO {quoted_table} (_ref, _data, _generation{", " if fields else ""}'
+                            f'{quoted_fields}) VALUES ({placeholders})')
+
+            for record in resource.get_multiple(params, return_fields, return_fields_plus):
+                object_ref = record['_ref']
+                data = json.dumps(record, sort_keys=True)
+                if self._connection.execute(touch_query, (generation, object_ref, data)).rowcount:
+                    stats['unchanged'] += 1
+                    continue
+                values = [_to_column_value(record.get(field)) for field in fields]
+                if self._connection.execute(update_query, (data, generation, *values, object_ref)).rowcount:
+                    stats['updated'] += 1
+                else:
+                    self._connection.execute(insert_query, (object_ref, data, generation, *values))
+                    stats['inserted'] += 1
+
+            cursor = self._connection.execute(f'DELETE FROM {quoted_table} WHERE _generation < ?', (generation,))
+            stats['deleted'] = cursor.rowcount
+            count = stats['inserted'] + stats['updated'] + stats['unchanged']
+            self._connection.execute(
+                f'INSERT OR REPLACE INTO {META_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (name, table, generation, time.time(), time.perf_counter() - start, count,
+                 json.dumps(params or {}, sort_keys=True))
+            )
+        return stats
+
+    def synced_objects(self) -> List[dict]:
+        """Returns information about the object types stored in the snapshot."""
+        return self.query(f'SELECT * FROM {META_TABLE} ORDER BY name')
+
+    def iter_query(self, sql: str, parameters: Any = ()) -> Iterator[dict]:
+        """
+        Executes a SQL query and yields rows as dicts.
+        :param sql: the SQL query.
+        :param parameters: parameters bound to the query placeholders.
+        """
+        with self._lock:
+            cursor = self._connection.execute(sql, parameters)
+        for row in cursor:
+            yield dict(row)
+
+    def query(self, sql: str, parameters: Any = ()) -> List[dict]:
+        """
+        Executes a SQL query and returns a list of rows as dicts.
+        :param sql: the SQL query.
+        :param parameters: parameters bound to the query placeholders.
+        """
+        return list(self.iter_query(sql, parameters))
+
+    def objects(self, name: str) -> Iterator[dict]:
+        """
+        Yields the stored objects of an infoblox type as they were returned by the API.
+        :param name: the infoblox object name.
+        """
+        for row in self.iter_query(f'SELECT _data FROM {_quote(get_table_name(name))}'):
+            yield json.loads(row['_data'])
+
+    def search(self, resource, params: dict = None) -> Iterator[dict]:
+        """
+        Yields the stored objects of the resource type matching search parameters. Parameters are validated and
+        interpreted like in Resource.get method, exact matches on extracted columns of scalar fields are performed by
+        SQLite.
+        :param resource: the Resource object whose objects are searched.
+        :param params: search parameters e.g. {'name~': 'example.com$', 'view': 'default'}.
+        """
+        query = resource.local_query(_coerce_search_params(resource, params))
+        table = get_table_name(resource.name)
+        columns = self._get_columns(table)
+        clauses, values = [], []
+        for condition in query.conditions:
+            if condition.is_equality and condition.field in columns and isinstance(condition.value, (str, int)) and \
+                    _is_scalar_field(resource, condition.field):
+                clauses.append(f'{_quote(condition.field)} = ?')
+                values.append(condition.value)
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+        rows = self.iter_query(f'SELECT _data FROM {_quote(table)}{where}', values)
+        yield from query.filter(json.loads(row['_data']) for row in rows)
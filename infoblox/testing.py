@@ -0,0 +1,679 @@
+"""
+Fake WAPI server keeping objects in memory, to test and benchmark the client offline.
+It serves schemas, stores objects, implements searches with modifiers, return fields, paging, function calls and the
+request endpoint, and can add latency and errors to requests.
+Start it with: python -m infoblox.testing --networks 10000
+"""
+import base64
+import ipaddress
+import itertools
+import json
+import random
+import re
+import secrets
+import socketserver
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import click
+
+from .exceptions import BadParameterError
+from .search import LocalQuery, parse_search_key
+from .types import Json
+
+# path prefix of wapi urls, e.g. "/wapi/v2.9/"
+WAPI_PREFIX_REGEX = re.compile(r'^/wapi/v(\d+\.\d+(?:\.\d+)?)/?')
+# default maximum number of objects returned by a get request, like infoblox
+DEFAULT_MAX_RESULTS = 1000
+# parameters which are not search parameters
+CONTROL_PARAMETERS = ('_return_fields', '_return_fields+', '_max_results', '_paging', '_page_id', '_return_as_object',
+                      '_proxy_search', '_schema', '_schema_version', '_get_doc', '_schema_searchable', '_function',
+                      '_return_type', '_inheritance')
+SITES = ('Paris', 'London', 'New York', 'Tokyo', 'Sydney')
+
+FakeFunction = Callable[['FakeWapi', str, Optional[dict], dict], Json]
+
+
+def make_field(name: str, field_type: str = 'string', supports: str = 'rwus', searchable_by: str = '',
+               standard_field: bool = False, is_array: bool = False, doc: str = '') -> dict:
+    """Returns the schema of an object field as returned by infoblox."""
+    field = {'doc': doc, 'is_array': is_array, 'name': name, 'standard_field': standard_field, 'supports': supports,
+             'type': [field_type]}
+    if searchable_by:
+        field['searchable_by'] = searchable_by
+    return field
+
+
+def make_function_field(name: str, input_fields: List[dict] = None, output_fields: List[dict] = None,
+                        doc: str = '') -> dict:
+    """Returns the schema of an object function as returned by infoblox."""
+    return {'doc': doc, 'is_array': False, 'name': name, 'standard_field': False, 'supports': 'rwu',
+            'type': [name.replace('_', '')], 'wapi_primitive': 'funccall',
+            'schema': {'input_fields': input_fields or [], 'output_fields': output_fields or []}}
+
+
+EXTATTRS_FIELD = make_field('extattrs', 'extattr', supports='rwu', doc='Extensible attributes of the object.')
+
+NETWORK_FIELDS = [
+    make_field('network', searchable_by='=~', standard_field=True, doc='The network address in CIDR format.'),
+    make_field('network_view', searchable_by='=', standard_field=True, doc='The name of the network view.'),
+    make_field('comment', searchable_by=':=~', standard_field=True, doc='Comment for the network.'),
+    make_field('disable', 'bool', supports='rwu', doc='Determines whether the network is disabled.'),
+    EXTATTRS_FIELD,
+    make_function_field('next_available_ip', input_fields=[
+        make_field('num', 'uint', supports='w', doc='The number of IP addresses you are requesting.'),
+        make_field('exclude', supports='w', is_array=True, doc='A list of IP addresses to exclude.')
+    ], output_fields=[
+        make_field('ips', supports='r', is_array=True, doc='The requested IP addresses.')
+    ], doc='This function retrieves the next available IP in the network.')
+]
+
+RECORD_A_FIELDS = [
+    make_field('name', searchable_by=':=~', standard_field=True, doc='The name of the record in FQDN format.'),
+    make_field('ipv4addr', searchable_by='=<>', standard_field=True, doc='The IPv4 address of the record.'),
+    make_field('view', searchable_by='=', standard_field=True, doc='The name of the DNS view of the record.'),
+    make_field('comment', searchable_by=':=~', doc='Comment for the record.'),
+    make_field('ttl', 'uint', searchable_by='=<>', doc='The time to live of the record.'),
+    EXTATTRS_FIELD
+]
+
+
+class WapiError(Exception):
+    """Error returned by the fake wapi with the format of infoblox errors."""
+
+    def __init__(self, status_code: int, code: str, text: str):
+        super().__init__(text)
+        self.status_code = status_code
+        self.code = code
+        self.text = text
+
+    def to_dict(self) -> dict:
+        return {'Error': f'{self.code}: {self.text}', 'code': self.code, 'text': self.text}
+
+
+def _bad_request(text: str) -> WapiError:
+    return WapiError(400, 'Client.Ibap.Proto', text)
+
+
+class _Cursor:
+    """Objects of a paged search not returned yet."""
+
+    def __init__(self, objects: Iterator[dict], return_fields: Tuple[str, ...]):
+        self.objects = objects
+        self.return_fields = return_fields
+        self.last_access = time.monotonic()
+
+
+class FakeWapi:
+    """
+    In-memory infoblox objects and the logic of wapi requests. It is served over HTTP by FakeWapiServer but can be
+    called directly with its handle method.
+    """
+
+    def __init__(self, version: str = '2.9', latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, cursor_ttl: float = 300.0, max_cursors: int = 100):
+        """
+        :param version: the wapi version given in the api schema.
+        :param latency: time in seconds added to each request.
+        :param jitter: maximum random time in seconds added to the latency.
+        :param error_rate: probability between 0 and 1 that a request fails with error_status.
+        :param error_status: the HTTP status of random errors.
+        :param cursor_ttl: time in seconds after which an unused page id expires.
+        :param max_cursors: maximum number of page ids, the least recently used are removed first.
+        """
+        self.version = version
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.cursor_ttl = cursor_ttl
+        self.max_cursors = max_cursors
+        # number of handled requests by (method, object name)
+        self.request_counts: Counter = Counter()
+        self._lock = threading.RLock()
+        self._schemas: Dict[str, dict] = {}
+        self._fields: Dict[str, Dict[str, dict]] = {}
+        self._unique_fields: Dict[str, Tuple[str, ...]] = {}
+        self._functions: Dict[Tuple[str, str], FakeFunction] = {}
+        self._objects: Dict[str, Dict[str, dict]] = {}
+        # unique key of each object by object name
+        self._keys: Dict[str, Dict[tuple, str]] = {}
+        self._cursors: Dict[str, _Cursor] = {}
+        self._injected_errors: List[Tuple[int, Optional[str]]] = []
+        self._ref_counter = itertools.count(1)
+        self.add_schema('network', NETWORK_FIELDS, unique_fields=('network', 'network_view'),
+                        functions={'next_available_ip': next_available_ip})
+        self.add_schema('record:a', RECORD_A_FIELDS, unique_fields=('name', 'ipv4addr', 'view'))
+
+    @property
+    def supported_objects(self) -> List[str]:
+        return sorted(self._schemas)
+
+    def add_schema(self, name: str, fields: List[dict], unique_fields: Tuple[str, ...] = (),
+                   functions: Dict[str, FakeFunction] = None) -> None:
+        """
+        Adds or replaces an object type.
+        :param name: the object name, e.g. "network".
+        :param fields: schemas of fields and functions, see make_field and make_function_field.
+        :param unique_fields: fields whose values identify an object, creating a second object with the same values
+        fails.
+        :param functions: implementation of functions by name. A function receives the FakeWapi, the object name,
+        the object (None when the function is called on the object type) and the arguments, and returns the json
+        result. Functions declared in fields without implementation return an empty dict.
+        """
+        with self._lock:
+            self._schemas[name] = {
+                'cloud_additional_restrictions': [],
+                'fields': fields,
+                'restrictions': [],
+                'schema_version': '2',
+                'type': name,
+                'version': self.version,
+                'wapi_primitive': 'object'
+            }
+            self._fields[name] = {field['name']: field for field in fields}
+            self._unique_fields[name] = tuple(unique_fields)
+            self._objects.setdefault(name, {})
+            self._keys[name] = {}
+            for object_ref, data in self._objects[name].items():
+                self._add_key(name, object_ref, data)
+            for function_name, function in (functions or {}).items():
+                self._functions[(name, function_name)] = function
+
+    def _make_ref(self, name: str, data: dict) -> str:
+        identifier = base64.b64encode(f'{name}${next(self._ref_counter)}'.encode()).decode().rstrip('=')
+        standard_fields = [field['name'] for field in self._schemas[name]['fields'] if field['standard_field']]
+        label = '/'.join(str(data[field]) for field in standard_fields if field in data)
+        return f'{name}/{identifier}:{label}'
+
+    def _get_key(self, name: str, data: dict) -> Optional[tuple]:
+        unique_fields = self._unique_fields[name]
+        if not unique_fields:
+            return None
+        return tuple(json.dumps(data.get(field), sort_keys=True) for field in unique_fields)
+
+    def _add_key(self, name: str, object_ref: str, data: dict) -> None:
+        key = self._get_key(name, data)
+        if key is None:
+            return
+        if self._keys[name].get(key, object_ref) != object_ref:
+            values = ', '.join(f'{field}={data.get(field)}' for field in self._unique_fields[name])
+            raise WapiError(400, 'Client.Ibap.Data.Conflict', f'The object {name} with {values} already exists.')
+        self._keys[name][key] = object_ref
+
+    def _check_object_name(self, name: str) -> None:
+        if name not in self._schemas:
+            raise _bad_request(f'Unknown object type ({name})')
+
+    def _check_data(self, name: str, data: Any, support: str) -> None:
+        if not isinstance(data, dict):
+            raise _bad_request('The data must be a json object')
+        fields = self._fields[name]
+        for field_name in data:
+            field = fields.get(field_name)
+            if field is None or field.get('wapi_primitive') == 'funccall':
+                raise _bad_request(f'Unknown argument/field: \'{field_name}\'')
+            if support not in field['supports']:
+                raise _bad_request(f'Field is not {"writable" if support == "w" else "updatable"}: {field_name}')
+
+    def add_objects(self, name: str, objects: Iterable[dict]) -> List[str]:
+        """
+        Stores objects without validating them and returns their references.
+        :param name: the object name.
+        :param objects: the object fields.
+        """
+        refs = []
+        with self._lock:
+            self._check_object_name(name)
+            store = self._objects[name]
+            for data in objects:
+                object_ref = self._make_ref(name, data)
+                self._add_key(name, object_ref, data)
+                store[object_ref] = data
+                refs.append(object_ref)
+        return refs
+
+    def get_objects(self, name: str) -> Dict[str, dict]:
+        """Returns a copy of the objects of a type by reference."""
+        with self._lock:
+            return dict(self._objects.get(name, {}))
+
+    def clear(self) -> None:
+        """Removes all objects and page ids."""
+        with self._lock:
+            for name in self._objects:
+                self._objects[name] = {}
+                self._keys[name] = {}
+            self._cursors.clear()
+
+    def inject_errors(self, count: int = 1, status_code: int = 503, method: str = None) -> None:
+        """
+        Makes the next requests fail.
+        :param count: the number of failing requests.
+        :param status_code: the HTTP status of the errors.
+        :param method: if given, only requests with this HTTP method fail.
+        """
+        with self._lock:
+            self._injected_errors.extend([(status_code, method)] * count)
+
+    def expire_cursors(self) -> None:
+        """Makes all page ids expire, like infoblox does after some time."""
+        with self._lock:
+            self._cursors.clear()
+
+    def _pop_error(self, method: str) -> Optional[WapiError]:
+        with self._lock:
+            for index, (status_code, error_method) in enumerate(self._injected_errors):
+                if error_method is None or error_method == method:
+                    del self._injected_errors[index]
+                    return WapiError(status_code, 'Server.Injected', 'Injected error')
+        if self.error_rate and random.random() < self.error_rate:
+            return WapiError(self.error_status, 'Server.Injected', 'Injected error')
+        return None
+
+    def handle(self, method: str, path: str, params: Dict[str, Any] = None, data: Any = None) -> Tuple[int, Json]:
+        """
+        Executes a wapi request and returns its HTTP status and json body.
+        :param method: the HTTP method.
+        :param path: the url path after the wapi version, e.g. "network" or "network/ZG5...:10.0.0.0/24/default".
+        :param params: the query string parameters, a list for a repeated parameter.
+        :param data: the decoded json body.
+        """
+        path = path.strip('/')
+        name = path.split('/')[0]
+        with self._lock:
+            self.request_counts[(method, name)] += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        error = self._pop_error(method)
+        try:
+            if error is not None:
+                raise error
+            return self._dispatch(method, path, params or {}, data)
+        except WapiError as e:
+            return e.status_code, e.to_dict()
+
+    def _dispatch(self, method: str, path: str, params: Dict[str, Any], data: Any) -> Tuple[int, Json]:
+        if not path:
+            if method != 'GET' or '_schema' not in params:
+                raise _bad_request('Only the schema can be requested on the wapi root')
+            return 200, self.get_api_schema()
+        if path == 'request':
+            if method != 'POST':
+                raise _bad_request('The request object only supports POST')
+            return 200, self.multiple_request(data)
+        name, _, rest = path.partition('/')
+        self._check_object_name(name)
+        object_ref = path if rest else None
+        if method == 'GET':
+            if '_schema' in params:
+                return 200, self._schemas[name]
+            if object_ref is not None:
+                return 200, self.read(object_ref, params)
+            return 200, self.search(name, params)
+        if method == 'POST':
+            if '_function' in params:
+                return 200, self.call_function(name, object_ref, params['_function'], data or {})
+            if object_ref is not None:
+                raise _bad_request('Objects are created on their type url')
+            return 201, self.create(name, data, params)
+        if object_ref is None:
+            raise _bad_request(f'{method} requires an object reference')
+        if method == 'PUT':
+            return 200, self.update(object_ref, data, params)
+        if method == 'DELETE':
+            return 200, self.delete(object_ref)
+        raise _bad_request(f'Unsupported method {method}')
+
+    def get_api_schema(self) -> dict:
+        return {
+            'requested_version': self.version,
+            'supported_objects': self.supported_objects,
+            'supported_versions': ['2.0', '2.5', '2.9', '2.10', self.version],
+            'schema_version': '2'
+        }
+
+    def _get_object(self, object_ref: str) -> Tuple[str, dict]:
+        name = object_ref.split('/')[0]
+        self._check_object_name(name)
+        data = self._objects[name].get(object_ref)
+        if data is None:
+            raise WapiError(404, 'Client.Ibap.Data.NotFound', f'Reference {object_ref} not found')
+        return name, data
+
+    def _get_return_fields(self, name: str, params: Dict[str, Any]) -> Tuple[str, ...]:
+        fields = self._fields[name]
+        standard_fields = [field_name for field_name, field in fields.items() if field['standard_field']]
+        if '_return_fields' in params:
+            return_fields = [item for item in str(params['_return_fields']).split(',') if item]
+        else:
+            plus = str(params.get('_return_fields+', ''))
+            return_fields = standard_fields + [item for item in plus.split(',') if item and item not in standard_fields]
+        for field_name in return_fields:
+            if field_name not in fields:
+                raise _bad_request(f'Unknown argument/field: \'{field_name}\'')
+        return tuple(return_fields)
+
+    @staticmethod
+    def _project(object_ref: str, data: dict, return_fields: Tuple[str, ...]) -> dict:
+        item = {'_ref': object_ref}
+        for field_name in return_fields:
+            if field_name in data:
+                item[field_name] = data[field_name]
+        return item
+
+    def read(self, object_ref: str, params: Dict[str, Any] = None) -> dict:
+        """Returns the object of a reference with the fields given by _return_fields parameters."""
+        with self._lock:
+            name, data = self._get_object(object_ref)
+            return self._project(object_ref, data, self._get_return_fields(name, params or {}))
+
+    def _get_query(self, name: str, params: Dict[str, Any]) -> LocalQuery:
+        search_params = {}
+        fields = self._fields[name]
+        for key, value in params.items():
+            if key in CONTROL_PARAMETERS:
+                continue
+            if key.startswith('_'):
+                raise _bad_request(f'Unknown argument/field: \'{key}\'')
+            if not key.startswith('*'):
+                field_name, modifiers = parse_search_key(key)
+                field = fields.get(field_name)
+                if field is None or 's' not in field['supports']:
+                    raise _bad_request(f'Field is not searchable: {field_name}')
+                searchable_by = field.get('searchable_by', '')
+                for modifier in modifiers:
+                    if modifier != '!' and modifier not in searchable_by:
+                        raise _bad_request(f'Search modifier {modifier} is not supported by {field_name}')
+            search_params[key] = value
+        try:
+            return LocalQuery(search_params)
+        except BadParameterError as e:
+            raise _bad_request(str(e))
+
+    def _remove_old_cursors(self) -> None:
+        now = time.monotonic()
+        for page_id, cursor in list(self._cursors.items()):
+            if now - cursor.last_access > self.cursor_ttl:
+                del self._cursors[page_id]
+        while len(self._cursors) >= self.max_cursors:
+            oldest = min(self._cursors, key=lambda item: self._cursors[item].last_access)
+            del self._cursors[oldest]
+
+    def _get_page(self, cursor: _Cursor, size: int) -> dict:
+        page = []
+        for object_ref, data in itertools.islice(cursor.objects, size):
+            page.append(self._project(object_ref, data, cursor.return_fields))
+        result = {'result': page}
+        # we check if there are remaining objects without losing one
+        following = next(cursor.objects, None)
+        if following is not None:
+            cursor.objects = itertools.chain([following], cursor.objects)
+            cursor.last_access = time.monotonic()
+            page_id = secrets.token_urlsafe(24)
+            self._cursors[page_id] = cursor
+            result['next_page_id'] = page_id
+        return result
+
+    def search(self, name: str, params: Dict[str, Any]) -> Json:
+        """
+        Returns objects matching search parameters, with the semantics of _max_results, _paging, _page_id and
+        _return_as_object parameters.
+        """
+        with self._lock:
+            if '_page_id' in params:
+                cursor = self._cursors.pop(str(params['_page_id']), None)
+                if cursor is None:
+                    raise _bad_request('Page id is not valid or has expired')
+                return self._get_page(cursor, abs(int(params.get('_max_results', DEFAULT_MAX_RESULTS))))
+
+            return_fields = self._get_return_fields(name, params)
+            query = self._get_query(name, params)
+            try:
+                max_results = int(params.get('_max_results', DEFAULT_MAX_RESULTS))
+            except ValueError:
+                raise _bad_request(f'Invalid value for _max_results: {params["_max_results"]}')
+            # a snapshot of references, so that the store can change while pages are read
+            objects = ((object_ref, data) for object_ref, data in list(self._objects[name].items())
+                       if query.match(data))
+            if str(params.get('_paging', '0')) == '1':
+                if str(params.get('_return_as_object', '0')) != '1':
+                    raise _bad_request('_return_as_object must be set to 1 for paging requests')
+                self._remove_old_cursors()
+                return self._get_page(_Cursor(objects, return_fields), abs(max_results))
+
+            results = [self._project(object_ref, data, return_fields)
+                       for object_ref, data in itertools.islice(objects, abs(max_results) + 1)]
+            if len(results) > abs(max_results):
+                if max_results > 0:
+                    raise _bad_request(f'Result set too large (> {max_results})')
+                results.pop()
+            return {'result': results} if str(params.get('_return_as_object', '0')) == '1' else results
+
+    def create(self, name: str, data: Any, params: Dict[str, Any] = None) -> Json:
+        """Stores a new object and returns its reference, or the object if _return_fields parameters are given."""
+        params = params or {}
+        with self._lock:
+            self._check_object_name(name)
+            self._check_data(name, data, 'w')
+            object_ref = self._make_ref(name, data)
+            self._add_key(name, object_ref, data)
+            self._objects[name][object_ref] = dict(data)
+            if '_return_fields' in params or '_return_fields+' in params:
+                return self.read(object_ref, params)
+            return object_ref
+
+    def update(self, object_ref: str, data: Any, params: Dict[str, Any] = None) -> Json:
+        """Updates an object and returns its reference, or the object if _return_fields parameters are given."""
+        params = params or {}
+        with self._lock:
+            name, old_data = self._get_object(object_ref)
+            self._check_data(name, data, 'u')
+            new_data = {**old_data, **data}
+            old_key = self._get_key(name, old_data)
+            if old_key is not None:
+                del self._keys[name][old_key]
+            try:
+                self._add_key(name, object_ref, new_data)
+            except WapiError:
+                self._add_key(name, object_ref, old_data)
+                raise
+            self._objects[name][object_ref] = new_data
+            if '_return_fields' in params or '_return_fields+' in params:
+                return self.read(object_ref, params)
+            return object_ref
+
+    def delete(self, object_ref: str) -> str:
+        """Removes an object and returns its reference."""
+        with self._lock:
+            name, data = self._get_object(object_ref)
+            key = self._get_key(name, data)
+            if key is not None:
+                del self._keys[name][key]
+            del self._objects[name][object_ref]
+            return object_ref
+
+    def call_function(self, name: str, object_ref: Optional[str], function_name: str, arguments: Any) -> Json:
+        """Calls a function of an object or an object type and returns its result."""
+        with self._lock:
+            field = self._fields[name].get(function_name)
+            if field is None or field.get('wapi_primitive') != 'funccall':
+                raise _bad_request(f'Function {function_name} is not valid for this object')
+            if not isinstance(arguments, dict):
+                raise _bad_request('The arguments must be a json object')
+            input_fields = {item['name'] for item in field['schema']['input_fields']}
+            for argument in arguments:
+                if argument not in input_fields:
+                    raise _bad_request(f'Unknown argument/field: \'{argument}\'')
+            data = self._get_object(object_ref)[1] if object_ref is not None else None
+            function = self._functions.get((name, function_name))
+            return function(self, name, data, arguments) if function is not None else {}
+
+    def multiple_request(self, data: Any) -> Json:
+        """
+        Executes the operations of a request object and returns their results. The first error stops the execution
+        and is returned.
+        """
+        operations = data if isinstance(data, list) else [data]
+        results = []
+        for operation in operations:
+            if not isinstance(operation, dict) or 'method' not in operation or 'object' not in operation:
+                raise _bad_request('Each operation of a request must have a method and an object')
+            status_code, result = self._dispatch(operation['method'].upper(), operation['object'].strip('/'),
+                                                 operation.get('args', {}), operation.get('data', {}))
+            if not operation.get('discard', False):
+                results.append(result)
+        return results if isinstance(data, list) else results[0]
+
+
+def next_available_ip(wapi: FakeWapi, name: str, network: Optional[dict], arguments: dict) -> dict:
+    """Returns free addresses of a network, addresses of A records being used."""
+    if network is None:
+        raise _bad_request('next_available_ip must be called on a network')
+    num = int(arguments.get('num', 1))
+    excluded = set(arguments.get('exclude', []))
+    excluded.update(record.get('ipv4addr') for record in wapi.get_objects('record:a').values())
+    ips = []
+    for address in ipaddress.ip_network(network['network'], strict=False).hosts():
+        if str(address) not in excluded:
+            ips.append(str(address))
+            if len(ips) == num:
+                break
+    if len(ips) < num:
+        raise _bad_request(f'Cannot find {num} available IP addresses in this network')
+    return {'ips': ips}
+
+
+def make_networks(count: int, network_view: str = 'default', prefix_length: int = 29) -> Iterator[dict]:
+    """
+    Yields synthetic networks carved from 10.0.0.0/8, with a comment and a Site extensible attribute.
+    :param count: the number of networks.
+    :param network_view: the network view of networks.
+    :param prefix_length: the prefix length of networks, it bounds the number of networks.
+    """
+    first_address = int(ipaddress.IPv4Address('10.0.0.0'))
+    size = 2 ** (32 - prefix_length)
+    if count > 2 ** (prefix_length - 8):
+        raise ValueError(f'10.0.0.0/8 contains less than {count} networks of length {prefix_length}')
+    # extensible attributes are shared between objects to save memory
+    extattrs = [{'Site': {'value': site}} for site in SITES]
+    for index in range(count):
+        address = ipaddress.IPv4Address(first_address + index * size)
+        yield {'network': f'{address}/{prefix_length}', 'network_view': network_view, 'comment': f'network {index}',
+               'extattrs': extattrs[index % len(extattrs)]}
+
+
+class _WapiRequestHandler(BaseHTTPRequestHandler):
+    # keep-alive connections, like infoblox
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, without it delayed ACKs add 40ms to some responses
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status_code: int, data: Json) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        match = WAPI_PREFIX_REGEX.match(parts.path)
+        if match is None:
+            self._send_json(404, WapiError(404, 'Client.Ibap.Proto', 'Not a wapi url').to_dict())
+            return
+        params: Dict[str, Any] = {}
+        for key, value in parse_qsl(parts.query, keep_blank_values=True):
+            if key in params:
+                previous = params[key]
+                params[key] = [*previous, value] if isinstance(previous, list) else [previous, value]
+            else:
+                params[key] = value
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            self._send_json(400, _bad_request('The body is not valid json').to_dict())
+            return
+        status_code, result = self.server.wapi.handle(self.command, unquote(parts.path[match.end():]), params, data)
+        self._send_json(status_code, result)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, *args) -> None:
+        # benchmarks send many requests, we don't write them on stderr
+        pass
+
+
+class FakeWapiServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server exposing a FakeWapi, each request is handled in its own thread."""
+    daemon_threads = True
+
+    def __init__(self, wapi: FakeWapi = None, address: str = '127.0.0.1', port: int = 0):
+        """
+        :param wapi: the served FakeWapi, by default a new one without objects.
+        :param address: the listening address.
+        :param port: the listening port, 0 to let the system choose a free port.
+        """
+        self.wapi = wapi if wapi is not None else FakeWapi()
+        super().__init__((address, port), _WapiRequestHandler)
+
+    @property
+    def url(self) -> str:
+        """The wapi url to give to Client."""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/wapi/v{self.wapi.version}'
+
+    def stop(self) -> None:
+        """Stops a server started with start_fake_wapi."""
+        self.shutdown()
+        self.server_close()
+
+
+def start_fake_wapi(wapi: FakeWapi = None, address: str = '127.0.0.1', port: int = 0) -> FakeWapiServer:
+    """
+    Starts a FakeWapiServer in a background thread and returns it, call its stop method to stop it.
+    The description of parameters is the same as that of FakeWapiServer.
+    """
+    server = FakeWapiServer(wapi, address, port)
+    # a short poll interval makes stop fast, tests start and stop many servers
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, name='infoblox-fake-wapi',
+                              daemon=True)
+    thread.start()
+    return server
+
+
+@click.command(context_settings={'help_option_names': ['-h', '--help']})
+@click.option('--address', default='127.0.0.1', show_default=True, help='Listening address.')
+@click.option('--port', type=int, default=8080, show_default=True, help='Listening port.')
+@click.option('--networks', type=click.IntRange(min=0), default=0, show_default=True,
+              help='Number of synthetic networks created at startup.')
+@click.option('--latency', type=click.FloatRange(min=0), default=0.0, show_default=True,
+              help='Time in seconds added to each request.')
+@click.option('--jitter', type=click.FloatRange(min=0), default=0.0, show_default=True,
+              help='Maximum random time in seconds added to the latency.')
+@click.option('--error-rate', type=click.FloatRange(0, 1), default=0.0, show_default=True,
+              help='Probability that a request fails with a 503 error.')
+def main(address, port, networks, latency, jitter, error_rate):
+    """Serves a fake infoblox wapi keeping objects in memory. Any user and password are accepted."""
+    wapi = FakeWapi(latency=latency, jitter=jitter, error_rate=error_rate)
+    wapi.add_objects('network', make_networks(networks))
+    server = FakeWapiServer(wapi, address, port)
+    click.echo(f'Serving a fake wapi on {server.url}, use it with: IB_URL={server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""Tracing spans of client operations, exported in memory or to OpenTelemetry."""
+import secrets
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Span:
+    """A timed operation of the client with its attributes, children spans have the same trace id."""
+
+    def __init__(self, name: str, trace_id: str, span_id: str, parent_id: str = None, attributes: dict = None,
+                 start_time: float = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        # timestamps in seconds since the epoch
+        self.start_time = start_time if start_time is not None else time.time()
+        self.end_time: float = None
+        self.events: List[Tuple[str, float, Dict[str, Any]]] = []
+        self.error: str = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: dict = None) -> None:
+        """Records something which happened at a given time of the span, e.g. a retry."""
+        self.events.append((name, time.time(), dict(attributes or {})))
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'attributes': self.attributes,
+            'events': [{'name': name, 'time': timestamp, 'attributes': attributes}
+                       for name, timestamp, attributes in self.events],
+            'error': self.error
+        }
+
+    def __repr__(self) -> str:
+        return f'<Span {self.name} trace_id={self.trace_id} span_id={self.span_id} parent_id={self.parent_id}>'
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list, useful for tests and debugging."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def get_spans(self, name: str = None) -> List[Span]:
+        """
+        Returns finished spans in the order they ended.
+        :param name: if given, only spans with this name are returned.
+        """
+        with self._lock:
+            return [span for span in self._spans if name is None or span.name == name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class Tracer:
+    """
+    Creates spans and sends finished ones to an exporter. A span started in a thread is by default a child of the
+    active span of this thread.
+    """
+
+    def __init__(self, exporter=None):
+        """
+        :param exporter: object with an export method receiving finished spans, e.g. an InMemoryExporter.
+        """
+        self._exporter = exporter
+        self._local = threading.local()
+
+    @property
+    def exporter(self):
+        return self._exporter
+
+    def _get_stack(self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @property
+    def current_span(self) -> Optional[Span]:
+        """The active span of the current thread."""
+        stack = self._get_stack()
+        return stack[-1] if stack else None
+
+    def start_span(self, name: str, attributes: dict = None, parent: Span = None, start_time: float = None) -> Span:
+        """
+        Starts a span without activating it.
+        :param name: the span name.
+        :param attributes: the span attributes.
+        :param parent: the parent span, by default the active span of the current thread.
+        :param start_time: the start timestamp, by default now.
+        """
+        parent = parent or self.current_span
+        trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        span = Span(name, trace_id, secrets.token_hex(8), parent.span_id if parent is not None else None, attributes,
+                    start_time)
+        self._on_start(span, parent)
+        return span
+
+    def end_span(self, span: Span, end_time: float = None, error: BaseException = None) -> None:
+        """
+        Ends a span and exports it.
+        :param span: the span to end.
+        :param end_time: the end timestamp, by default now.
+        :param error: the error which ended the operation, if any.
+        """
+        span.end_time = end_time if end_time is not None else time.time()
+        if error is not None:
+            span.error = f'{type(error).__name__}: {error}'
+        self._on_end(span)
+        if self._exporter is not None:
+            self._exporter.export(span)
+
+    def activate(self, span: Span) -> None:
+        """Makes a span the parent of spans started next in the current thread."""
+        self._get_stack().append(span)
+
+    def deactivate(self, span: Span) -> None:
+        stack = self._get_stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def record_span(self, name: str, start_time: float, end_time: float, attributes: dict = None) -> Span:
+        """Creates and ends a child of the active span for an operation already finished."""
+        span = self.start_span(name, attributes, start_time=start_time)
+        self.end_span(span, end_time)
+        return span
+
+    def _on_start(self, span: Span, parent: Optional[Span]) -> None:
+        """Called when a span is started, subclasses can override it."""
+
+    def _on_end(self, span: Span) -> None:
+        """Called when a span is ended before its export, subclasses can override it."""
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Tracer mirroring spans to OpenTelemetry, spans without infoblox parent are children of the current OpenTelemetry
+    span. It requires the opentelemetry-api package (pip install ib-client[opentelemetry]).
+    """
+
+    def __init__(self, tracer=None, exporter=None):
+        """
+        :param tracer: the OpenTelemetry tracer, by default the one of the global tracer provider.
+        :param exporter: optional exporter also receiving finished spans.
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError('opentelemetry-api must be installed to use OpenTelemetryTracer, you can install it'
+                              ' with: pip install ib-client[opentelemetry]')
+        super().__init__(exporter)
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer('infoblox')
+        self._lock = threading.Lock()
+        # OpenTelemetry spans by span id
+        self._spans: Dict[str, Any] = {}
+
+    def _on_start(self, span: Span, parent: Optional[Span]) -> None:
+        with self._lock:
+            parent_span = self._spans.get(parent.span_id) if parent is not None else None
+        context = self._trace.set_span_in_context(parent_span) if parent_span is not None else None
+        otel_span = self._tracer.start_span(span.name, context=context, attributes=span.attributes,
+                                            start_time=int(span.start_time * 1e9))
+        with self._lock:
+            self._spans[span.span_id] = otel_span
+
+    def _on_end(self, span: Span) -> None:
+        with self._lock:
+            otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        otel_span.set_attributes(span.attributes)
+        for name, timestamp, attributes in span.events:
+            otel_span.add_event(name, attributes, timestamp=int(timestamp * 1e9))
+        if span.error is not None:
+            from opentelemetry.trace import Status, StatusCode
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        otel_span.end(end_time=int(span.end_time * 1e9))
@@ -0,0 +1,91 @@
+"""Validation of many object payloads, in parallel processes for big inputs."""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from .exceptions import BadParameterError
+from .resource import Resource
+from .types import Schema
+
+# resources built by a worker process, by object name
+_worker_resources: Dict[str, Resource] = {}
+
+
+class PayloadErrors(NamedTuple):
+    """Errors found in the payload read at a given line."""
+    line: int
+    errors: List[str]
+
+
+def _validate_chunk(resource: Resource, chunk: List[Tuple[int, Any]], operation: str) -> List[PayloadErrors]:
+    results = []
+    for line, payload in chunk:
+        if isinstance(payload, Exception):
+            results.append(PayloadErrors(line, [str(payload)]))
+            continue
+        errors = resource.validate(payload, operation)
+        if errors:
+            results.append(PayloadErrors(line, errors))
+    return results
+
+
+def _validate_worker_chunk(name: str, schema: Schema, chunk: List[Tuple[int, Any]],
+                           operation: str) -> List[PayloadErrors]:
+    # the schema is sent with each chunk, ProcessPoolExecutor has no initializer in python 3.6
+    if name not in _worker_resources:
+        _worker_resources[name] = Resource(None, None, name, schema=schema)
+    return _validate_chunk(_worker_resources[name], chunk, operation)
+
+
+def _iter_chunks(payloads: Iterable[Tuple[int, Any]], chunk_size: int) -> Iterator[List[Tuple[int, Any]]]:
+    iterator = iter(payloads)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_payloads(resource: Resource, payloads: Iterable[Tuple[int, Any]], operation: str = 'create',
+                      processes: int = None, chunk_size: int = 1000) -> Iterator[PayloadErrors]:
+    """
+    Checks payloads of creations or updates like Resource.validate does and yields the errors of invalid payloads in
+    input order. No request is sent to infoblox, so the resource can be built offline from a schema.
+    When there are more payloads than chunk_size, chunks are validated by a pool of processes.
+    :param resource: the Resource object of the payloads.
+    :param payloads: iterable of (line number, payload) tuples. An exception can be given instead of a payload to
+    report an input error at this line.
+    :param operation: "create" or "update".
+    :param processes: number of processes, by default the number of processors. With 1, payloads are validated in
+    the current process.
+    :param chunk_size: number of payloads validated at once by a process.
+    """
+    if operation not in ('create', 'update'):
+        raise BadParameterError(f'operation must be create or update but you provide {operation}')
+    if processes is not None and (not isinstance(processes, int) or processes < 1):
+        raise BadParameterError(f'processes must be a positive integer but you provide {processes}')
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise BadParameterError(f'chunk_size must be a positive integer but you provide {chunk_size}')
+
+    chunks = _iter_chunks(payloads, chunk_size)
+    # we read two chunks to know if starting processes is worth it
+    first_chunks = list(islice(chunks, 2))
+    chunks = chain(first_chunks, chunks)
+    if processes == 1 or len(first_chunks) < 2:
+        for chunk in chunks:
+            yield from _validate_chunk(resource, chunk, operation)
+        return
+
+    processes = processes or os.cpu_count() or 1
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for chunk in chunks:
+            pending.append(executor.submit(_validate_worker_chunk, resource.name, resource.documentation, chunk,
+                                           operation))
+            # we bound the number of chunks held in memory
+            while len(pending) > 2 * processes:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -29,6 +29,14 @@ def tests(session):
         session.notify('codecov')
 
 
+@nox.session(python=PYTHON_VERSIONS[-1])
+def benchmarks(session):
+    """Runs the benchmark suite, extra arguments are given to the run command e.g. nox -s benchmarks -- -o out.json"""
+    session.install('poetry>=1.0.0,<2.0.0')
+    session.run('poetry', 'install')
+    session.run('python', '-m', 'benchmarks', 'run', *session.posargs)
+
+
 @nox.session
 def codecov(session):
     """Runs codecov command to share coverage information on codecov.io"""
@@ -1,4 +1,3 @@
-import os
 import tempfile
 
 import pytest
@@ -7,6 +6,7 @@ from click.testing import CliRunner
 
 from infoblox.client import Client
 from infoblox.resource import Resource
+from infoblox.testing import FakeWapi, start_fake_wapi
 
 
 @pytest.fixture(scope='session')
@@ -487,9 +487,6 @@ class MyResource(Resource):
                                                         schedule_warn_level, approval_comment, approval_query_mode,
                                                         approval_ticket_number)
 
-    def get_field_info_from_function_info(self, function_info, field_name, field_type):
-        return self._get_field_info_from_function_info(function_info, field_name, field_type)
-
 
 @pytest.fixture(scope='session')
 def url():
@@ -530,14 +527,15 @@ def env_vars():
 
 
 @pytest.fixture
-def env_settings(url, env_vars):
+def env_settings(url, env_vars, monkeypatch):
     """This fixture is useful for scripts testing."""
+    # monkeypatch restores environment variables after the test, so they don't leak in other tests
     for env_var in env_vars:
         if env_var == 'IB_URL':
             # the "/" at the end is to avoid an issue with responses fixture when we load the api schema
-            os.environ[env_var] = f'{url}/'
+            monkeypatch.setenv(env_var, f'{url}/')
         else:
-            os.environ[env_var] = 'foo'
+            monkeypatch.setenv(env_var, 'foo')
 
 
 @pytest.fixture
@@ -545,3 +543,29 @@ def tempdir():
     """Creates a temporary directory and returns its path for test purposes."""
     with tempfile.TemporaryDirectory() as temp_dir:
         yield temp_dir
+
+
+@pytest.fixture
+def loopback_passthru(responses):
+    """Lets real HTTP requests reach servers listening on loopback, like the fake wapi."""
+    responses.add_passthru('http://127.0.0.1')
+
+
+@pytest.fixture
+def fake_wapi():
+    """Fake wapi served by fake_wapi_server, modules override it to serve other objects."""
+    return FakeWapi()
+
+
+@pytest.fixture
+def fake_wapi_server(loopback_passthru, fake_wapi):
+    """Serves fake_wapi in a background thread, it is reached with real HTTP requests."""
+    server = start_fake_wapi(fake_wapi)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_client(fake_wapi_server):
+    """Client connected to fake_wapi_server."""
+    return Client(fake_wapi_server.url, user='admin', password='admin')
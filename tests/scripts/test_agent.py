@@ -0,0 +1,200 @@
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from click import ClickException
+
+from infoblox.scripts import cli, Container
+from infoblox.scripts.agent import AgentServer, forward, get_socket_path, is_private_socket, send_request, \
+    _can_forward
+
+pytestmark = pytest.mark.usefixtures('client', 'resource', 'env_settings')
+
+
+@pytest.fixture
+def socket_path(tempdir, monkeypatch):
+    path = os.path.join(tempdir, 'agent.sock')
+    monkeypatch.setenv('IB_AGENT_SOCKET', path)
+    return path
+
+
+@pytest.fixture
+def agent_server(socket_path):
+    server = AgentServer(socket_path, cli, Container)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.mark.parametrize(('args', 'expected'), [
+    (['objects'], True),
+    (['--format', 'json', 'object', '-n', 'network', 'get'], True),
+    (['--format', 'json', 'agent', 'status'], False),
+    (['shell'], False),
+    (['objects', '-h'], False),
+    (['batch', '-f', '-'], False),
+    (['batch', '-f', 'operations.ndjson'], False),
+    (['bench', '-d', '60'], False),
+    (['object', '-n', 'network', 'export', '--output', 'networks.ndjson'], False),
+    (['validate', '-n', 'network', '-f', 'payloads.ndjson'], False),
+    (['snapshot', 'sync', '-n', 'network'], False),
+    (['request', '-j', 'request.json'], False),
+    (['--profile', 'objects'], False),
+    ([], False),
+])
+def test_can_forward_function_excludes_local_commands(args, expected):
+    assert expected is _can_forward(args)
+
+
+def test_forward_function_returns_none_when_agent_is_not_running(socket_path):
+    assert forward(['objects']) is None
+
+
+def test_forward_function_returns_none_when_agent_is_disabled(monkeypatch, agent_server):
+    monkeypatch.setenv('IB_NO_AGENT', '1')
+
+    assert forward(['objects']) is None
+    assert 0 == agent_server.commands
+
+
+def test_socket_is_only_accessible_by_current_user(socket_path, agent_server):
+    assert 0o600 == stat.S_IMODE(os.stat(socket_path).st_mode)
+    assert is_private_socket(socket_path)
+
+
+@pytest.mark.parametrize(('variables', 'expected'), [
+    ({'IB_AGENT_SOCKET': '/foo/agent.sock', 'XDG_RUNTIME_DIR': '/run/user/1000'}, '/foo/agent.sock'),
+    ({'XDG_RUNTIME_DIR': '/run/user/1000'}, '/run/user/1000/ib-agent.sock'),
+])
+def test_get_socket_path_function_returns_private_path(monkeypatch, variables, expected):
+    monkeypatch.delenv('IB_AGENT_SOCKET', raising=False)
+    for name, value in variables.items():
+        monkeypatch.setenv(name, value)
+
+    assert expected == get_socket_path()
+
+
+def test_default_socket_is_created_in_a_private_directory(monkeypatch, tempdir):
+    monkeypatch.delenv('IB_AGENT_SOCKET', raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr('tempfile.tempdir', tempdir)
+    path = get_socket_path()
+
+    with AgentServer(path, cli, Container):
+        assert os.path.dirname(path) != tempdir
+        assert 0o700 == stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode)
+        assert is_private_socket(path)
+
+
+def test_agent_refuses_directory_writable_by_other_users(tempdir):
+    os.chmod(tempdir, 0o777)
+
+    with pytest.raises(ClickException) as exc_info:
+        AgentServer(os.path.join(tempdir, 'agent.sock'), cli, Container)
+
+    assert 'can be modified by other users' in str(exc_info.value)
+
+
+def test_forward_function_refuses_a_socket_which_is_not_private(capsys, socket_path, agent_server):
+    os.chmod(os.path.dirname(socket_path), 0o777)
+
+    assert forward(['objects']) is None
+    assert 'is not a socket of the current user in a private directory' in capsys.readouterr().err
+    assert 0 == agent_server.commands
+
+
+def test_forward_function_refuses_a_file_which_is_not_a_socket(capsys, socket_path):
+    with open(socket_path, 'w'):
+        pass
+
+    assert forward(['objects']) is None
+    assert 'is not a socket of the current user' in capsys.readouterr().err
+
+
+def test_forward_function_refuses_a_socket_of_another_user(mocker, capsys, socket_path, agent_server):
+    mocker.patch('os.getuid', return_value=os.getuid() + 1)
+
+    assert forward(['objects']) is None
+    assert 0 == agent_server.commands
+
+
+def test_agent_executes_commands_with_a_warm_client(capsys, responses, url, resource_name, agent_server):
+    responses.add(responses.GET, f'{url}/{resource_name}', json=[{'_ref': 'network/1'}], status=200)
+    responses.add(responses.GET, f'{url}/{resource_name}', json=[{'_ref': 'network/2'}], status=200)
+    calls = len(responses.calls)
+
+    assert 0 == forward(['object', '-n', 'network', 'get'])
+    assert 0 == forward(['object', '-n', 'network', 'get'])
+
+    output = capsys.readouterr().out
+    assert 'network/1' in output and 'network/2' in output
+    # api schema, network schema and two gets
+    assert 4 == len(responses.calls) - calls
+    assert {'sessions': 1, 'commands': 2} == {key: agent_server.status()[key] for key in ('sessions', 'commands')}
+
+
+def test_agent_uses_a_client_per_configuration(monkeypatch, capsys, agent_server):
+    assert 0 == forward(['objects'])
+    monkeypatch.setenv('IB_USER', 'bar')
+    assert 0 == forward(['objects'])
+
+    assert 2 == agent_server.status()['sessions']
+
+
+def test_agent_returns_error_output_and_exit_code(capsys, agent_server):
+    assert 2 == forward(['object', '-n', 'foo', 'get'])
+
+    assert 'foo is not a valid infoblox object' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(('args', 'option'), [
+    (['object', 'get'], '-n'),
+    (['object', '-n', 'network', 'delete'], '-o'),
+    (['object', '-n', 'network', 'func-call'], '-n'),
+])
+def test_agent_returns_error_instead_of_prompting_missing_options(capsys, agent_server, args, option):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        exit_code = executor.submit(forward, args).result(timeout=5)
+
+    assert 2 == exit_code
+    assert f"Missing option '{option}'" in capsys.readouterr().err
+
+
+def test_agent_does_not_change_its_working_directory(mocker, capsys, agent_server):
+    chdir = mocker.patch('os.chdir')
+
+    assert 0 == forward(['objects'])
+    chdir.assert_not_called()
+
+
+class TestAgentCommands:
+    def test_status_command_prints_agent_information(self, runner, socket_path, agent_server):
+        result = runner.invoke(cli, ['agent', 'status'])
+
+        assert 0 == result.exit_code
+        assert str(os.getpid()) in result.output
+
+    def test_status_command_prints_error_when_agent_is_not_running(self, runner, socket_path):
+        result = runner.invoke(cli, ['agent', 'status'])
+
+        assert 1 == result.exit_code
+        assert 'no agent is listening' in result.output
+
+    def test_stop_command_stops_the_agent(self, runner, socket_path, agent_server):
+        result = runner.invoke(cli, ['agent', 'stop'])
+
+        assert 0 == result.exit_code
+        assert 'agent stopped' in result.output
+        with pytest.raises(OSError):
+            send_request(socket_path, {'action': 'status'}, timeout=0.1)
+
+    def test_agent_commands_do_not_need_infoblox_settings(self, runner, socket_path, monkeypatch):
+        monkeypatch.delenv('IB_URL')
+        result = runner.invoke(cli, ['agent', 'status'])
+
+        assert 'environment variable must be set' not in result.output
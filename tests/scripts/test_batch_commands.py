@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from infoblox.scripts import cli
+from infoblox.scripts.utils import read_ndjson
+
+pytestmark = pytest.mark.usefixtures('client', 'resource', 'env_settings')
+
+
+@pytest.fixture
+def operations_file(tempdir):
+    path = os.path.join(tempdir, 'ops.ndjson')
+    with open(path, 'w') as f:
+        f.write('{"op": "get", "object": "network", "params": {"comment": "foo"}}\n')
+        f.write('\n')
+        f.write('{"op": "get", "ref": "network/1"\n')
+        f.write('{"op": "delete"}\n')
+    return path
+
+
+def test_read_ndjson_yields_line_numbers_and_parse_errors(operations_file):
+    with open(operations_file) as f:
+        operations = list(read_ndjson(f))
+
+    assert [1, 3, 4] == [line for line, _ in operations]
+    assert isinstance(operations[1][1], ValueError)
+    assert {'op': 'delete'} == operations[2][1]
+
+
+def test_command_writes_one_result_per_operation(runner, responses, url, resource_name, operations_file):
+    responses.add(responses.GET, f'{url}/{resource_name}', json=[{'_ref': 'network/1'}], status=200)
+    result = runner.invoke(cli, ['batch', '-f', operations_file, '-c', '2'])
+    results = [json.loads(line) for line in result.output.splitlines()]
+
+    assert 1 == result.exit_code
+    assert {'line': 1, 'ok': True, 'result': [{'_ref': 'network/1'}]} == results[0]
+    assert [3, 4] == [item['line'] for item in results[1:]]
+    assert not results[1]['ok'] and 'unable to parse json data' in results[1]['error']
+    assert {'line': 4, 'ok': False, 'error': 'object is missing for delete operation'} == results[2]
+
+
+def test_command_writes_results_in_output_file(runner, responses, url, resource_name, tempdir):
+    responses.add(responses.GET, f'{url}/{resource_name}', json=[{'_ref': 'network/1'}], status=200)
+    output = os.path.join(tempdir, 'results.ndjson')
+    result = runner.invoke(cli, ['batch', '-f', '-', '-o', output], input='{"op": "get", "object": "network"}\n')
+
+    assert 0 == result.exit_code
+    with open(output) as f:
+        assert [{'line': 1, 'ok': True, 'result': [{'_ref': 'network/1'}]}] == [json.loads(line) for line in f]
+
+
+def test_command_prints_error_when_concurrency_is_incorrect(runner, operations_file):
+    result = runner.invoke(cli, ['batch', '-f', operations_file, '-c', '0'])
+
+    assert 2 == result.exit_code
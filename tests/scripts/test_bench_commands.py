@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from infoblox.scripts import cli
+from infoblox.testing import FakeWapi, make_networks
+
+
+@pytest.fixture
+def fake_wapi():
+    wapi = FakeWapi()
+    wapi.add_objects('network', make_networks(20))
+    return wapi
+
+
+@pytest.fixture
+def env(fake_wapi_server):
+    return {'IB_URL': fake_wapi_server.url, 'IB_USER': 'admin', 'IB_PASSWORD': 'admin'}
+
+
+def test_command_prints_report(runner, env):
+    result = runner.invoke(cli, ['--format', 'json', 'bench', '-m', 'read=1,search=1', '-n', '10', '-c', '2'],
+                           env=env)
+    report = json.loads(result.output)
+
+    assert 0 == result.exit_code, result.output
+    assert 10 == report['total']['count']
+    assert {'read', 'search'} >= set(report['operations'])
+    assert {'min', 'mean', 'p50', 'p90', 'p95', 'p99', 'max'} == set(report['total']['latency'])
+
+
+@pytest.mark.parametrize(('args', 'message'), [
+    (['-m', 'read'], 'mix must be a comma-separated list of operation=weight but you provide read'),
+    (['-m', 'update=1'], 'operations must be in read, search, create, delete, func-call but you provide update'),
+])
+def test_command_prints_error_when_mix_is_incorrect(runner, env, args, message):
+    result = runner.invoke(cli, ['bench', *args], env=env)
+
+    assert 2 == result.exit_code
+    assert message in result.output
+
+
+@pytest.mark.parametrize(('args', 'duration', 'max_operations'), [
+    ([], 10.0, None),
+    (['-n', '5'], None, 5),
+    (['-n', '5', '-d', '2'], 2.0, 5),
+])
+def test_command_uses_default_duration_only_without_operations(runner, env, mocker, args, duration, max_operations):
+    generator_mock = mocker.patch('infoblox.scripts.bench_commands.LoadGenerator')
+    generator_mock.return_value.run.return_value.to_dict.return_value = {}
+    result = runner.invoke(cli, ['bench', *args], env=env)
+
+    assert 0 == result.exit_code, result.output
+    assert (duration, max_operations) == generator_mock.call_args[0][4:6]
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from infoblox.scripts import cli
+from tests.helpers import assert_in_output, assert_list_items
+
+pytestmark = pytest.mark.usefixtures('client', 'resource', 'env_settings')
+
+
+@pytest.fixture
+def cache_dir(tempdir, monkeypatch):
+    monkeypatch.setenv('IB_CACHE_DIR', tempdir)
+    return tempdir
+
+
+def test_refresh_command_caches_given_object_schemas(runner, cache_dir):
+    result = runner.invoke(cli, ['cache', 'refresh', '-n', 'network'])
+
+    assert_list_items(0, ['"objects": 1', 'schemas.json'], result)
+    assert os.path.isfile(os.path.join(cache_dir, 'schemas.json'))
+
+
+def test_refresh_command_prints_error_when_cache_cannot_be_written(runner, cache_dir, monkeypatch):
+    with open(os.path.join(cache_dir, 'file'), 'w'):
+        pass
+    monkeypatch.setenv('IB_CACHE_DIR', os.path.join(cache_dir, 'file'))
+    result = runner.invoke(cli, ['cache', 'refresh', '-n', 'network'])
+
+    assert_in_output(1, 'unable to write the cache', result)
+
+
+def test_clear_command_removes_cache_file(runner, cache_dir):
+    runner.invoke(cli, ['cache', 'refresh', '-n', 'network'])
+    result = runner.invoke(cli, ['cache', 'clear'])
+
+    assert 0 == result.exit_code
+    assert not os.path.exists(os.path.join(cache_dir, 'schemas.json'))
@@ -15,11 +15,8 @@ def test_cli_raises_error_if_env_variable_is_not_set(runner):
 
 @pytest.mark.usefixtures('env_settings')
 def test_cli_raises_error_when_requests_raises_connection_error(runner, mocker):
-    class CustomContainer:
-        def __init__(self):
-            raise ConnectionError
-
-    mocker.patch('infoblox.scripts.Container', new=CustomContainer)
+    # the client is created when a command first uses it
+    mocker.patch('infoblox.scripts.Client', side_effect=ConnectionError)
     result = runner.invoke(cli, ['objects'])
 
     assert_in_output(1, 'The remote server is unreachable', result)
@@ -37,10 +34,10 @@ def test_cli_raises_error_when_env_variable_is_incorrect(runner, mocker, env_var
 def test_cli_calls_function_handle_dot_env_file(mocker, runner):
     # we simulate a container with a client to prevent errors when the underlying call is performed:
     # context.obj.client.available_objects
-    Container = namedtuple('Container', ['client'])
+    Container = namedtuple('Container', ['client', 'close'])
     Client = namedtuple('Client', ['available_objects'])
     container_mock = mocker.patch('infoblox.scripts.Container')
-    container_mock.return_value = Container(client=Client(available_objects={'foo': 'bar'}))
+    container_mock.return_value = Container(client=Client(available_objects={'foo': 'bar'}), close=lambda: None)
 
     with runner.isolated_filesystem():
         with open('.env', 'w') as stream:
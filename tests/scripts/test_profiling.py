@@ -0,0 +1,79 @@
+import json
+import os
+import pstats
+
+import pytest
+
+from infoblox.instrumentation import Event
+from infoblox.scripts import cli
+from infoblox.scripts.profiling import Profiler
+
+
+class TestProfiler:
+    def test_phase_time_excludes_nested_phases_and_events(self, mocker):
+        perf_counter = mocker.patch('time.perf_counter')
+        perf_counter.side_effect = [0.0, 1.0, 2.0, 3.5, 10.0]
+        profiler = Profiler()
+        with profiler.phase('outer'):
+            with profiler.phase('inner'):
+                pass
+            profiler(Event('request', 'network', 'get', 0.25, {'method': 'GET', 'path': '/wapi/v2.9/network',
+                                                                 'status_code': 200}))
+
+        # outer lasts 9s, minus 1.5s for the inner phase and 0.25s for the request
+        assert {'inner': 1.5, 'outer': 7.25} == profiler.phases
+        assert [('GET', '/wapi/v2.9/network', 200, 0.25)] == profiler.requests
+
+    def test_report_contains_breakdown(self):
+        profiler = Profiler()
+        with profiler.phase('output rendering'):
+            profiler(Event('decode', 'network', 'get', 0.1, {}))
+            profiler(Event('page', 'network', 'get_multiple', 0.2, {}))
+        profiler.stop()
+
+        report = profiler.report()
+        for label in ('startup and imports (CPU time)', 'output rendering', 'validation (0)', 'HTTP requests (0)',
+                      'JSON decoding (1)', 'other command code', 'total'):
+            assert label in report
+        assert 'Slowest HTTP requests' not in report
+
+
+@pytest.mark.usefixtures('client', 'resource', 'env_settings')
+class TestProfileOption:
+    def test_profile_prints_phases_and_requests(self, runner, responses, url):
+        responses.add(responses.GET, f'{url}/network', json=[{'network': '10.2.0.0/16'}], status=200)
+        result = runner.invoke(cli, ['--profile', 'object', '-n', 'network', 'get'])
+
+        assert 0 == result.exit_code
+        assert '10.2.0.0/16' in result.output
+        for label in ('.env handling', 'client construction', 'object schema load', 'validation (1)',
+                      'HTTP requests (3)', 'JSON decoding (2)', 'output rendering',
+                      'Slowest HTTP requests (3 of 3)', '200 GET /wapi/v2.9/network'):
+            assert label in result.output
+
+    def test_profile_output_writes_chrome_trace(self, runner, tempdir):
+        path = os.path.join(tempdir, 'trace.json')
+        result = runner.invoke(cli, ['--profile-output', path, 'objects'])
+
+        assert 0 == result.exit_code
+        assert 'Profile of the command:' in result.output
+        with open(path) as f:
+            events = json.load(f)['traceEvents']
+        names = {event['name'] for event in events}
+        assert {'ib..env handling', 'ib.client construction', 'infoblox.http'} <= names
+        client_span = [event for event in events if event['name'] == 'ib.client construction'][0]
+        assert 'X' == client_span['ph']
+        assert client_span['dur'] > 0
+
+    def test_profile_output_writes_cprofile_stats(self, runner, tempdir):
+        path = os.path.join(tempdir, 'ib.prof')
+        result = runner.invoke(cli, ['--profile-output', path, 'objects'])
+
+        assert 0 == result.exit_code
+        assert pstats.Stats(path).total_calls > 0
+
+    def test_nothing_is_printed_without_profile(self, runner):
+        result = runner.invoke(cli, ['objects'])
+
+        assert 0 == result.exit_code
+        assert 'Profile of the command:' not in result.output
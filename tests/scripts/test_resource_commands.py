@@ -1,5 +1,8 @@
+import gzip
 import json
+import os
 from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlparse
 
 import pytest
 
@@ -160,6 +163,161 @@ class TestCountCommand:
         assert_in_output(2, 'authority is not searchable', result)
 
 
+class TestExportCommand:
+    @pytest.fixture
+    def networks(self):
+        return [{'_ref': f'network/{i}', 'network': f'192.168.{i}.0/24', 'comment': 'foo',
+                 'email_list': ['foo@bar.com']} for i in range(1, 4)]
+
+    def test_command_streams_ndjson_to_standard_output(self, runner, responses, url, resource_name, networks):
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '--quiet', '-p',
+                                     '{"network~": "192."}', '--page-size', '500'])
+
+        assert 0 == result.exit_code
+        assert networks == [json.loads(line) for line in result.output.splitlines()]
+        assert '_max_results=500' in responses.calls[-1].request.url
+
+    @pytest.mark.parametrize('compress', [False, True])
+    def test_command_writes_json_file(self, runner, tempdir, responses, url, resource_name, networks, compress):
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+        output = os.path.join(tempdir, 'networks.json')
+        options = ['--gzip'] if compress else []
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '-f', 'json', '--output', output,
+                                     *options])
+
+        assert_in_output(0, 'exported 3 objects', result)
+        with (gzip.open(output, 'rt') if compress else open(output)) as f:
+            assert networks == json.load(f)
+
+    def test_command_writes_csv_file_with_requested_columns(self, runner, tempdir, responses, url, resource_name,
+                                                          networks):
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+        output = os.path.join(tempdir, 'networks.csv')
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '-f', 'csv', '--output', output,
+                                     '--return-fields', 'network,email_list'])
+
+        assert 0 == result.exit_code
+        with open(output) as f:
+            assert ['_ref,network,email_list', 'network/1,192.168.1.0/24,"[""foo@bar.com""]"'] == \
+                   f.read().splitlines()[:2]
+
+    def test_command_uses_standard_fields_as_default_csv_columns(self, runner, responses, url, resource_name,
+                                                                 networks):
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '-f', 'csv', '--quiet'])
+
+        assert 0 == result.exit_code
+        assert '_ref,comment,network' == result.output.splitlines()[0]
+
+    @pytest.mark.parametrize('export_format', ['ndjson', 'csv', 'json'])
+    @pytest.mark.parametrize('partial_content', ['', '{"_ref": "network/3", "netw'])
+    def test_command_resumes_interrupted_export_at_the_saved_output_size(self, runner, tempdir, responses, url,
+                                                                        resource_name, network_schema, networks,
+                                                                        export_format, partial_content):
+        failures = [502]
+
+        def request_callback(request):
+            query = dict(parse_qsl(urlparse(request.url).query))
+            if '_schema' in query:
+                # the second run loads the schema again
+                return 200, {}, json.dumps(network_schema)
+            if query.get('_page_id') != 'page-2':
+                return 200, {}, json.dumps({'result': networks[:2], 'next_page_id': 'page-2'})
+            if failures:
+                return failures.pop(), {}, json.dumps({'error': 'oops'})
+            return 200, {}, json.dumps({'result': networks[2:]})
+
+        responses.add_callback(responses.GET, f'{url}/{resource_name}', callback=request_callback,
+                               content_type='application/json')
+        output = os.path.join(tempdir, f'networks.{export_format}')
+        checkpoint = os.path.join(tempdir, 'checkpoint.json')
+        arguments = ['object', '-n', resource_name, 'export', '-f', export_format, '--output', output, '--checkpoint',
+                     checkpoint, '--quiet', '--return-fields', 'network']
+
+        assert 1 == runner.invoke(cli, arguments).exit_code
+        assert os.path.isfile(checkpoint)
+        # a killed process may leave objects written after the last checkpoint
+        with open(output, 'a') as f:
+            f.write(partial_content)
+        assert 0 == runner.invoke(cli, arguments).exit_code
+
+        assert not os.path.exists(checkpoint)
+        with open(output) as f:
+            content = f.read()
+        if export_format == 'csv':
+            assert ['_ref,network', *[f'{item["_ref"]},{item["network"]}' for item in networks]] == \
+                   content.splitlines()
+        elif export_format == 'json':
+            assert networks == json.loads(content)
+        else:
+            assert networks == [json.loads(line) for line in content.splitlines()]
+
+    def test_command_flushes_output_before_saving_progress(self, runner, tempdir, responses, url, resource_name,
+                                                           networks):
+        def request_callback(request):
+            query = dict(parse_qsl(urlparse(request.url).query))
+            if query.get('_page_id') != 'page-2':
+                return 200, {}, json.dumps({'result': networks[:2], 'next_page_id': 'page-2'})
+            # the objects of the first page are on disk when its progress is saved
+            with open(output) as f:
+                assert networks[:2] == [json.loads(line) for line in f.read().splitlines()]
+            assert os.path.isfile(checkpoint)
+            return 200, {}, json.dumps({'result': networks[2:]})
+
+        responses.add_callback(responses.GET, f'{url}/{resource_name}', callback=request_callback,
+                               content_type='application/json')
+        output = os.path.join(tempdir, 'networks.ndjson')
+        checkpoint = os.path.join(tempdir, 'checkpoint.json')
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '--output', output, '--checkpoint',
+                                     checkpoint, '--quiet'])
+
+        assert 0 == result.exit_code, result.output
+
+    def test_command_raises_error_when_output_is_shorter_than_checkpoint(self, runner, tempdir, resource_name):
+        output = os.path.join(tempdir, 'networks.ndjson')
+        checkpoint = os.path.join(tempdir, 'checkpoint.json')
+        with open(output, 'w') as f:
+            f.write('{}\n')
+        with open(checkpoint, 'w') as f:
+            json.dump({'object': resource_name, 'query': {}, 'page_id': 'page-2', 'emitted': 2,
+                       'data': {'output_offset': 100}}, f)
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '--output', output, '--checkpoint',
+                                     checkpoint])
+
+        assert_in_output(1, 'remove the checkpoint to start the export again', result)
+        with open(output) as f:
+            assert '{}\n' == f.read()
+
+    def test_command_raises_error_when_checkpoint_is_given_with_gzip(self, runner, tempdir, resource_name):
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '--gzip', '--output',
+                                     os.path.join(tempdir, 'networks.ndjson.gz'), '--checkpoint',
+                                     os.path.join(tempdir, 'checkpoint.json')])
+
+        assert_in_output(2, '--checkpoint cannot be used with --gzip', result)
+
+    def test_command_raises_error_when_checkpoint_is_given_without_output(self, runner, tempdir, resource_name):
+        checkpoint = os.path.join(tempdir, 'checkpoint.json')
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '--checkpoint', checkpoint])
+
+        assert_in_output(2, '--checkpoint requires an --output file', result)
+
+    def test_command_prints_error_if_response_status_code_greater_or_equal_than_400(self, runner, tempdir, responses,
+                                                                                    url, resource_name):
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'error': 'oops'}, status=400)
+        output = os.path.join(tempdir, 'networks.ndjson')
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '--quiet', '--output', output])
+
+        assert_list_items(1, ['unable to export objects', 'oops'], result)
+        with open(output) as f:
+            assert '' == f.read()
+
+    def test_command_raises_error_when_other_intern_errors_happened(self, runner, resource_name):
+        result = runner.invoke(cli, ['object', '-n', resource_name, 'export', '-p', '{"authority": true}'])
+
+        assert_in_output(2, 'authority is not searchable', result)
+
+
 class TestFunctionCallCommand:
     @pytest.mark.parametrize('options', [
         ['-n', 'next_available_ip', '-a', '{"num":1}'],
@@ -0,0 +1,101 @@
+import json
+import os
+
+import click_completion.core
+import pytest
+
+from infoblox.scripts import cli
+from infoblox.scripts.schema_cache import complete_names, get_cache_path, load_schemas, refresh_schemas
+
+
+@pytest.fixture
+def cache_dir(tempdir, monkeypatch):
+    monkeypatch.setenv('IB_CACHE_DIR', tempdir)
+    return tempdir
+
+
+@pytest.fixture
+def cached_schemas(cache_dir, monkeypatch, url):
+    monkeypatch.setenv('IB_URL', f'{url}/')
+    schemas = {
+        url: {
+            'objects': ['network', 'record:a', 'record:host'],
+            'fields': {'network': ['comment', 'network', 'network_view']},
+            'functions': {'network': ['next_available_ip', 'next_available_network']}
+        }
+    }
+    with open(os.path.join(cache_dir, 'schemas.json'), 'w') as f:
+        json.dump(schemas, f)
+    return schemas[url]
+
+
+def test_get_cache_path_function_uses_environment_variable(cache_dir):
+    assert os.path.join(cache_dir, 'schemas.json') == get_cache_path()
+
+
+class TestLoadSchemas:
+    def test_function_returns_empty_dict_when_nothing_is_cached(self, cache_dir):
+        assert {} == load_schemas('http://foo/wapi/v2.9')
+
+    def test_function_returns_schemas_of_given_url(self, cached_schemas):
+        assert cached_schemas == load_schemas()
+
+    def test_function_returns_schemas_of_single_cached_url(self, cached_schemas, monkeypatch):
+        monkeypatch.delenv('IB_URL')
+
+        assert cached_schemas == load_schemas()
+
+
+class TestRefreshSchemas:
+    def test_function_caches_names_of_all_objects(self, responses, url, cache_dir, client, resource, monkeypatch,
+                                                  fileop_schema):
+        monkeypatch.setenv('IB_URL', url)
+        responses.add(responses.GET, f'{url}/fileop', json=fileop_schema, status=200)
+        responses.add(responses.GET, f'{url}/ipv4address', json={'Error': 'oops'}, status=400)
+        # we don't want to describe all objects
+        mocked_objects = ['network', 'fileop', 'ipv4address']
+        monkeypatch.setattr(type(client), 'available_objects', property(lambda _: mocked_objects))
+
+        result = refresh_schemas(client)
+
+        assert {'path': get_cache_path(), 'objects': 2} == {key: result[key] for key in ('path', 'objects')}
+        assert 1 == len(result['errors']) and result['errors'][0].startswith('ipv4address')
+        schemas = load_schemas(url)
+        assert mocked_objects == schemas['objects']
+        assert 'comment' in schemas['fields']['network']
+        assert 'next_available_ip' in schemas['functions']['network']
+        assert 'uploadinit' in schemas['functions']['fileop']
+
+    def test_function_keeps_other_objects_when_names_are_given(self, url, cached_schemas, client, resource):
+        cached_schemas['fields'] = {'network': ['foo'], 'fileop': ['bar']}
+        with open(get_cache_path(), 'w') as f:
+            json.dump({url: cached_schemas}, f)
+
+        refresh_schemas(client, ['network'])
+
+        fields = load_schemas()['fields']
+        assert 'comment' in fields['network']
+        assert ['bar'] == fields['fileop']
+
+
+class TestCompletion:
+    def test_complete_names_function_returns_matching_names(self, cached_schemas):
+        assert ['record:a', 'record:host'] == complete_names('objects', incomplete='rec')
+        assert ['network', 'network_view'] == complete_names('fields', 'network', 'net')
+        assert [] == complete_names('functions', 'foo', '')
+
+    def test_complete_names_function_returns_nothing_when_cache_is_missing(self, cache_dir):
+        assert [] == complete_names('objects')
+
+    @pytest.mark.parametrize(('args', 'incomplete', 'expected'), [
+        (['object', '-n'], 'record:h', ['record:host']),
+        (['object', '-n', 'network', 'field-info', '-n'], 'comm', ['comment']),
+        (['object', '-n', 'network', 'func-call', '-n'], 'next_available_n', ['next_available_network']),
+        (['snapshot', 'sync', '-n'], 'net', ['network']),
+    ])
+    def test_cli_options_are_completed_from_cache(self, responses, cached_schemas, args, incomplete, expected):
+        choices = click_completion.core.get_choices(cli, 'ib', args, incomplete)
+
+        assert expected == [choice for choice, _ in choices]
+        # completion does not contact infoblox
+        assert 0 == len(responses.calls)
@@ -0,0 +1,94 @@
+import pytest
+import requests
+
+from infoblox.scripts import cli, Container
+from infoblox.scripts.shell import ShellCompleter, run_command
+
+pytestmark = pytest.mark.usefixtures('client', 'resource', 'env_settings')
+
+
+@pytest.fixture
+def container():
+    return Container()
+
+
+@pytest.fixture
+def completer(container):
+    return ShellCompleter(cli, container)
+
+
+class TestShellCommand:
+    def test_command_runs_commands_with_the_same_client(self, runner, responses, url, resource_name):
+        responses.add(responses.GET, f'{url}/{resource_name}', json=[{'_ref': 'network/1'}], status=200)
+        responses.add(responses.GET, f'{url}/{resource_name}', json=[{'_ref': 'network/2'}], status=200)
+        commands = ['objects', 'object -n network get', 'object -n network get', 'exit']
+        result = runner.invoke(cli, ['shell'], input='\n'.join(commands) + '\n')
+
+        assert 0 == result.exit_code
+        assert 'fileop' in result.output
+        assert 'network/1' in result.output and 'network/2' in result.output
+        # the api schema and the network schema are loaded once by the shell and once by the client and resource
+        # fixtures
+        schema_calls = [call for call in responses.calls if '_schema' in call.request.url]
+        assert 4 == len(schema_calls)
+
+    def test_command_continues_after_errors(self, runner):
+        commands = ['object -n foo get', 'unknown', 'object -n network get -p "{', 'shell', '', 'objects']
+        result = runner.invoke(cli, ['shell'], input='\n'.join(commands) + '\n')
+
+        assert 0 == result.exit_code
+        assert 'foo is not a valid infoblox object' in result.output
+        assert 'No such command' in result.output
+        assert 'No closing quotation' in result.output
+        assert 'you are already in the shell' in result.output
+        assert 'fileop' in result.output
+
+    @pytest.mark.parametrize(('error', 'message'), [
+        (requests.ConnectionError('connection refused'), 'Error: connection refused'),
+        (KeyError('foo'), "Error: unexpected KeyError: 'foo'")
+    ])
+    def test_command_continues_after_unexpected_errors(self, mocker, runner, error, message):
+        mocker.patch('infoblox.scripts.Container.get_resource', side_effect=error)
+        commands = ['object -n network fields', 'objects']
+        result = runner.invoke(cli, ['shell'], input='\n'.join(commands) + '\n')
+
+        assert 0 == result.exit_code
+        assert message in result.output
+        assert 'fileop' in result.output
+
+    def test_run_command_function_uses_given_container(self, mocker, container):
+        mocker.patch.object(container, 'get_resource', side_effect=container.get_resource)
+        run_command(cli, container, 'object -n network fields')
+        run_command(cli, container, 'object -n network functions')
+
+        assert 2 == container.get_resource.call_count
+        assert ['network'] == list(container._resources)
+
+
+class TestShellCompleter:
+    @pytest.mark.parametrize(('line', 'expected'), [
+        ('', None),
+        ('ob', ['object', 'objects']),
+        ('object -n network f', ['field-info', 'fields', 'func-call', 'func-info', 'functions']),
+        ('object --', ['--help', '--name']),
+        ('object -n network get --return-', ['--return-fields', '--return-fields-plus']),
+    ])
+    def test_method_completes_commands_and_options(self, completer, line, expected):
+        candidates = completer.candidates(line)
+
+        if expected is None:
+            assert {'object', 'objects', 'exit', 'quit', 'batch'} <= set(candidates)
+        else:
+            assert expected == candidates
+
+    def test_method_completes_object_names(self, completer):
+        assert ['ipv4address', 'ipv6address', 'ipv6network', 'ipv6networkcontainer', 'ipv6range'] == \
+            completer.candidates('object -n ip')
+
+    def test_method_completes_field_and_function_names(self, completer):
+        assert ['comment'] == completer.candidates('object -n network field-info -n comm')
+        assert ['next_available_ip'] == completer.candidates('object -n network func-call -n next')
+        assert ['network,comment'] == completer.candidates('object -n network get --return-fields network,comm')
+
+    def test_method_returns_nothing_for_unknown_object(self, completer):
+        assert [] == completer.candidates('object -n foo field-info -n ')
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from infoblox.scripts import cli
+from tests.helpers import assert_in_output, assert_list_items
+
+pytestmark = pytest.mark.usefixtures('client', 'resource', 'env_settings')
+
+
+@pytest.fixture
+def database(tempdir):
+    return os.path.join(tempdir, 'grid.db')
+
+
+@pytest.fixture
+def synced_database(runner, responses, url, resource_name, database):
+    networks = [{'_ref': f'network/{i}', 'network': f'10.{i}.0.0/16', 'comment': 'foo'} for i in range(1, 4)]
+    responses.add(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+    result = runner.invoke(cli, ['snapshot', '-d', database, 'sync', '-n', resource_name])
+    assert 0 == result.exit_code
+    return database
+
+
+class TestSyncCommand:
+    def test_command_prints_synchronization_statistics(self, runner, responses, url, resource_name, database):
+        networks = [{'_ref': 'network/1', 'network': '10.1.0.0/16', 'comment': 'foo'}]
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+        result = runner.invoke(cli, ['snapshot', '-d', database, 'sync', '-n', resource_name, '-p',
+                                     '{"comment": "foo"}'])
+
+        assert_list_items(0, ['network', 'inserted', 'deleted'], result)
+        assert 'comment=foo' in responses.calls[-1].request.url
+
+    def test_command_prints_error_when_object_is_unknown(self, runner, database):
+        result = runner.invoke(cli, ['snapshot', '-d', database, 'sync', '-n', 'foo'])
+
+        assert_in_output(2, 'foo is not a valid infoblox object', result)
+
+    def test_command_prints_infoblox_error(self, runner, responses, url, resource_name, database):
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'error': 'oops'}, status=400)
+        result = runner.invoke(cli, ['snapshot', '-d', database, 'sync', '-n', resource_name])
+
+        assert_list_items(0, ['error', 'oops'], result)
+
+
+class TestQueryCommand:
+    def test_command_prints_rows(self, runner, synced_database):
+        result = runner.invoke(cli, ['snapshot', '-d', synced_database, 'query',
+                                     "SELECT _ref, network FROM network WHERE network = '10.2.0.0/16'"])
+
+        assert 0 == result.exit_code
+        assert [{'_ref': 'network/2', 'network': '10.2.0.0/16'}] == json.loads(result.output)
+
+    def test_command_does_not_contact_infoblox(self, runner, responses, synced_database):
+        calls = len(responses.calls)
+        result = runner.invoke(cli, ['snapshot', '-d', synced_database, 'query', 'SELECT * FROM network'])
+
+        assert 0 == result.exit_code
+        assert calls == len(responses.calls)
+
+    def test_command_prints_error_when_query_is_incorrect(self, runner, database):
+        result = runner.invoke(cli, ['snapshot', '-d', database, 'query', 'SELECT * FROM foo'])
+
+        assert_in_output(2, 'unable to execute the query', result)
+
+
+def test_info_command_prints_synced_objects(runner, synced_database):
+    result = runner.invoke(cli, ['snapshot', '-d', synced_database, 'info'])
+
+    assert_list_items(0, ['network', 'generation', 'count'], result)
@@ -7,7 +7,7 @@ import pytest
 
 # noinspection PyProtectedMember
 from infoblox.scripts.utils import (
-    pretty_echo, _get_delimiter, _parse_item, parse_dict_items, handle_json_file, handle_json_arguments,
+    pretty_echo, OUTPUT_FORMAT_KEY, _get_delimiter, _parse_item, parse_dict_items, handle_json_file, handle_json_arguments,
     check_environment, handle_dot_env_file
 )
 
@@ -64,6 +64,45 @@ def test_pretty_echo(capsys):
             assert str(item) in captured
 
 
+class TestPrettyEchoFormats:
+    data = [{'foo': 'bar'}, {'foo': 'baz'}]
+
+    def test_json_is_compact_when_output_is_piped(self, capsys):
+        pretty_echo(self.data)
+
+        assert '[{"foo": "bar"}, {"foo": "baz"}]\n' == capsys.readouterr().out
+
+    @pytest.mark.parametrize('data', [[], {'foo': [1, 2]}, 'hello', 4])
+    def test_json_output_is_valid_for_all_data_types(self, capsys, data):
+        pretty_echo(data, output_format='json')
+
+        assert data == json.loads(capsys.readouterr().out)
+
+    def test_json_is_indented_when_compact_is_false(self, capsys):
+        pretty_echo(self.data, output_format='json', compact=False)
+        captured = capsys.readouterr().out
+
+        assert json.dumps(self.data, indent=4) + '\n' == captured
+
+    def test_ndjson_writes_one_element_per_line(self, capsys):
+        pretty_echo(iter(self.data), output_format='ndjson')
+
+        assert '{"foo": "bar"}\n{"foo": "baz"}\n' == capsys.readouterr().out
+
+    def test_pretty_output_is_indented_json(self, capsys):
+        # colors are removed by click since the output is not a terminal
+        pretty_echo(self.data, output_format='pretty')
+
+        assert json.dumps(self.data, indent=4) + '\n' == capsys.readouterr().out
+
+    def test_global_options_of_current_command_are_used(self, capsys, command):
+        with click.Context(command) as context:
+            context.meta[OUTPUT_FORMAT_KEY] = 'ndjson'
+            pretty_echo(self.data)
+
+        assert 2 == len(capsys.readouterr().out.splitlines())
+
+
 class TestHandleJsonFile:
     # test option callback handle_json_file
     def test_function_prints_infoblox_result(self, capsys, responses, url, tempdir, context, command):
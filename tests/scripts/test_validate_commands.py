@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+from infoblox.scripts import cli
+from infoblox.scripts.schema_cache import load_object_schema, save_object_schema
+from tests.helpers import assert_in_output
+
+pytestmark = pytest.mark.usefixtures('client', 'resource', 'env_settings')
+
+
+@pytest.fixture
+def cache_dir(tempdir, monkeypatch):
+    monkeypatch.setenv('IB_CACHE_DIR', tempdir)
+    return tempdir
+
+
+@pytest.fixture
+def payloads_file(tempdir):
+    path = os.path.join(tempdir, 'payloads.ndjson')
+    with open(path, 'w') as f:
+        f.write('{"network": "10.1.0.0/16"}\n')
+        f.write('{"network": "10.2.0.0/16", "authority": "yes", "foo": 2}\n')
+        f.write('{"network"\n')
+    return path
+
+
+def test_command_reports_errors_with_line_numbers(runner, cache_dir, payloads_file):
+    result = runner.invoke(cli, ['validate', '-n', 'network', '-f', payloads_file])
+    lines = [json.loads(line) for line in result.stdout.splitlines() if line.startswith('{')]
+
+    assert 1 == result.exit_code
+    assert [2, 3] == [line['line'] for line in lines]
+    assert 2 == len(lines[0]['errors'])
+    assert '2 invalid payload(s)' in result.output
+
+
+def test_command_downloads_and_caches_missing_schema(runner, url, cache_dir, payloads_file):
+    assert load_object_schema('network') is None
+    result = runner.invoke(cli, ['validate', '-n', 'network', '-f', payloads_file])
+
+    assert 'the schema of network is not cached' in result.output
+    assert load_object_schema('network')['fields']
+
+
+def test_command_uses_cached_schema(runner, responses, network_schema, cache_dir, tempdir):
+    save_object_schema('network', network_schema)
+    calls = len(responses.calls)
+    result = runner.invoke(cli, ['validate', '-n', 'network', '--operation', 'update', '-f', '-'],
+                           input='{"_ref": "network/1", "comment": "foo"}\n')
+
+    assert 0 == result.exit_code
+    assert '' == result.output
+    assert calls == len(responses.calls)
+
+
+def test_command_prints_error_when_object_is_unknown(runner, cache_dir, payloads_file):
+    result = runner.invoke(cli, ['validate', '-n', 'foo', '-f', payloads_file])
+
+    assert_in_output(2, 'foo is not a valid infoblox object', result)
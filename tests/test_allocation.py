@@ -0,0 +1,207 @@
+import ipaddress
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from infoblox.allocation import Allocator
+from infoblox.exceptions import AllocationError, BadParameterError
+
+
+@pytest.fixture
+def wapi(responses, url, resource):
+    """
+    Answers request calls with next_available_ip results of small networks, returns the list of payloads received.
+    Network "network/<size>" has <size> addresses.
+    """
+    payloads = []
+
+    def request_callback(request):
+        calls = json.loads(request.body)
+        payloads.append(calls)
+        results = []
+        for call in calls:
+            size = int(call['object'].split('/')[1])
+            exclude = set(call['data'].get('exclude', []))
+            addresses = [str(ip) for ip in list(ipaddress.ip_network('10.0.0.0/16').hosts())[:size]]
+            free = [address for address in addresses if address not in exclude]
+            results.append({'ips': free[:call['data']['num']]})
+        return 200, {}, json.dumps(results)
+
+    responses.add_callback(responses.POST, f'{url}/request', callback=request_callback,
+                           content_type='application/json')
+    # some tests fail before any request call
+    responses.assert_all_requests_are_fired = False
+    return payloads
+
+
+@pytest.fixture
+def allocator(client):
+    return Allocator(client, max_num=10, max_calls_per_request=2)
+
+
+@pytest.mark.parametrize('parameters', [
+    {'function_name': 'expand_network'},
+    {'arguments': ['foo']},
+    {'arguments': {'num': 2}},
+    {'max_num': 0},
+    {'max_calls_per_request': 'foo'}
+])
+def test_allocator_raises_error_when_parameters_are_incorrect(client, parameters):
+    with pytest.raises(BadParameterError):
+        Allocator(client, **parameters)
+
+
+def test_reserve_many_packs_calls_in_request_calls(wapi, allocator):
+    reserved = allocator.reserve_many({'network/100': 15, 'network/50': 5, 'network/20': 3})
+
+    assert [15, 5, 3] == [len(values) for values in reserved.values()]
+    # first request: network/100 and network/50, second request: the 5 addresses still missing in network/100 and
+    # network/20
+    assert [2, 2] == [len(calls) for calls in wapi]
+    assert {'method': 'POST', 'object': 'network/100', 'args': {'_function': 'next_available_ip'},
+            'data': {'num': 10}} == wapi[0][0]
+    assert 5 == wapi[1][0]['data']['num']
+    assert 10 == len(wapi[1][0]['data']['exclude'])
+    assert 'network/20' == wapi[1][1]['object']
+
+
+def test_reserve_never_hands_out_the_same_address_twice(wapi, allocator):
+    first_values = allocator.reserve('network/100', 5)
+    second_values = allocator.reserve('network/100', 10)
+
+    assert 15 == len(set(first_values + second_values))
+    # addresses already handed out are excluded from the second function call
+    assert sorted(first_values) == wapi[1][0]['data']['exclude']
+
+
+def test_reserve_raises_error_when_network_is_full(wapi, allocator):
+    allocator.reserve('network/20', 18)
+    with pytest.raises(AllocationError):
+        allocator.reserve_many({'network/20': 3, 'network/100': 1})
+
+    # nothing is reserved when a network is full
+    assert 2 == allocator.available('network/20')
+    assert 1 == allocator.available('network/100')
+
+
+def test_release_gives_back_addresses(wapi, allocator):
+    values = allocator.reserve('network/20', 20)
+    with pytest.raises(AllocationError):
+        allocator.reserve('network/20')
+    allocator.release('network/20', values[:2])
+
+    assert values[:2] == allocator.reserve('network/20', 2)
+
+
+def test_full_network_is_asked_again_after_release(wapi, allocator):
+    values = allocator.reserve('network/20', 20)
+    with pytest.raises(AllocationError):
+        allocator.reserve('network/20')
+    request_calls = len(wapi)
+    # the network is known to be full, no more request is sent
+    with pytest.raises(AllocationError):
+        allocator.reserve('network/20')
+    assert request_calls == len(wapi)
+
+    allocator.release('network/20', values[:1])
+    allocator.reserve('network/20', 1)
+    with pytest.raises(AllocationError):
+        allocator.reserve('network/20')
+    assert request_calls + 1 == len(wapi)
+
+
+def test_full_network_is_asked_again_after_exhausted_ttl(mocker, wapi, client):
+    monotonic = mocker.patch('infoblox.allocation.time.monotonic', return_value=100.0)
+    allocator = Allocator(client, max_num=10, exhausted_ttl=30)
+    allocator.reserve('network/20', 20)
+    with pytest.raises(AllocationError):
+        allocator.reserve('network/20')
+    request_calls = len(wapi)
+
+    monotonic.return_value = 120.0
+    with pytest.raises(AllocationError):
+        allocator.reserve('network/20')
+    assert request_calls == len(wapi)
+
+    monotonic.return_value = 131.0
+    with pytest.raises(AllocationError):
+        allocator.reserve('network/20')
+    assert request_calls + 1 == len(wapi)
+
+
+def test_forget_stops_excluding_values(wapi, allocator):
+    values = allocator.reserve('network/20', 20)
+    allocator.forget('network/20', values[:3])
+
+    # the values were not used, so infoblox returns them again
+    assert values[:3] == allocator.reserve('network/20', 3)
+    assert 17 == len(wapi[-1][0]['data']['exclude'])
+    with pytest.raises(BadParameterError):
+        allocator.forget('network/20', ['10.0.0.200'])
+
+
+def test_lock_is_not_held_during_requests(responses, url, resource, client):
+    allocator = Allocator(client, max_num=10)
+    started = threading.Event()
+    blocked = threading.Event()
+
+    def request_callback(request):
+        calls = json.loads(request.body)
+        if calls[0]['object'] == 'network/slow':
+            started.set()
+            blocked.wait(5)
+        return 200, {}, json.dumps([{'ips': [f'10.0.0.{index}' for index in range(1, call['data']['num'] + 1)]}
+                                    for call in calls])
+
+    responses.add_callback(responses.POST, f'{url}/request', callback=request_callback,
+                           content_type='application/json')
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future = executor.submit(allocator.reserve, 'network/slow', 1)
+        assert started.wait(5)
+        try:
+            # a reservation on another network does not wait for the pending request
+            assert ['10.0.0.1'] == executor.submit(allocator.reserve, 'network/fast', 1).result(timeout=1)
+        finally:
+            blocked.set()
+        assert ['10.0.0.1'] == future.result()
+
+
+@pytest.mark.parametrize(('object_ref', 'values'), [
+    ('network/20', ['10.0.0.1']),
+    ('network/100', ['10.0.0.200'])
+])
+def test_release_raises_error_for_values_not_reserved(wapi, allocator, object_ref, values):
+    allocator.reserve('network/100', 1)
+    with pytest.raises(BadParameterError):
+        allocator.release(object_ref, values)
+
+
+def test_prefetch_fills_pools(wapi, allocator):
+    allocator.prefetch({'network/100': 12})
+
+    assert 12 == allocator.available('network/100')
+    allocator.reserve('network/100', 12)
+    assert 2 == len(wapi)
+
+
+@pytest.mark.parametrize('counts', [['network/100'], {'network/100': -1}, {'foo': 1}])
+def test_reserve_many_raises_error_when_counts_are_incorrect(wapi, allocator, counts):
+    with pytest.raises(BadParameterError):
+        allocator.reserve_many(counts)
+
+
+def test_function_arguments_are_checked_once_per_object_type(wapi, client):
+    with pytest.raises(BadParameterError) as exc_info:
+        Allocator(client, arguments={'foo': 1}).reserve('network/20')
+
+    assert 'foo is not a valid argument for next_available_ip function' == str(exc_info.value)
+    assert not wapi
+
+
+def test_concurrent_reservations_of_a_network_get_distinct_values(wapi, allocator):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        reservations = list(executor.map(lambda _: allocator.reserve('network/100', 5), range(4)))
+
+    assert 20 == len({value for values in reservations for value in values})
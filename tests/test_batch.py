@@ -0,0 +1,137 @@
+import json
+import re
+import time
+from urllib.parse import urlparse, parse_qsl
+
+import pytest
+import requests
+
+from infoblox.batch import Batch, BatchResult
+from infoblox.exceptions import BadParameterError
+
+
+@pytest.fixture
+def wapi(responses, url, resource_name, resource):
+    """Registers a callback answering all requests on network objects, returns the list of requests received."""
+    received = []
+
+    def request_callback(request):
+        query = dict(parse_qsl(urlparse(request.url).query))
+        received.append((request.method, urlparse(request.url).path, query))
+        time.sleep(float(query.get('comment', 0)) if request.method == 'GET' else 0)
+        if 'network/unreachable' in request.url:
+            raise requests.ConnectionError('connection refused')
+        if request.method == 'GET' and 'network/missing' in request.url:
+            return 404, {}, json.dumps({'Error': 'not found'})
+        if request.method == 'GET':
+            return 200, {}, json.dumps([{'_ref': 'network/1', 'comment': query.get('comment')}])
+        return 201, {}, json.dumps('network/1')
+
+    # the schema response registered by the resource fixture is consumed first
+    for method in (responses.GET, responses.POST, responses.PUT, responses.DELETE):
+        responses.add_callback(method, re.compile(f'{url}/{resource_name}.*'), callback=request_callback)
+    # each test only uses some http methods
+    responses.assert_all_requests_are_fired = False
+    return received
+
+
+@pytest.fixture
+def batch(client):
+    return Batch(client, concurrency=4)
+
+
+@pytest.mark.parametrize('concurrency', [0, -1, 1.5, 'foo', True])
+def test_batch_raises_error_when_concurrency_is_incorrect(client, concurrency):
+    with pytest.raises(BadParameterError):
+        Batch(client, concurrency)
+
+
+def test_run_method_yields_results_in_input_order(wapi, batch):
+    delays = ['0.2', '0', '0.1', '0']
+    operations = [(line, {'op': 'get', 'object': 'network', 'params': {'comment': delay}})
+                  for line, delay in enumerate(delays, start=1)]
+
+    results = list(batch.run(operations))
+
+    assert [1, 2, 3, 4] == [result.line for result in results]
+    assert delays == [result.result[0]['comment'] for result in results]
+
+
+def test_run_method_executes_operations_concurrently(wapi, batch):
+    operations = [(line, {'op': 'get', 'object': 'network', 'params': {'comment': '0.2'}}) for line in range(4)]
+    start = time.perf_counter()
+    list(batch.run(operations))
+
+    assert time.perf_counter() - start < 0.6
+
+
+def test_object_schema_is_loaded_once(responses, wapi, batch):
+    operations = [(line, {'op': 'get', 'object': 'network'}) for line in range(5)]
+    list(batch.run(operations))
+
+    schema_calls = [call for call in responses.calls if 'network?_schema' in call.request.url]
+    # one call for the resource fixture and one for the batch
+    assert 2 == len(schema_calls)
+
+
+def test_run_method_dispatches_all_operation_types(wapi, batch):
+    operations = [
+        {'op': 'create', 'object': 'network', 'data': {'network': '10.1.0.0/16'}},
+        {'op': 'update', 'ref': 'network/1', 'data': {'comment': 'foo'}, 'return_fields': ['comment']},
+        {'op': 'delete', 'ref': 'network/1', 'schedule_now': True},
+        {'op': 'func-call', 'ref': 'network/1', 'function': 'next_available_ip', 'arguments': {'num': 2}},
+    ]
+    results = list(batch.run(enumerate(operations, start=1)))
+
+    assert all(result.ok for result in results)
+    methods = [(method, path) for method, path, _ in wapi]
+    assert ('POST', '/wapi/v2.9/network') in methods
+    assert ('PUT', '/wapi/v2.9/network/1') in methods
+    assert ('DELETE', '/wapi/v2.9/network/1') in methods
+    func_calls = [query for method, _, query in wapi if method == 'POST' and '_function' in query]
+    assert [{'_function': 'next_available_ip'}] == func_calls
+
+
+def test_failed_operations_are_reported_without_stopping_the_batch(wapi, batch):
+    operations = [
+        (1, {'op': 'foo', 'object': 'network'}),
+        (2, ValueError('unable to parse json data')),
+        (3, {'op': 'get', 'ref': 'network/missing'}),
+        (5, {'op': 'get', 'object': 'network', 'bar': 2}),
+        (6, {'op': 'get', 'object': 'network'}),
+        (7, {'op': 'delete', 'ref': 'network/unreachable'}),
+    ]
+    results = {result.line: result for result in batch.run(operations)}
+
+    assert 'op must be one of' in results[1].error
+    assert 'unable to parse json data' == results[2].error
+    assert BatchResult(3, error={'Error': 'not found'}, status_code=404) == results[3]
+    assert 'unknown keys for get operation: bar' == results[5].error
+    assert results[6].ok
+    assert 'connection refused' == results[7].error
+
+
+def test_schema_loads_of_different_objects_do_not_wait_for_each_other(mocker, client):
+    loaded = []
+
+    def get_object(name):
+        time.sleep(0.3 if name == 'network' else 0)
+        loaded.append(name)
+        return mocker.Mock()
+
+    mocker.patch.object(client, 'get_object', side_effect=get_object)
+    operations = [(1, {'op': 'get', 'object': 'network'}), (2, {'op': 'get', 'object': 'ipv4address'})]
+    list(Batch(client, concurrency=2).run(operations))
+
+    assert ['ipv4address', 'network'] == loaded
+
+
+class TestBatchResult:
+    def test_to_dict_method_returns_result_of_successful_operation(self):
+        assert {'line': 1, 'ok': True, 'result': 'network/1'} == BatchResult(1, result='network/1').to_dict()
+
+    def test_to_dict_method_returns_error_of_failed_operation(self):
+        result = BatchResult(2, error='oops', status_code=400)
+
+        assert not result.ok
+        assert {'line': 2, 'ok': False, 'error': 'oops', 'status_code': 400} == result.to_dict()
@@ -0,0 +1,60 @@
+import json
+
+from click.testing import CliRunner
+
+from benchmarks.__main__ import cli
+from benchmarks.runner import compare, get_id, measure, run
+
+
+def make_results(**medians):
+    return {'benchmarks': [{'id': name, 'median': median} for name, median in medians.items()]}
+
+
+def test_get_id_includes_params():
+    assert 'count' == get_id('count', {})
+    assert 'get_multiple[size=10,page_size=100]' == get_id('get_multiple', {'size': 10, 'page_size': 100})
+
+
+def test_measure_returns_one_timing_per_round():
+    calls = []
+    iterations, timings = measure(lambda: calls.append(1), rounds=3, min_time=0)
+
+    assert (1, 3) == (iterations, len(timings))
+    assert 4 == len(calls)
+
+
+def test_run_returns_results_by_size(loopback_passthru):
+    results = run(sizes=(20, 30), name_filter='count', rounds=1, min_time=0)
+
+    assert {'ib_client', 'python', 'platform', 'timestamp'} <= set(results['metadata'])
+    assert ['count[size=20]', 'count[size=30]'] == [result['id'] for result in results['benchmarks']]
+    assert 30 == results['benchmarks'][1]['items']
+    assert results['benchmarks'][0]['items_per_second'] > 0
+
+
+def test_compare_detects_regressions():
+    comparisons, regression = compare(make_results(a=1.0, b=1.0), make_results(a=1.05, b=1.5, c=1.0))
+
+    assert regression
+    assert [('a', False), ('b', True)] == [(item['id'], item['regression']) for item in comparisons]
+    assert not compare(make_results(a=1.0), make_results(a=0.5))[1]
+
+
+def test_cli_writes_json_results_and_compares_them(loopback_passthru, tmp_path):
+    runner = CliRunner()
+    path = str(tmp_path / 'results.json')
+    result = runner.invoke(cli, ['run', '-s', '10', '-k', 'validate_params', '-r', '1', '--min-time', '0', '-o', path])
+
+    assert 0 == result.exit_code, result.output
+    with open(path) as f:
+        assert ['validate_params'] == [item['id'] for item in json.load(f)['benchmarks']]
+    result = runner.invoke(cli, ['compare', path, path])
+    assert 0 == result.exit_code
+    assert 'validate_params' in result.output
+
+
+def test_cli_refuses_invalid_sizes():
+    result = CliRunner().invoke(cli, ['run', '-s', '10,foo'])
+
+    assert 2 == result.exit_code
+    assert '10,foo is not a comma-separated list of integers' in result.output
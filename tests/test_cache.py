@@ -0,0 +1,77 @@
+import pytest
+
+# noinspection PyProtectedMember
+from infoblox._cache import NegativeCache
+from infoblox.exceptions import BadParameterError, HttpError
+
+
+@pytest.fixture
+def negative_cache():
+    return NegativeCache(60)
+
+
+class TestInit:
+    # test NegativeCache initialization
+
+    @pytest.mark.parametrize('ttl', ['foo', 0, -1])
+    def test_init_raises_error_when_ttl_is_incorrect(self, ttl):
+        with pytest.raises(BadParameterError) as exc_info:
+            NegativeCache(ttl)
+
+        assert f'ttl must be a positive number but you provide {ttl}' == str(exc_info.value)
+
+    @pytest.mark.parametrize('max_size', ['foo', 0, 2.0])
+    def test_init_raises_error_when_max_size_is_incorrect(self, max_size):
+        with pytest.raises(BadParameterError) as exc_info:
+            NegativeCache(1, max_size)
+
+        assert f'max_size must be a positive integer but you provide {max_size}' == str(exc_info.value)
+
+
+def test_get_method_returns_none_for_unknown_reference(negative_cache):
+    assert negative_cache.get('network/foo') is None
+    assert 1 == negative_cache.misses
+
+
+def test_get_method_returns_remembered_error(negative_cache):
+    negative_cache.add('network/foo', HttpError(404, {'Error': 'not found'}))
+    error = negative_cache.get('network/foo')
+
+    assert 404 == error.status_code
+    assert {'Error': 'not found'} == error.error_message
+    assert 1 == negative_cache.hits
+
+
+def test_get_method_forgets_expired_reference(mocker, negative_cache):
+    monotonic_mock = mocker.patch('infoblox._cache.time.monotonic')
+    monotonic_mock.return_value = 100
+    negative_cache.add('network/foo', HttpError(404, 'not found'))
+    monotonic_mock.return_value = 161
+
+    assert negative_cache.get('network/foo') is None
+    assert 0 == len(negative_cache)
+
+
+def test_add_method_drops_oldest_references_when_cache_is_full():
+    negative_cache = NegativeCache(60, max_size=2)
+    for ref in ['network/1', 'network/2', 'network/3']:
+        negative_cache.add(ref, HttpError(404, 'not found'))
+
+    assert 2 == len(negative_cache)
+    assert negative_cache.get('network/1') is None
+    assert negative_cache.get('network/3') is not None
+
+
+def test_invalidate_methods_forget_references(negative_cache):
+    for ref in ['network/1', 'network/2', 'record:host/1']:
+        negative_cache.add(ref, HttpError(404, 'not found'))
+
+    negative_cache.invalidate('network/1')
+    assert negative_cache.get('network/1') is None
+
+    negative_cache.invalidate_object('network')
+    assert negative_cache.get('network/2') is None
+    assert negative_cache.get('record:host/1') is not None
+
+    negative_cache.clear()
+    assert 0 == len(negative_cache)
@@ -289,3 +289,25 @@ class TestCustomRequest:
                                callback=request_callback)
 
         assert data == client.custom_request(data)
+
+
+class TestGetNegativeCache:
+    # test method _get_negative_cache
+
+    def test_method_returns_none_by_default(self):
+        assert Client._get_negative_cache() is None
+
+    def test_method_returns_cache_with_ttl_passed_as_argument(self):
+        assert 5 == Client._get_negative_cache(5).ttl
+
+    def test_method_returns_cache_with_ttl_set_in_environment(self, mocker):
+        mocker.patch.dict('os.environ', {'IB_NEGATIVE_CACHE_TTL': '2.5'})
+
+        assert 2.5 == Client._get_negative_cache().ttl
+
+    def test_client_shares_its_negative_cache_with_resources(self, responses, url, api_schema, network_schema):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        responses.add(responses.GET, f'{url}/network', json=network_schema, status=200)
+        client = Client(url, negative_cache_ttl=10)
+
+        assert client.get_object('network')._negative_cache is client.negative_cache
@@ -0,0 +1,92 @@
+import copy
+import json
+
+import pytest
+
+from infoblox.exceptions import BadParameterError, FieldError, FunctionNotFoundError
+from infoblox.functions import FunctionSignature, FunctionsApi
+
+
+class TestGetFunctionInformation:
+    def test_method_does_not_modify_schema(self, resource):
+        schema = copy.deepcopy(resource.documentation)
+        resource.get_function_information('next_available_ip')
+
+        assert schema == resource.documentation
+
+    def test_method_returns_same_information_on_each_call(self, resource):
+        first_info = resource.get_function_information('next_available_ip')
+
+        assert first_info == resource.get_function_information('next_available_ip')
+        assert ['write'] == first_info['schema']['input_fields'][0]['supports']
+
+
+class TestGetFunctionSignature:
+    def test_method_returns_function_signature(self, resource):
+        signature = resource.get_function_signature('next_available_ip')
+
+        assert isinstance(signature, FunctionSignature)
+        assert 'next_available_ip' == signature.name
+        assert {'num', 'exclude'} <= set(signature.input_fields)
+        assert ('ips',) == signature.output_fields
+
+    def test_method_computes_signature_once(self, mocker, resource):
+        spy = mocker.spy(resource, 'get_function_information')
+        signature = resource.get_function_signature('next_available_ip')
+
+        assert signature is resource.get_function_signature('next_available_ip')
+        assert 1 == spy.call_count
+
+    def test_signature_is_immutable(self, resource):
+        signature = resource.get_function_signature('next_available_ip')
+        with pytest.raises(TypeError):
+            signature.input_fields['foo'] = {}
+        with pytest.raises(AttributeError):
+            signature.name = 'foo'
+
+    def test_method_raises_error_for_unknown_function(self, resource):
+        with pytest.raises(FunctionNotFoundError):
+            resource.get_function_signature('foo')
+
+    @pytest.mark.parametrize(('arguments', 'error'), [
+        ({'foo': 2}, BadParameterError),
+        ({'num': 'foo'}, FieldError),
+        ({'exclude': 'foo'}, FieldError)
+    ])
+    def test_check_arguments_raises_error_for_invalid_arguments(self, resource, arguments, error):
+        with pytest.raises(error):
+            resource.get_function_signature('next_available_ip').check_arguments(arguments)
+
+    def test_check_arguments_accepts_valid_arguments(self, resource):
+        resource.get_function_signature('next_available_ip').check_arguments({'num': 2, 'exclude': ['10.1.0.1']})
+
+
+class TestFunctionsApi:
+    def test_property_returns_same_functions_api(self, resource):
+        assert isinstance(resource.functions_api, FunctionsApi)
+        assert resource.functions_api is resource.functions_api
+
+    def test_stub_calls_function(self, responses, url, resource):
+        responses.add(responses.POST, f'{url}/network/ref', json={'ips': ['10.1.0.2', '10.1.0.3']})
+        stub = resource.functions_api.next_available_ip
+
+        assert {'ips': ['10.1.0.2', '10.1.0.3']} == stub('network/ref', num=2)
+        assert 'next_available_ip' == stub.__name__
+        request = responses.calls[-1].request
+        assert request.url.endswith('network/ref?_function=next_available_ip')
+        assert {'num': 2} == json.loads(request.body)
+
+    def test_stub_validates_arguments(self, resource):
+        with pytest.raises(FieldError):
+            resource.functions_api.next_available_ip('network/ref', num='foo')
+
+    def test_stubs_are_created_once(self, resource):
+        assert resource.functions_api.next_available_ip is resource.functions_api.next_available_ip
+
+    @pytest.mark.parametrize('name', ['foo', '_private'])
+    def test_unknown_function_raises_attribute_error(self, resource, name):
+        with pytest.raises(AttributeError):
+            getattr(resource.functions_api, name)
+
+    def test_dir_lists_functions(self, resource):
+        assert sorted(resource.functions) == dir(resource.functions_api)
@@ -0,0 +1,164 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from infoblox import Client
+from infoblox.instrumentation import Event, Histogram, Instrumentation, MetricsCollector, get_object_and_operation, \
+    get_retries
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def instrumented_client(responses, api_schema, url, resource, events):
+    responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+    return Client(url, hooks=[events.append])
+
+
+@pytest.mark.parametrize(('method', 'url', 'expected'), [
+    ('GET', 'http://foo/wapi/v2.9/?_schema=1', ('', 'schema')),
+    ('GET', 'http://foo/wapi/v2.9/network?_schema=1&_get_doc=1', ('network', 'schema')),
+    ('GET', 'http://foo/wapi/v2.9/network?network=10.1.0.0%2F16', ('network', 'get')),
+    ('GET', 'http://foo/wapi/v2.9/network/ZG5:10.1.0.0/16/default', ('network', 'get')),
+    ('POST', 'http://foo/wapi/v2.9/network', ('network', 'create')),
+    ('POST', 'http://foo/wapi/v2.9/network/ZG5:10.1.0.0/16/default?_function=next_available_ip',
+     ('network', 'func_call')),
+    ('PUT', 'http://foo/wapi/v2.9/record:host/ZG5', ('record:host', 'update')),
+    ('DELETE', 'http://foo/wapi/v2.9/network/ZG5', ('network', 'delete')),
+    ('POST', 'http://foo/wapi/v2.9/request', ('request', 'request'))
+])
+def test_get_object_and_operation_returns_correct_data(method, url, expected):
+    assert expected == get_object_and_operation(method, url)
+
+
+def testget_retries_returns_urllib3_retry_count():
+    response = SimpleNamespace(raw=SimpleNamespace(retries=SimpleNamespace(history=('first', 'second'))))
+    assert 2 == get_retries(response)
+    assert 0 == get_retries(SimpleNamespace(raw=None))
+
+
+def test_histogram_counts_values_in_buckets():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert {'count': 4, 'sum': 2.65, 'max': 2.0, 'buckets': {'0.1': 2, '1.0': 1, '+Inf': 1}} == histogram.to_dict()
+
+
+class TestInstrumentation:
+    def test_measure_does_nothing_when_disabled(self, test_session):
+        instrumentation = Instrumentation(test_session)
+
+        assert not instrumentation.enabled
+        assert instrumentation.measure('validation', 'network', 'get') is \
+            instrumentation.measure('decode', 'network', 'get')
+
+    def test_session_is_hooked_only_with_callbacks(self):
+        session = requests.Session()
+        instrumentation = Instrumentation(session)
+        instrumentation.add_callback(print)
+        instrumentation.add_callback(repr)
+
+        assert instrumentation.enabled
+        assert 1 == len(session.hooks['response'])
+        instrumentation.remove_callback(print)
+        instrumentation.remove_callback(repr)
+        assert not instrumentation.enabled
+        assert [] == session.hooks['response']
+
+    def test_measure_emits_event_with_attributes(self, events):
+        instrumentation = Instrumentation()
+        instrumentation.add_callback(events.append)
+        with instrumentation.measure('decode', 'network', 'get', bytes=3) as measure:
+            measure.attributes['extra'] = True
+
+        event = events[0]
+        assert ('decode', 'network', 'get', {'bytes': 3, 'extra': True}) == \
+               (event.kind, event.object_name, event.operation, event.attributes)
+        assert event.duration >= 0
+
+
+class TestClientHooks:
+    def test_schema_load_is_reported(self, instrumented_client, events):
+        event = events[0]
+        assert ('request', '', 'schema') == (event.kind, event.object_name, event.operation)
+        assert 200 == event.attributes['status_code']
+        assert event.attributes['response_bytes'] > 0
+
+    def test_resource_operations_are_reported(self, responses, url, instrumented_client, events):
+        resource = instrumented_client.get_object('network')
+        responses.add(responses.POST, f'{url}/network', json='network/1', status=201)
+        resource.create(network='10.1.0.0/16')
+
+        kinds = [(event.kind, event.object_name, event.operation) for event in events[1:]]
+        assert [('request', 'network', 'schema'), ('decode', 'network', 'schema'),
+                ('operation', 'network', 'get_object'), ('validation', 'network', 'create'),
+                ('request', 'network', 'create'), ('decode', 'network', 'create'),
+                ('operation', 'network', 'create')] == kinds
+        assert events[-3].attributes['request_bytes'] > 0
+        assert 1 == events[-1].attributes['results']
+
+    def test_pages_and_page_retries_are_reported(self, responses, url, instrumented_client, events):
+        resource = instrumented_client.get_object('network')
+        resource._backoff_factor = 0
+        responses.replace(responses.GET, f'{url}/network', json={'error': 'oops'}, status=503)
+        responses.add(responses.GET, f'{url}/network', json={'result': [{}, {}]})
+        collector = MetricsCollector()
+        instrumented_client.add_hook(collector)
+
+        assert 2 == len(list(resource.get_multiple(page_retries=1)))
+        page = [event for event in events if event.kind == 'page'][0]
+        assert ('network', 'get_multiple', 2) == (page.object_name, page.operation, page.attributes['items'])
+        metrics = collector.snapshot()['network']
+        assert {'pages': 1, 'items': 2, 'retries': 1} == \
+               {key: metrics['get_multiple'][key] for key in ('pages', 'items', 'retries')}
+        assert {'503': 1, '200': 1} == metrics['get']['status_codes']
+
+    def test_hooks_can_be_removed(self, responses, url, instrumented_client, events):
+        instrumented_client.remove_hook(events.append)
+        instrumented_client.get_object('network')
+
+        assert 1 == len(events)
+        assert [] == instrumented_client.session.hooks['response']
+
+
+class TestMetricsCollector:
+    def test_collector_aggregates_events(self, responses, url, instrumented_client):
+        collector = MetricsCollector()
+        instrumented_client.add_hook(collector)
+        resource = instrumented_client.get_object('network')
+        responses.add(responses.GET, f'{url}/network', json=[{'_ref': 'network/1'}])
+        resource.get(params={'network': '10.1.0.0/16'})
+        resource.get(params={'network': '10.2.0.0/16'})
+
+        metrics = collector.snapshot()['network']
+        assert {'schema', 'get_object', 'get'} == set(metrics)
+        assert 2 == metrics['get']['request_seconds']['count']
+        assert 2 == metrics['get']['validation_seconds']['count']
+        assert 2 == metrics['get']['decode_seconds']['count']
+        assert 2 == metrics['get']['operation_seconds']['count']
+        assert {'200': 2} == metrics['get']['status_codes']
+        assert 0 == metrics['get']['retries']
+        assert 0 < metrics['get']['response_bytes']
+
+    def test_retry_events_are_counted(self):
+        collector = MetricsCollector()
+        instrumentation = Instrumentation()
+        instrumentation.add_callback(collector)
+        instrumentation.emit('retry', 'network', 'get_multiple', 0.0, error='oops')
+        instrumentation.emit('request', 'network', 'get', 0.1, status_code=200, retries=2)
+
+        metrics = collector.snapshot()['network']
+        assert {'retries': 1} == metrics['get_multiple']
+        assert 2 == metrics['get']['retries']
+
+    def test_reset_removes_metrics(self):
+        collector = MetricsCollector()
+        collector(Event('decode', 'network', 'get', 0.1, {}))
+        collector.reset()
+
+        assert {} == collector.snapshot()
@@ -0,0 +1,92 @@
+import pytest
+
+from infoblox.exceptions import BadParameterError
+from infoblox.loadgen import LoadGenerator, parse_mix, percentile
+from infoblox.testing import FakeWapi, make_networks
+
+
+@pytest.fixture
+def fake_wapi():
+    wapi = FakeWapi()
+    wapi.add_objects('network', make_networks(50))
+    return wapi
+
+
+def test_parse_mix_returns_weights():
+    assert {'read': 70.0, 'func-call': 30.0} == parse_mix('read=70, func-call=30')
+    with pytest.raises(BadParameterError) as exc_info:
+        parse_mix('read')
+
+    assert 'mix must be a comma-separated list of operation=weight but you provide read' == str(exc_info.value)
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert (50.0, 99.0, 100.0) == (percentile(values, 50), percentile(values, 99), percentile(values, 100))
+    assert 0.0 == percentile([], 50)
+
+
+class TestLoadGenerator:
+    @pytest.mark.parametrize(('arguments', 'message'), [
+        ({'mix': {'update': 1}}, 'operations must be in read, search, create, delete, func-call but you provide update'),
+        ({'mix': {'read': 0}}, "mix must have positive weights but you provide {'read': 0}"),
+        ({'concurrency': 0}, 'concurrency must be a positive integer but you provide 0'),
+        ({'rate': -1}, 'rate must be a positive number but you provide -1'),
+        ({'duration': None}, 'duration or max_operations must be given'),
+        ({'create_range': '10.0.0.0/30'}, 'create_range must be an IPv4 network with a prefix length of at most 29 '
+                                          'but you provide 10.0.0.0/30'),
+    ])
+    def test_generator_raises_error_when_arguments_are_incorrect(self, arguments, message):
+        with pytest.raises(BadParameterError) as exc_info:
+            LoadGenerator(None, **arguments)
+
+        assert message == str(exc_info.value)
+
+    def test_generator_runs_operations_of_the_mix(self, fake_wapi, fake_client):
+        report = LoadGenerator(fake_client, concurrency=3, max_operations=100, seed=1).run()
+        data = report.to_dict()
+
+        assert {'read', 'search', 'create', 'delete', 'func-call'} == set(data['operations'])
+        assert 100 == data['total']['count'] == sum(item['count'] for item in data['operations'].values())
+        assert 0 == data['total']['errors']
+        latency = data['total']['latency']
+        assert latency['min'] <= latency['p50'] <= latency['p99'] <= latency['max']
+        # networks created by the load are removed
+        assert 50 == len(fake_wapi.get_objects('network'))
+
+    def test_generator_sends_every_operation_to_the_grid(self, fake_wapi, fake_client):
+        fake_wapi.clear()
+        fake_wapi.add_objects('network', make_networks(1))
+        report = LoadGenerator(fake_client, mix={'read': 1, 'search': 1}, concurrency=16, max_operations=400).run()
+
+        # the schema and the sample of networks are also fetched
+        assert report.to_dict()['total']['count'] + 2 == fake_wapi.request_counts[('GET', 'network')]
+        assert 0 == fake_client.single_flight.shared
+
+    def test_generator_replaces_deletes_by_creates_when_nothing_was_created(self, fake_client):
+        report = LoadGenerator(fake_client, mix={'delete': 1}, concurrency=1, max_operations=2).run()
+
+        assert {'create': 1, 'delete': 1} == {name: stats.count for name, stats in report.operations.items()}
+
+    def test_generator_reports_errors_and_retries(self, fake_wapi, fake_client):
+        fake_wapi.inject_errors(1, status_code=400, method='POST')
+        fake_wapi.inject_errors(1, status_code=503, method='DELETE')
+        # the first create fails, the second succeeds and the delete is retried
+        report = LoadGenerator(fake_client, mix={'delete': 1}, concurrency=1, max_operations=3).run()
+
+        assert (2, {'HTTP 400': 1}) == (report.operations['create'].count, report.operations['create'].errors)
+        assert (1, 1) == (report.operations['delete'].count, report.operations['delete'].retries)
+        assert pytest.approx(1 / 3) == report.to_dict()['total']['error_rate']
+
+    def test_generator_sends_operations_at_target_rate(self, fake_client):
+        report = LoadGenerator(fake_client, mix={'read': 1}, rate=100, max_operations=20).run()
+
+        assert report.duration >= 0.19
+        assert 100 == report.to_dict()['target_rate']
+
+    def test_generator_raises_error_when_there_is_no_network_to_read(self, fake_wapi, fake_client):
+        fake_wapi.clear()
+
+        with pytest.raises(BadParameterError):
+            LoadGenerator(fake_client, mix={'search': 1}, max_operations=1).run()
@@ -0,0 +1,47 @@
+from benchmarks import memory
+
+
+def make_result(name, size, peak, streaming=True, rss_peak=0):
+    return {'name': name, 'size': size, 'streaming': streaming, 'peak': peak, 'rss_peak': rss_peak}
+
+
+def test_measure_memory_consumes_iterators():
+    def allocate():
+        return (bytearray(100_000) for _ in range(10))
+
+    result = memory.measure_memory(allocate, sample_every=2)
+
+    assert 100_000 <= result['peak'] < 500_000
+    assert result['steady'] < result['peak']
+    assert result['retained'] < 10_000
+    assert result['rss_peak'] >= result['rss_before'] > 0
+
+
+def test_measure_memory_returns_memory_held_by_result():
+    result = memory.measure_memory(lambda: [bytearray(100_000) for _ in range(10)])
+
+    assert result['steady'] >= 1_000_000
+    assert result['retained'] < 10_000
+
+
+def test_check_reports_growing_streaming_operations():
+    results = [make_result('count', 1000, 100), make_result('count', 10000, 150),
+               make_result('get_multiple', 1000, 100), make_result('get_multiple', 10000, 1000),
+               make_result('get_all', 1000, 100, streaming=False), make_result('get_all', 10000, 1000, streaming=False)]
+
+    assert ['get_multiple: peak memory grows from 100 bytes with 1000 objects to 1000 bytes with 10000 objects'] == \
+        memory.check(results)
+
+
+def test_check_reports_rss_above_limit():
+    results = [make_result('count', 1000, 100, rss_peak=600), make_result('count', 10000, 100, rss_peak=400)]
+
+    assert ['count: resident memory reaches 600 bytes with 1000 objects, above the limit of 512 bytes'] == \
+        memory.check(results, rss_limit=512)
+
+
+def test_streaming_operations_use_constant_memory(loopback_passthru):
+    results = memory.run(sizes=(1000, 3000), isolated=False)
+
+    assert {'get_multiple', 'count', 'get', 'cli_export'} == {result['name'] for result in results}
+    assert [] == memory.check(results)
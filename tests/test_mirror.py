@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from infoblox.exceptions import BadParameterError, HttpError
+from infoblox.mirror import Mirror, MirrorChanges
+
+
+def get_networks(*numbers, comment='foo'):
+    return [{'_ref': f'network/{i}', 'network': f'10.{i}.0.0/16', 'comment': comment} for i in numbers]
+
+
+@pytest.fixture
+def mirror(responses, url, resource_name, resource):
+    responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': get_networks(1, 2, 3)}, status=200)
+    return resource.mirror(params={'comment': 'foo'}, return_fields=['network', 'comment'])
+
+
+def test_mirror_method_loads_all_objects(mirror):
+    assert isinstance(mirror, Mirror)
+    assert 3 == len(mirror)
+    assert 'network/1' in mirror
+    assert {'_ref': 'network/2', 'network': '10.2.0.0/16', 'comment': 'foo'} == mirror.get('network/2')
+    assert mirror.get('network/4') is None
+    assert {'network/1', 'network/2', 'network/3'} == mirror.references
+    assert get_networks(1, 2, 3) == list(mirror)
+
+
+def test_mirror_method_fetches_objects_with_given_parameters(responses, mirror):
+    query = responses.calls[1].request.url
+
+    assert 'comment=foo' in query
+    assert '_return_fields=network%2Ccomment' in query
+
+
+def test_refresh_method_reports_and_applies_changes(responses, url, resource_name, mirror):
+    unchanged = mirror.get('network/1')
+    networks = get_networks(1, 4) + get_networks(2, comment='bar')
+    responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+
+    changes = mirror.refresh()
+
+    assert MirrorChanges(added={'network/4'}, changed={'network/2'}, removed={'network/3'}) == changes
+    assert 'bar' == mirror.get('network/2')['comment']
+    assert 'network/3' not in mirror
+    # unchanged records are kept as is
+    assert mirror.get('network/1') is unchanged
+
+
+def test_stats_method_returns_mirror_information(mirror):
+    stats = mirror.stats()
+
+    assert 3 == stats['records']
+    assert stats['memory_bytes'] > 0
+    assert 1 == stats['refresh_count']
+    assert stats['last_refresh_duration'] >= 0
+    assert stats['last_error'] is None
+
+
+class TestPeriodicRefresh:
+    @pytest.mark.parametrize('interval', [0, -1, 'foo'])
+    def test_start_method_raises_error_when_interval_is_incorrect(self, mirror, interval):
+        with pytest.raises(BadParameterError):
+            mirror.start(interval)
+
+    def test_start_method_raises_error_when_mirror_is_already_refreshed(self, mirror):
+        with mirror:
+            mirror.start(10)
+            with pytest.raises(BadParameterError):
+                mirror.start(10)
+
+    def test_mirror_is_refreshed_periodically(self, responses, url, resource_name, mirror):
+        refreshed = threading.Event()
+        received = []
+
+        def callback(changes):
+            received.append(changes)
+            refreshed.set()
+
+        responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': get_networks(1)}, status=200)
+        with mirror:
+            mirror.start(0.05, callback)
+            assert refreshed.wait(2)
+
+        assert {'network/2', 'network/3'} == received[0].removed
+        assert 1 == len(mirror)
+
+    def test_mirror_keeps_records_when_refresh_fails(self, responses, url, resource_name, mirror):
+        responses.replace(responses.GET, f'{url}/{resource_name}', json={'error': 'oops'}, status=500)
+        with mirror:
+            mirror.start(0.05)
+            time.sleep(0.3)
+
+        assert isinstance(mirror.last_error, HttpError)
+        assert 3 == len(mirror)
+
+
+def test_refreshes_are_bounded_by_semaphore(mocker, resource):
+    active = []
+    peak = []
+
+    def get_multiple(*_):
+        active.append(1)
+        peak.append(len(active))
+        time.sleep(0.1)
+        active.pop()
+        return iter([])
+
+    mocker.patch.object(resource, 'get_multiple', side_effect=get_multiple)
+    semaphore = threading.BoundedSemaphore(2)
+    mirrors = [Mirror(resource, semaphore=semaphore) for _ in range(5)]
+    threads = [threading.Thread(target=mirror.refresh) for mirror in mirrors]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 2
+
+
+class TestSearch:
+    def test_method_returns_matching_records(self, mirror):
+        assert [{'_ref': 'network/2', 'network': '10.2.0.0/16', 'comment': 'foo'}] == mirror.search(
+            {'network~': r'^10\.2\.'})
+
+    def test_method_uses_indexes_rebuilt_after_refresh(self, responses, url, resource_name, mirror):
+        mirror.create_index('network')
+        assert ['network/1'] == [record['_ref'] for record in mirror.search({'network': '10.1.0.0/16'})]
+
+        networks = get_networks(1, comment='bar')
+        responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+        mirror.refresh()
+
+        assert 'bar' == mirror.search({'network': '10.1.0.0/16'})[0]['comment']
+        assert ['network'] == mirror.stats()['indexes']
@@ -0,0 +1,100 @@
+import pytest
+import requests
+
+from infoblox import Client
+from infoblox.exceptions import HttpError
+from infoblox.instrumentation import Event, MetricsCollector
+from infoblox.prometheus import CONTENT_TYPE, generate_metrics, start_metrics_server
+
+
+@pytest.fixture
+def collector():
+    return MetricsCollector(buckets=(0.1, 1.0))
+
+
+@pytest.fixture
+def metrics_client(responses, api_schema, url, resource, collector):
+    responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+    return Client(url, hooks=[collector], negative_cache_ttl=60)
+
+
+def test_generate_metrics_returns_collector_metrics(collector, metrics_client):
+    collector(Event('request', 'network', 'get', 0.05, {'status_code': 200, 'request_bytes': 0,
+                                                        'response_bytes': 10, 'retries': 1}))
+    collector(Event('request', 'network', 'get', 0.5, {'status_code': 404, 'request_bytes': 0,
+                                                       'response_bytes': 5, 'retries': 0}))
+    collector(Event('request', 'network', 'get', 2.0, {'status_code': 201}))
+
+    lines = generate_metrics(metrics_client).splitlines()
+
+    assert '# TYPE infoblox_client_requests_total counter' in lines
+    assert 'infoblox_client_requests_total{object="network",operation="get",status_class="2xx"} 2' in lines
+    assert 'infoblox_client_requests_total{object="network",operation="get",status_class="4xx"} 1' in lines
+    assert '# TYPE infoblox_client_request_duration_seconds histogram' in lines
+    for le, count in (('0.1', 1), ('1', 2), ('+Inf', 3)):
+        assert f'infoblox_client_request_duration_seconds_bucket{{object="network",operation="get",le="{le}"}} ' \
+               f'{count}' in lines
+    assert 'infoblox_client_request_duration_seconds_sum{object="network",operation="get"} 2.55' in lines
+    assert 'infoblox_client_request_duration_seconds_count{object="network",operation="get"} 3' in lines
+    assert 'infoblox_client_response_bytes_total{object="network",operation="get"} 15' in lines
+    assert 'infoblox_client_retries_total{object="network",operation="get"} 1' in lines
+
+
+def test_generate_metrics_returns_pools_and_caches_metrics(responses, url, metrics_client):
+    responses.add(responses.GET, f'{url}/network/missing', json={'Error': 'not found'}, status=404)
+    resource = metrics_client.get_object('network')
+    for _ in range(2):
+        with pytest.raises(HttpError):
+            resource.get('network/missing')
+
+    lines = generate_metrics(metrics_client).splitlines()
+
+    assert 'infoblox_client_in_flight_requests 0' in lines
+    assert 'infoblox_client_negative_cache_lookups_total{result="hit"} 1' in lines
+    assert 'infoblox_client_negative_cache_lookups_total{result="miss"} 1' in lines
+    assert 'infoblox_client_negative_cache_entries 1' in lines
+    assert 'infoblox_client_coalesced_requests_total{outcome="executed"} 2' in lines
+    assert 'infoblox_client_requests_total{object="network",operation="get",status_class="4xx"} 1' in lines
+
+
+def test_generate_metrics_returns_pool_saturation(metrics_client):
+    adapter = metrics_client.session.get_adapter('http://foo')
+    pool = adapter.poolmanager.connection_from_url('http://foo')
+    # two connections are taken from the pool of 10 connections
+    pool.pool.get()
+    pool.pool.get()
+
+    lines = generate_metrics(metrics_client).splitlines()
+
+    assert 'infoblox_client_in_flight_requests 2' in lines
+    assert 'infoblox_client_pool_connections{host="foo:80",state="in_use"} 2' in lines
+    assert 'infoblox_client_pool_connections{host="foo:80",state="idle"} 8' in lines
+    assert 'infoblox_client_pool_saturation_ratio{host="foo:80"} 0.2' in lines
+
+
+def test_generate_metrics_without_collector(responses, api_schema, url):
+    responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+    metrics = generate_metrics(Client(url))
+
+    assert 'infoblox_client_requests_total' not in metrics
+    assert 'infoblox_client_negative_cache' not in metrics
+    assert 'infoblox_client_in_flight_requests 0' in metrics
+
+
+def test_label_values_are_escaped(collector, metrics_client):
+    collector(Event('decode', 'a"b\\c', 'get', 0.05, {}))
+
+    assert 'object="a\\"b\\\\c"' in generate_metrics(metrics_client)
+
+
+def test_metrics_server_exposes_metrics(loopback_passthru, collector, metrics_client):
+    server = start_metrics_server(metrics_client, port=0)
+    try:
+        response = requests.get(server.url)
+        assert 200 == response.status_code
+        assert CONTENT_TYPE == response.headers['Content-Type']
+        assert 'infoblox_client_requests_total{object="",operation="schema",status_class="2xx"} 1' in response.text
+        assert 404 == requests.get(server.url.replace('/metrics', '/foo')).status_code
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,79 @@
+import pytest
+
+from infoblox.exceptions import BadParameterError, FieldError, FieldNotFoundError, MandatoryFieldError
+from infoblox.query import Placeholder, PreparedQuery
+
+
+@pytest.fixture
+def query(resource):
+    return resource.prepare_query({'comment~': Placeholder('comment'), 'network': '10.1.0.0/16'},
+                                  return_fields=['network', 'comment'])
+
+
+class TestPrepareQuery:
+    def test_method_returns_prepared_query(self, query):
+        assert isinstance(query, PreparedQuery)
+        assert {'comment'} == query.placeholders
+
+    @pytest.mark.parametrize(('params', 'error'), [
+        ({'foo': '2'}, FieldNotFoundError),
+        ({'network': 2}, FieldError),
+        ({'network<': Placeholder('network')}, FieldError),
+        ({'authority': Placeholder('authority')}, FieldError),
+    ])
+    def test_method_validates_parameters_once(self, resource, params, error):
+        with pytest.raises(error):
+            resource.prepare_query(params)
+
+    def test_method_raises_error_when_template_is_not_a_dict(self, resource):
+        with pytest.raises(BadParameterError):
+            resource.prepare_query(['foo'])
+
+
+class TestBuildParameters:
+    def test_method_substitutes_placeholder_values(self, query):
+        assert {'comment~': 'foo', 'network': '10.1.0.0/16', '_return_fields': 'network,comment'} == \
+               query.build_parameters(comment='foo')
+
+    def test_method_does_not_validate_fixed_parameters_again(self, mocker, resource, query):
+        spy = mocker.spy(resource, '_validate_params')
+        query.build_parameters(comment='foo')
+
+        spy.assert_not_called()
+
+    def test_method_checks_placeholder_values(self, query):
+        with pytest.raises(FieldError):
+            query.build_parameters(comment=2)
+
+    def test_method_raises_error_when_placeholder_is_missing(self, query):
+        with pytest.raises(MandatoryFieldError):
+            query.build_parameters()
+
+    def test_method_raises_error_when_placeholder_is_unknown(self, query):
+        with pytest.raises(BadParameterError):
+            query.build_parameters(comment='foo', bar=2)
+
+    def test_extensible_attribute_values_are_not_checked(self, resource):
+        query = resource.prepare_query({'*Site': Placeholder('site')})
+
+        assert {'*Site': 2} == query.build_parameters(site=2)
+
+
+def test_get_method_performs_search_with_placeholder_values(responses, url, resource_name, query):
+    responses.replace(responses.GET, f'{url}/{resource_name}', json=[{'_ref': 'network/1'}], status=200)
+
+    assert [{'_ref': 'network/1'}] == query.get(comment='foo')
+    assert 'comment~=foo' in responses.calls[-1].request.url
+    assert '_return_fields=network%2Ccomment' in responses.calls[-1].request.url
+
+
+def test_get_multiple_method_iterates_over_pages(responses, url, resource_name, query):
+    first_page = {'result': [{'_ref': 'network/1'}], 'next_page_id': 'page'}
+    responses.replace(responses.GET, f'{url}/{resource_name}', json=first_page, status=200)
+    responses.add(responses.GET, f'{url}/{resource_name}', json={'result': [{'_ref': 'network/2'}]}, status=200)
+    items = query.get_multiple({'comment': 'foo'}, page_size=1)
+
+    assert ['network/1', 'network/2'] == [item['_ref'] for item in items]
+    first_page_url = responses.calls[-2].request.url
+    assert '_max_results=1' in first_page_url
+    assert 'comment~=foo' in first_page_url
@@ -1,9 +1,16 @@
-from urllib.parse import urlencode
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse, parse_qsl
 
 import pytest
 
+# noinspection PyProtectedMember
+from infoblox._cache import NegativeCache
 from infoblox.exceptions import BadParameterError, FieldError, FieldNotFoundError, \
     SearchOnlyFieldError, HttpError
+from infoblox.resource import Resource
 
 
 class TestGetMethodRaisesDifferentParameterErrors:
@@ -157,3 +164,202 @@ class TestCount:
         responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
 
         assert expected_value == resource.count()
+
+
+def test_get_method_shares_http_call_between_concurrent_identical_requests(responses, url, resource):
+    def request_callback(_):
+        time.sleep(0.2)
+        return 200, {}, json.dumps({'network': '10.1.0.0/16'})
+
+    responses.add_callback(responses.GET, f'{url}/object_ref', callback=request_callback,
+                           content_type='application/json')
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(resource.get, 'object_ref') for _ in range(4)]
+        results = [future.result() for future in futures]
+
+    assert all(result == {'network': '10.1.0.0/16'} for result in results)
+    # the first call loads the schema
+    assert 2 == len(responses.calls)
+
+
+class TestNegativeCache:
+    @pytest.fixture
+    def cached_resource(self, responses, url, resource_name, network_schema, test_session):
+        responses.add(responses.GET, f'{url}/{resource_name}', json=network_schema, status=200)
+        return Resource(test_session, url, resource_name, negative_cache=NegativeCache(60))
+
+    def test_get_method_does_not_fetch_again_reference_known_to_be_missing(self, responses, url, cached_resource):
+        responses.add(responses.GET, f'{url}/network/missing', json={'Error': 'not found'}, status=404)
+        for _ in range(3):
+            with pytest.raises(HttpError) as exc_info:
+                cached_resource.get(object_ref='network/missing')
+
+            assert 404 == exc_info.value.status_code
+            assert {'Error': 'not found'} == exc_info.value.error_message
+        # the first call loads the schema
+        assert 2 == len(responses.calls)
+
+    def test_get_method_does_not_remember_other_errors(self, responses, url, cached_resource):
+        responses.add(responses.GET, f'{url}/network/foo', json={'Error': 'oops'}, status=400)
+        for _ in range(2):
+            with pytest.raises(HttpError):
+                cached_resource.get(object_ref='network/foo')
+
+        assert 3 == len(responses.calls)
+
+    def test_create_method_invalidates_references_of_the_object(self, responses, url, resource_name,
+                                                                cached_resource):
+        responses.add(responses.GET, f'{url}/network/missing', json={'Error': 'not found'}, status=404)
+        responses.add(responses.POST, f'{url}/{resource_name}', json='network/missing', status=201)
+        with pytest.raises(HttpError):
+            cached_resource.get(object_ref='network/missing')
+        cached_resource.create(network='10.1.0.0/16')
+        responses.replace(responses.GET, f'{url}/network/missing', json={'network': '10.1.0.0/16'}, status=200)
+
+        assert {'network': '10.1.0.0/16'} == cached_resource.get(object_ref='network/missing')
+
+
+class TestResumableGetMultiple:
+    @pytest.fixture
+    def networks(self):
+        return [{'_ref': f'network/{i}', 'network': f'10.{i}.0.0/16'} for i in range(6)]
+
+    @pytest.fixture
+    def pages(self, responses, url, resource_name, resource, networks):
+        """Serves networks by pages of two objects, page ids being "page-1" and "page-2"."""
+        requested = []
+
+        def request_callback(request):
+            query = dict(parse_qsl(urlparse(request.url).query))
+            requested.append(query)
+            page = int(query.get('_page_id', 'page-0').split('-')[1])
+            payload = {'result': networks[page * 2:page * 2 + 2]}
+            if page < 2:
+                payload['next_page_id'] = f'page-{page + 1}'
+            return 200, {}, json.dumps(payload)
+
+        # the resource schema is already loaded
+        responses.remove(responses.GET, f'{url}/{resource_name}')
+        responses.add_callback(responses.GET, f'{url}/{resource_name}', callback=request_callback,
+                               content_type='application/json')
+        return requested
+
+    def test_method_saves_progress_and_removes_checkpoint_at_the_end(self, tempdir, resource, pages, networks):
+        checkpoint_file = os.path.join(tempdir, 'export.json')
+        items = []
+        for item in resource.get_multiple(checkpoint_file=checkpoint_file):
+            items.append(item)
+            if len(items) == 3:
+                with open(checkpoint_file) as f:
+                    state = json.load(f)
+                assert 'page-1' == state['page_id']
+                assert 2 == state['emitted']
+
+        assert networks == items
+        assert not os.path.exists(checkpoint_file)
+
+    def test_method_saves_data_returned_before_checkpoint(self, tempdir, resource, pages):
+        checkpoint_file = os.path.join(tempdir, 'export.json')
+        saved = []
+        iterator = resource.get_multiple(checkpoint_file=checkpoint_file,
+                                         before_checkpoint=lambda: {'written': len(saved)})
+        for _ in range(3):
+            saved.append(next(iterator))
+        iterator.close()
+
+        with open(checkpoint_file) as f:
+            assert {'written': 2} == json.load(f)['data']
+
+    def test_method_resumes_from_last_saved_page(self, tempdir, resource, pages, networks):
+        checkpoint_file = os.path.join(tempdir, 'export.json')
+        iterator = resource.get_multiple(checkpoint_file=checkpoint_file)
+        first_items = [next(iterator) for _ in range(3)]
+        iterator.close()  # simulates an interruption in the middle of the second page
+
+        items = list(resource.get_multiple(checkpoint_file=checkpoint_file))
+
+        assert networks[:3] == first_items
+        assert networks[2:] == items
+        assert {'_page_id': 'page-1'} == pages[-2]
+
+    def test_method_starts_query_again_when_cursor_has_expired(self, tempdir, responses, url, resource_name, resource,
+                                                             networks):
+        def request_callback(request):
+            query = dict(parse_qsl(urlparse(request.url).query))
+            if query.get('_page_id') == 'expired':
+                return 400, {}, json.dumps({'Error': 'Page id expired'})
+            return 200, {}, json.dumps({'result': networks})
+
+        # the resource schema is already loaded
+        responses.remove(responses.GET, f'{url}/{resource_name}')
+        responses.add_callback(responses.GET, f'{url}/{resource_name}', callback=request_callback,
+                               content_type='application/json')
+        checkpoint_file = os.path.join(tempdir, 'export.json')
+        with open(checkpoint_file, 'w') as f:
+            json.dump({'object': resource_name, 'query': {'_paging': 1, '_max_results': 1000, '_return_as_object': 1},
+                       'page_id': 'expired', 'emitted': 4}, f)
+
+        assert networks[4:] == list(resource.get_multiple(checkpoint_file=checkpoint_file))
+
+    def test_method_raises_error_when_cursor_expires_again_without_progress(self, tempdir, responses, url,
+                                                                           resource_name, resource, networks):
+        def request_callback(request):
+            query = dict(parse_qsl(urlparse(request.url).query))
+            if query.get('_page_id') == 'expired':
+                return 400, {}, json.dumps({'Error': 'Page id expired'})
+            # the first page only holds objects already emitted
+            return 200, {}, json.dumps({'result': networks[:4], 'next_page_id': 'expired'})
+
+        responses.remove(responses.GET, f'{url}/{resource_name}')
+        responses.add_callback(responses.GET, f'{url}/{resource_name}', callback=request_callback,
+                               content_type='application/json')
+        checkpoint_file = os.path.join(tempdir, 'export.json')
+        with open(checkpoint_file, 'w') as f:
+            json.dump({'object': resource_name, 'query': {'_paging': 1, '_max_results': 1000, '_return_as_object': 1},
+                       'page_id': 'expired', 'emitted': 4}, f)
+
+        with pytest.raises(HttpError) as exc_info:
+            list(resource.get_multiple(checkpoint_file=checkpoint_file))
+
+        assert 400 == exc_info.value.status_code
+        # the query is started again only once
+        assert 2 == sum('_page_id=expired' in call.request.url for call in responses.calls)
+
+    def test_method_raises_error_when_checkpoint_belongs_to_another_query(self, tempdir, resource_name, resource):
+        checkpoint_file = os.path.join(tempdir, 'export.json')
+        with open(checkpoint_file, 'w') as f:
+            json.dump({'object': resource_name, 'query': {'comment': 'foo'}, 'page_id': 'page-1', 'emitted': 2}, f)
+
+        with pytest.raises(BadParameterError) as exc_info:
+            list(resource.get_multiple(checkpoint_file=checkpoint_file))
+
+        assert 'is the checkpoint of another query' in str(exc_info.value)
+
+    def test_method_retries_failed_pages(self, mocker, responses, url, resource_name, resource, networks):
+        mocker.patch('infoblox.resource.time.sleep')
+        responses.remove(responses.GET, f'{url}/{resource_name}')
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'error': 'oops'}, status=502)
+        responses.add(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+
+        assert networks == list(resource.get_multiple(page_retries=1))
+
+    def test_method_does_not_retry_client_errors(self, mocker, responses, url, resource_name, resource):
+        sleep_mock = mocker.patch('infoblox.resource.time.sleep')
+        responses.replace(responses.GET, f'{url}/{resource_name}', json={'error': 'oops'}, status=400)
+
+        with pytest.raises(HttpError):
+            list(resource.get_multiple(page_retries=3))
+        sleep_mock.assert_not_called()
+
+
+class TestPageSize:
+    @pytest.mark.parametrize('page_size', [0, -1, 'foo'])
+    def test_get_multiple_raises_error_when_page_size_is_incorrect(self, resource, page_size):
+        with pytest.raises(BadParameterError):
+            list(resource.get_multiple(page_size=page_size))
+
+    def test_get_multiple_uses_page_size_as_max_results(self, responses, url, resource_name, resource):
+        responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': []}, status=200)
+        list(resource.get_multiple(page_size=50))
+
+        assert '_max_results=50' in responses.calls[1].request.url
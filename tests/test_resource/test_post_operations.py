@@ -109,17 +109,6 @@ class TestCreate:
         assert cidr in response['_ref']
 
 
-@pytest.mark.parametrize(('field_name', 'field_type'), [
-    ('num', 'input'),
-    ('exclude', 'input'),
-    ('ips', 'output')
-])
-def test_get_field_info_from_function_info_returns_correct_data(resource, field_name, field_type):
-    function_info = resource.get_function_information('next_available_ip')
-    function_field_info = resource.get_field_info_from_function_info(function_info, field_name, field_type)
-    assert field_name == function_field_info['name']
-
-
 class TestFuncCall:
     @pytest.mark.parametrize(('parameters', 'error_message'), [
         ({'object_ref': 'my-ref'}, 'function_name is missing')
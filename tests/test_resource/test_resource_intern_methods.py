@@ -1,4 +1,5 @@
 """Tests some intern methods and properties defined in Resource class"""
+import copy
 import time
 
 import pytest
@@ -114,6 +115,15 @@ def test_get_field_information_returns_correct_info(resource, field_name, field_
     assert field_structure == resource.get_field_information(field_name)
 
 
+@pytest.mark.parametrize('field_name', ['comment', 'options', 'subscribe_settings'])
+def test_get_field_information_does_not_modify_schema(resource, field_name):
+    schema = copy.deepcopy(resource.documentation)
+    first_info = resource.get_field_information(field_name)
+
+    assert schema == resource.documentation
+    assert first_info == resource.get_field_information(field_name)
+
+
 class TestGetFunctionInformation:
     def test_method_returns_correct_information(self, resource):
         field_structure = {
@@ -401,7 +411,8 @@ class TestProcessScheduleAndApprovalInfo:
                ' at the same time' == str(exc_info.value)
 
     @pytest.mark.parametrize('parameters', [
-        {'schedule_time': int(time.time()) + 10},
+        # computed at collection, far enough in the future to still be valid when the test runs
+        {'schedule_time': int(time.time()) + 3600},
         {'schedule_now': True},
         {'schedule_predecessor_task': 'previous-task'},
         {'schedule_warn_level': 'WARN'},
@@ -0,0 +1,96 @@
+import pytest
+
+from infoblox.exceptions import BadParameterError, FieldError, FieldNotFoundError
+from infoblox.search import EqualityIndex, LocalQuery, parse_search_key
+
+RECORDS = [
+    {'_ref': 'network/1', 'network': '10.1.0.0/16', 'comment': 'Gateway', 'lease_scavenge_time': 100,
+     'email_list': ['foo@bar.com'], 'extattrs': {'Site': {'value': 'Paris'}}},
+    {'_ref': 'network/2', 'network': '10.2.0.0/16', 'comment': 'backup gateway', 'lease_scavenge_time': 200,
+     'email_list': ['bar@bar.com', 'foo@foo.com'], 'extattrs': {'Site': {'value': 'London'}}},
+    {'_ref': 'network/3', 'network': '192.168.1.0/24', 'comment': 'office', 'lease_scavenge_time': 300,
+     'email_list': [], 'extattrs': {}},
+]
+
+
+def search(params, records=None):
+    return [record['_ref'] for record in LocalQuery(params).filter(records or RECORDS)]
+
+
+@pytest.mark.parametrize(('key', 'expected'), [
+    ('comment', ('comment', [])),
+    ('comment~', ('comment', ['~'])),
+    ('comment~:', ('comment', ['~', ':'])),
+    ('comment!:', ('comment', ['!', ':'])),
+    ('lease_scavenge_time<', ('lease_scavenge_time', ['<'])),
+])
+def test_parse_search_key_returns_field_and_modifiers(key, expected):
+    assert expected == parse_search_key(key)
+
+
+class TestLocalQuery:
+    @pytest.mark.parametrize('params', [4, 'foo', ['comment']])
+    def test_query_raises_error_when_params_is_not_a_dict(self, params):
+        with pytest.raises(BadParameterError):
+            LocalQuery(params)
+
+    def test_query_raises_error_when_regex_is_incorrect(self):
+        with pytest.raises(BadParameterError):
+            LocalQuery({'comment~': '('})
+
+    def test_query_without_params_matches_all_objects(self):
+        assert ['network/1', 'network/2', 'network/3'] == search(None)
+
+    @pytest.mark.parametrize(('params', 'expected_refs'), [
+        ({'comment': 'office'}, ['network/3']),
+        ({'comment': 'gateway'}, []),
+        ({'comment:': 'gateway'}, ['network/1']),
+        ({'comment~': 'gateway'}, ['network/2']),
+        ({'comment~:': '^gateway'}, ['network/1']),
+        ({'comment!': 'office'}, ['network/1', 'network/2']),
+        ({'comment!:': 'GATEWAY'}, ['network/2', 'network/3']),
+        ({'lease_scavenge_time<': 200}, ['network/1', 'network/2']),
+        ({'lease_scavenge_time>': 200}, ['network/2', 'network/3']),
+        ({'network>': '10.2.0.0/16'}, ['network/2', 'network/3']),
+        ({'email_list': 'foo@foo.com'}, ['network/2']),
+        ({'*Site': 'Paris'}, ['network/1']),
+        ({'*Site~': 'o'}, ['network/2']),
+        ({'*Site!': 'Paris'}, ['network/2', 'network/3']),
+        ({'comment~': 'gateway', 'lease_scavenge_time>': 100}, ['network/2']),
+        ({'comment': ['office', 'Gateway']}, ['network/1', 'network/3']),
+        ({'foo': 'bar'}, []),
+    ])
+    def test_query_filters_objects_like_infoblox(self, params, expected_refs):
+        assert expected_refs == search(params)
+
+    def test_query_uses_index_for_exact_matches(self):
+        index = EqualityIndex('comment', RECORDS[:1])
+        query = LocalQuery({'comment': 'office'})
+
+        # the third object is not examined since it is not in the index
+        assert [] == list(query.filter(RECORDS, {'comment': index}))
+        assert ['network/1'] == [record['_ref'] for record in LocalQuery({'comment': 'Gateway'}).filter(
+            RECORDS, {'comment': index})]
+
+
+def test_equality_index_indexes_each_array_item():
+    index = EqualityIndex('email_list', RECORDS)
+
+    assert [RECORDS[1]] == index.lookup('foo@foo.com')
+    assert [] == index.lookup('unknown')
+    assert [] == index.lookup(['unhashable'])
+    assert 3 == len(index)
+
+
+class TestResourceLocalQuery:
+    def test_method_validates_params(self, resource):
+        with pytest.raises(FieldNotFoundError):
+            resource.local_query({'foo': 'bar'})
+
+    def test_method_accepts_case_insensitive_modifier(self, resource):
+        assert ['network/1'] == [record['_ref'] for record in resource.local_query({'comment:': 'gateway'}).filter(
+            RECORDS)]
+
+    def test_method_rejects_unsupported_modifier(self, resource):
+        with pytest.raises(FieldError):
+            resource.local_query({'network:': '10.1.0.0/16'})
@@ -8,7 +8,8 @@ from infoblox import _settings
     ('DEFAULT_CONNECT_TIMEOUT', float),
     ('DEFAULT_READ_TIMEOUT', float),
     ('DEFAULT_MAX_RETRIES', int),
-    ('DEFAULT_BACKOFF_FACTOR', float)
+    ('DEFAULT_BACKOFF_FACTOR', float),
+    ('DEFAULT_NEGATIVE_CACHE_TTL', float)
 ])
 def test_settings_presence_and_type(setting_name, setting_type):
     assert hasattr(_settings, setting_name)
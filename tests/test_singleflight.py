@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from infoblox._singleflight import SingleFlight
+
+
+class TestMakeKey:
+    # test method make_key
+
+    def test_method_returns_same_key_whatever_the_order_of_parameters(self):
+        key_1 = SingleFlight.make_key('http://foo', {'a': 1, 'b': 2})
+        key_2 = SingleFlight.make_key('http://foo', {'b': 2, 'a': 1})
+
+        assert key_1 == key_2
+
+    @pytest.mark.parametrize(('url', 'params'), [
+        ('http://bar', {'a': 1}),
+        ('http://foo', {'a': 2}),
+        ('http://foo', None)
+    ])
+    def test_method_returns_different_keys_for_different_requests(self, url, params):
+        assert SingleFlight.make_key('http://foo', {'a': 1}) != SingleFlight.make_key(url, params)
+
+
+class TestDo:
+    # test method do
+
+    def test_method_coalesces_concurrent_calls(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'network': '10.1.0.0/16'}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(single_flight.do, 'key', fetch) for _ in range(5)]
+            results = [future.result() for future in futures]
+
+        assert 1 == len(calls)
+        assert all(result == {'network': '10.1.0.0/16'} for result in results)
+        assert (1, 4, 0) == (single_flight.executed, single_flight.shared, single_flight.in_flight)
+
+    def test_method_gives_waiters_their_own_copy_of_the_result(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        shared = {'foo': ['bar']}
+
+        def fetch():
+            started.set()
+            time.sleep(0.2)
+            return shared
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(single_flight.do, 'key', fetch)
+            started.wait()
+            waiter = executor.submit(single_flight.do, 'key', fetch)
+
+        assert leader.result() is shared
+        assert waiter.result() == shared
+        assert waiter.result() is not shared
+
+    def test_method_does_not_give_waiters_changes_made_by_the_leader(self, mocker):
+        class SlowEvent(threading.Event):
+            def wait(self, timeout=None):
+                result = super().wait(timeout)
+                # the leader alters its result before waiters wake up
+                time.sleep(0.2)
+                return result
+
+        started = threading.Event()
+        mocker.patch('infoblox._singleflight.threading.Event', SlowEvent)
+        single_flight = SingleFlight()
+
+        def fetch():
+            started.set()
+            time.sleep(0.2)
+            return {'foo': ['bar']}
+
+        def fetch_and_alter():
+            result = single_flight.do('key', fetch)
+            result['foo'].append('baz')
+            return result
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(fetch_and_alter)
+            started.wait()
+            waiter = executor.submit(single_flight.do, 'key', fetch)
+
+        assert {'foo': ['bar', 'baz']} == leader.result()
+        assert {'foo': ['bar']} == waiter.result()
+
+    def test_method_propagates_error_to_all_waiters(self):
+        single_flight = SingleFlight()
+
+        def fetch():
+            time.sleep(0.2)
+            raise ValueError('oops')
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(single_flight.do, 'key', fetch) for _ in range(3)]
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+    def test_method_does_not_coalesce_sequential_calls(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        for _ in range(3):
+            single_flight.do('key', calls.append, 1)
+
+        assert 3 == len(calls)
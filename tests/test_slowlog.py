@@ -0,0 +1,152 @@
+import io
+import json
+import os
+
+import pytest
+
+from infoblox import Client
+from infoblox.exceptions import BadParameterError, HttpError
+from infoblox.slowlog import REDACTED, SlowRequestLogger, redact
+
+
+@pytest.fixture
+def stream():
+    return io.StringIO()
+
+
+def get_lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_redact_replaces_sensitive_values():
+    data = {'name': 'foo', 'password': 'bar', 'extattrs': [{'API_Token': 'x', 'site': 'paris'}]}
+
+    assert {'name': 'foo', 'password': REDACTED, 'extattrs': [{'API_Token': REDACTED, 'site': 'paris'}]} == \
+        redact(data)
+    assert 'foo' == redact('foo')
+
+
+class TestSlowRequestLogger:
+    @pytest.mark.parametrize(('arguments', 'message'), [
+        ({'threshold': -1}, 'threshold must be a positive number but you provide -1'),
+        ({'threshold': '1'}, 'threshold must be a positive number but you provide 1'),
+        ({'sample_rate': 2}, 'sample_rate must be a number between 0 and 1 but you provide 2')
+    ])
+    def test_logger_raises_error_when_arguments_are_incorrect(self, arguments, message):
+        with pytest.raises(BadParameterError) as exc_info:
+            SlowRequestLogger(**arguments)
+
+        assert message == str(exc_info.value)
+
+    def test_logger_writes_slow_requests(self, responses, url, api_schema, stream):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        responses.add(responses.GET, f'{url}/network', json=[{'_ref': 'network/1'}], status=200)
+        client = Client(url, slow_request_logger=SlowRequestLogger(0, stream))
+        client.session.get(f'{url}/network', params={'network': '10.1.0.0/16', 'secret': 'foo'})
+
+        schema_line, line = get_lines(stream)
+        assert ('', 'schema') == (schema_line['object'], schema_line['operation'])
+        assert {
+            'method': 'GET', 'object': 'network', 'operation': 'get', 'path': '/wapi/v2.9/network',
+            'params': {'network': '10.1.0.0/16', 'secret': REDACTED}, 'status_code': 200, 'request_bytes': 0,
+            'response_bytes': 23, 'retries': 0
+        } == {key: value for key, value in line.items() if key not in ('timestamp', 'duration')}
+        assert line['duration'] >= 0
+        assert 'request_body' not in line
+
+    def test_logger_ignores_fast_requests(self, responses, url, api_schema, stream):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        Client(url, slow_request_logger=SlowRequestLogger(60, stream))
+
+        assert '' == stream.getvalue()
+
+    def test_logger_writes_sampled_redacted_bodies(self, responses, url, api_schema, stream):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        responses.add(responses.POST, f'{url}/admingroup', json={'_ref': 'admingroup/1', 'comment': 'x' * 30},
+                      status=201)
+        client = Client(url, slow_request_logger=SlowRequestLogger(0, stream, sample_rate=1, max_body_size=40))
+        client.session.post(f'{url}/admingroup', json={'name': 'foo', 'auth_password': 'bar'})
+        client.session.post(f'{url}/admingroup', data=b'\x00\x01')
+
+        line = get_lines(stream)[1]
+        assert {'name': 'foo', 'auth_password': REDACTED} == line['request_body']
+        assert '{"_ref": "admingroup/1", "comment": "xxx...' == line['response_body']
+        assert '<2 bytes>' == get_lines(stream)[2]['request_body']
+
+    def test_logger_appends_lines_to_file(self, responses, url, api_schema, tmp_path):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        path = str(tmp_path / 'slow.log')
+        logger = SlowRequestLogger(0, path)
+        Client(url, slow_request_logger=logger)
+        logger.close()
+
+        with open(path) as f:
+            assert 'schema' == json.loads(f.readline())['operation']
+
+
+class TestClientSlowRequestLogger:
+    def test_logger_is_configured_by_environment(self, responses, url, api_schema, tmp_path, mocker):
+        path = str(tmp_path / 'slow.log')
+        mocker.patch.dict('os.environ', {'IB_SLOW_REQUEST_THRESHOLD': '0', 'IB_SLOW_REQUEST_LOG': path,
+                                         'IB_SLOW_REQUEST_SAMPLE_RATE': '0.5'})
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        client = Client(url)
+        logger = client.slow_request_logger
+        client.close()
+
+        assert (0, 0.5) == (logger.threshold, logger.sample_rate)
+        assert os.path.getsize(path) > 0
+
+    def test_client_closes_logger_configured_by_environment(self, responses, url, api_schema, tmp_path, mocker):
+        mocker.patch.dict('os.environ', {'IB_SLOW_REQUEST_THRESHOLD': '0',
+                                         'IB_SLOW_REQUEST_LOG': str(tmp_path / 'slow.log')})
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        with Client(url) as client:
+            # noinspection PyProtectedMember
+            output = client.slow_request_logger._output
+            assert not output.closed
+
+        assert output.closed
+        assert client.slow_request_logger is None
+
+    def test_client_closes_logger_configured_by_environment_when_replaced(self, responses, url, api_schema,
+                                                                          tmp_path, stream, mocker):
+        mocker.patch.dict('os.environ', {'IB_SLOW_REQUEST_THRESHOLD': '0',
+                                         'IB_SLOW_REQUEST_LOG': str(tmp_path / 'slow.log')})
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        client = Client(url)
+        # noinspection PyProtectedMember
+        output = client.slow_request_logger._output
+        client.set_slow_request_logger(SlowRequestLogger(0, stream))
+
+        assert output.closed
+
+    def test_client_does_not_close_given_logger(self, responses, url, api_schema, tmp_path):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        logger = SlowRequestLogger(0, str(tmp_path / 'slow.log'))
+        Client(url, slow_request_logger=logger).close()
+
+        # noinspection PyProtectedMember
+        assert not logger._output.closed
+        logger.close()
+
+    def test_client_closes_logger_when_schema_cannot_be_loaded(self, responses, url, tmp_path, mocker):
+        mocker.patch.dict('os.environ', {'IB_SLOW_REQUEST_THRESHOLD': '0',
+                                         'IB_SLOW_REQUEST_LOG': str(tmp_path / 'slow.log')})
+        close_mock = mocker.patch('infoblox.slowlog.SlowRequestLogger.close')
+        responses.add(responses.GET, f'{url}/', json={'Error': 'failure'}, status=500)
+        with pytest.raises(HttpError):
+            Client(url)
+
+        close_mock.assert_called_once_with()
+
+    def test_logger_can_be_replaced_and_removed(self, responses, url, api_schema, stream):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        client = Client(url)
+        assert client.slow_request_logger is None
+
+        logger = SlowRequestLogger(0, stream)
+        client.set_slow_request_logger(logger)
+        assert [logger] == client.session.hooks['response']
+        client.set_slow_request_logger(None)
+        assert [] == client.session.hooks['response']
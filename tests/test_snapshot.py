@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+from infoblox.exceptions import BadParameterError
+from infoblox.snapshot import Snapshot, get_table_name
+from infoblox.testing import RECORD_A_FIELDS, make_field
+
+
+def get_networks(*numbers, comment='foo'):
+    return [{'_ref': f'network/{i}', 'network': f'10.{i}.0.0/16', 'comment': comment,
+             'options': [{'name': 'routers', 'num': 3}]} for i in numbers]
+
+
+@pytest.fixture
+def snapshot(tempdir):
+    with Snapshot(os.path.join(tempdir, 'snapshot.db')) as local_snapshot:
+        yield local_snapshot
+
+
+@pytest.fixture
+def synced_snapshot(responses, url, resource_name, resource, snapshot):
+    responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': get_networks(1, 2, 3)}, status=200)
+    snapshot.sync(resource, return_fields_plus=['options'])
+    return snapshot
+
+
+@pytest.mark.parametrize(('name', 'table_name'), [
+    ('network', 'network'),
+    ('record:host', 'record_host'),
+    ('ipv4address', 'ipv4address')
+])
+def test_get_table_name_returns_correct_name(name, table_name):
+    assert table_name == get_table_name(name)
+
+
+def test_snapshot_raises_error_when_path_is_not_a_string():
+    with pytest.raises(BadParameterError):
+        Snapshot(4)
+
+
+class TestSync:
+    def test_method_stores_objects_with_extracted_columns(self, synced_snapshot):
+        rows = synced_snapshot.query('SELECT _ref, network, comment, options FROM network ORDER BY _ref')
+
+        assert 3 == len(rows)
+        assert {'_ref': 'network/1', 'network': '10.1.0.0/16', 'comment': 'foo',
+                'options': '[{"name": "routers", "num": 3}]'} == rows[0]
+
+    def test_method_stores_complete_objects(self, synced_snapshot):
+        assert get_networks(1, 2, 3) == sorted(synced_snapshot.objects('network'), key=lambda item: item['_ref'])
+
+    def test_method_indexes_name_and_address_columns(self, synced_snapshot):
+        indexes = [row['name'] for row in synced_snapshot.query("SELECT name FROM sqlite_master WHERE type='index'"
+                                                                 " AND tbl_name='network'")]
+
+        assert 'ix_network_network' in indexes
+        assert 'ix_network_comment' not in indexes
+
+    def test_method_only_applies_changes_on_resync(self, responses, url, resource_name, resource, synced_snapshot):
+        networks = get_networks(1, 4) + get_networks(2, comment='bar')
+        responses.replace(responses.GET, f'{url}/{resource_name}', json={'result': networks}, status=200)
+
+        stats = synced_snapshot.sync(resource, return_fields_plus=['options'])
+
+        assert {'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 1} == stats
+        rows = synced_snapshot.query('SELECT _ref, comment FROM network ORDER BY _ref')
+        assert [('network/1', 'foo'), ('network/2', 'bar'), ('network/4', 'foo')] == [
+            (row['_ref'], row['comment']) for row in rows
+        ]
+
+    def test_method_keeps_previous_content_when_sync_fails(self, responses, url, resource_name, resource,
+                                                          synced_snapshot):
+        responses.replace(responses.GET, f'{url}/{resource_name}', json={'error': 'oops'}, status=400)
+        with pytest.raises(Exception):
+            synced_snapshot.sync(resource)
+
+        assert 3 == synced_snapshot.query('SELECT count(*) AS total FROM network')[0]['total']
+
+    def test_method_records_synchronization_information(self, synced_snapshot):
+        info = synced_snapshot.synced_objects()
+
+        assert 1 == len(info)
+        assert 'network' == info[0]['name']
+        assert 3 == info[0]['count']
+        assert 1 == info[0]['generation']
+
+
+def test_query_method_binds_parameters(synced_snapshot):
+    rows = synced_snapshot.query('SELECT _ref FROM network WHERE network = ?', ('10.2.0.0/16',))
+
+    assert [{'_ref': 'network/2'}] == rows
+
+
+def test_search_method_filters_objects_with_wapi_parameters(resource, synced_snapshot):
+    assert ['network/2'] == [record['_ref'] for record in synced_snapshot.search(resource, {'network': '10.2.0.0/16'})]
+    assert ['network/1', 'network/3'] == sorted(
+        record['_ref'] for record in synced_snapshot.search(resource, {'network~': r'^10\.[13]\.', 'comment:': 'FOO'})
+    )
+
+
+def test_search_method_converts_text_values_to_field_types(fake_wapi, fake_client, snapshot):
+    fake_wapi.add_objects('record:a', [{'name': 'foo.com', 'ipv4addr': '10.1.0.1', 'ttl': 3600},
+                                       {'name': 'bar.com', 'ipv4addr': '10.1.0.2', 'ttl': 60}])
+    record = fake_client.get_object('record:a')
+    snapshot.sync(record, return_fields_plus=['ttl'])
+
+    # values given on the command line are strings, like in wapi query strings
+    assert ['foo.com'] == [item['name'] for item in snapshot.search(record, {'ttl': '3600'})]
+    assert ['bar.com'] == [item['name'] for item in snapshot.search(record, {'ttl<': '100'})]
+
+
+def test_search_method_matches_values_of_array_fields(fake_wapi, fake_client, snapshot):
+    # values of an enum array are checked against the enumeration, so a single value can be searched
+    roles = make_field('roles', 'enum', searchable_by='=', standard_field=True, is_array=True,
+                       doc='The roles of the record.')
+    roles['enum_values'] = ['primary', 'secondary']
+    fake_wapi.add_schema('record:a', RECORD_A_FIELDS + [roles])
+    fake_wapi.add_objects('record:a', [{'name': 'foo.com', 'ipv4addr': '10.1.0.1', 'roles': ['primary', 'secondary']},
+                                       {'name': 'bar.com', 'ipv4addr': '10.1.0.2', 'roles': ['secondary']}])
+    record = fake_client.get_object('record:a')
+    snapshot.sync(record)
+
+    assert ['foo.com'] == [item['name'] for item in snapshot.search(record, {'roles': 'primary'})]
+    assert ['bar.com', 'foo.com'] == sorted(item['name'] for item in snapshot.search(record, {'roles': 'secondary'}))
@@ -0,0 +1,187 @@
+import time
+
+import pytest
+
+from infoblox.exceptions import HttpError
+from infoblox.testing import make_function_field, make_networks
+
+
+def test_make_networks_returns_distinct_networks():
+    networks = list(make_networks(3, prefix_length=24))
+
+    assert ['10.0.0.0/24', '10.0.1.0/24', '10.0.2.0/24'] == [network['network'] for network in networks]
+    assert {'Site': {'value': 'London'}} == networks[1]['extattrs']
+    with pytest.raises(ValueError):
+        next(make_networks(300, prefix_length=16))
+
+
+class TestFakeWapi:
+    def test_schemas_are_returned(self, fake_wapi):
+        status_code, api_schema = fake_wapi.handle('GET', '', {'_schema': '1'})
+        assert 200 == status_code
+        assert ['network', 'record:a'] == api_schema['supported_objects']
+
+        status_code, schema = fake_wapi.handle('GET', 'network', {'_schema': '1', '_get_doc': '1'})
+        assert 'next_available_ip' in [field['name'] for field in schema['fields']]
+
+    def test_objects_are_created_read_updated_and_deleted(self, fake_wapi):
+        status_code, ref = fake_wapi.handle('POST', 'network', {},
+                                            {'network': '10.1.0.0/24', 'network_view': 'default'})
+        assert 201 == status_code
+        assert ref.startswith('network/') and ref.endswith(':10.1.0.0/24/default')
+
+        assert (200, ref) == fake_wapi.handle('PUT', ref, {}, {'comment': 'foo'})
+        assert (200, {'_ref': ref, 'network': '10.1.0.0/24', 'network_view': 'default', 'comment': 'foo'}) == \
+            fake_wapi.handle('GET', ref, {})
+        status_code, data = fake_wapi.handle('GET', ref, {'_return_fields': 'comment'})
+        assert {'_ref': ref, 'comment': 'foo'} == data
+
+        assert (200, ref) == fake_wapi.handle('DELETE', ref)
+        status_code, error = fake_wapi.handle('GET', ref)
+        assert 404 == status_code
+        assert 'Client.Ibap.Data.NotFound' == error['code']
+
+    @pytest.mark.parametrize(('method', 'path', 'params', 'data', 'message'), [
+        ('GET', 'foo', {}, None, 'Unknown object type (foo)'),
+        ('GET', 'network', {'disable': 'true'}, None, 'Field is not searchable: disable'),
+        ('GET', 'network', {'network_view~': 'def'}, None, 'Search modifier ~ is not supported by network_view'),
+        ('GET', 'network', {'_return_fields': 'foo'}, None, "Unknown argument/field: 'foo'"),
+        ('POST', 'network', {}, {'foo': 'bar'}, "Unknown argument/field: 'foo'"),
+        ('GET', 'network', {'_page_id': 'foo'}, None, 'Page id is not valid or has expired'),
+    ])
+    def test_invalid_requests_return_errors(self, fake_wapi, method, path, params, data, message):
+        status_code, error = fake_wapi.handle(method, path, params, data)
+
+        assert 400 == status_code
+        assert message == error['text']
+
+    def test_duplicate_objects_are_refused(self, fake_wapi):
+        fake_wapi.add_objects('network', [{'network': '10.1.0.0/24', 'network_view': 'default'}])
+        status_code, error = fake_wapi.handle('POST', 'network', {},
+                                              {'network': '10.1.0.0/24', 'network_view': 'default'})
+
+        assert 400 == status_code
+        assert 'Client.Ibap.Data.Conflict' == error['code']
+
+    def test_search_supports_modifiers_and_max_results(self, fake_wapi):
+        fake_wapi.add_objects('network', make_networks(30))
+
+        status_code, result = fake_wapi.handle('GET', 'network', {'comment~': r'network 1\d$', '*Site': 'London'})
+        assert ['network 11', 'network 16'] == [item['comment'] for item in result]
+        status_code, error = fake_wapi.handle('GET', 'network', {'_max_results': '10'})
+        assert (400, 'Result set too large (> 10)') == (status_code, error['text'])
+        status_code, result = fake_wapi.handle('GET', 'network', {'_max_results': '-10', '_return_as_object': '1'})
+        assert 10 == len(result['result'])
+
+    def test_search_returns_pages(self, fake_wapi):
+        fake_wapi.add_objects('network', make_networks(25))
+        params = {'_paging': '1', '_return_as_object': '1', '_max_results': '10', '_return_fields+': 'extattrs'}
+
+        items = []
+        while True:
+            status_code, page = fake_wapi.handle('GET', 'network', params)
+            items.extend(page['result'])
+            if 'next_page_id' not in page:
+                break
+            params = {'_page_id': page['next_page_id'], '_max_results': '10'}
+        assert 25 == len(items)
+        assert 'extattrs' in items[0]
+
+    def test_functions_are_called(self, fake_wapi):
+        ref = fake_wapi.add_objects('network', [{'network': '10.1.0.0/29'}])[0]
+        fake_wapi.add_objects('record:a', [{'name': 'foo.com', 'ipv4addr': '10.1.0.1'}])
+
+        assert (200, {'ips': ['10.1.0.2', '10.1.0.4']}) == \
+            fake_wapi.handle('POST', ref, {'_function': 'next_available_ip'}, {'num': 2, 'exclude': ['10.1.0.3']})
+        status_code, error = fake_wapi.handle('POST', ref, {'_function': 'next_available_ip'}, {'num': 10})
+        assert 400 == status_code
+
+    def test_custom_functions_can_be_added(self, fake_wapi):
+        fake_wapi.add_schema('grid', [make_function_field('restartservices')],
+                             functions={'restartservices': lambda *_: {'restarted': True}})
+
+        assert (200, {'restarted': True}) == fake_wapi.handle('POST', 'grid', {'_function': 'restartservices'}, {})
+        assert 'grid' in fake_wapi.supported_objects
+
+    def test_request_object_executes_operations(self, fake_wapi):
+        status_code, results = fake_wapi.handle('POST', 'request', data=[
+            {'method': 'POST', 'object': 'network', 'data': {'network': '10.1.0.0/24'}, 'discard': True},
+            {'method': 'GET', 'object': 'network', 'args': {'network': '10.1.0.0/24'}}
+        ])
+
+        assert 200 == status_code
+        assert 1 == len(results)
+        assert '10.1.0.0/24' == results[0][0]['network']
+
+    def test_errors_can_be_injected(self, fake_wapi):
+        fake_wapi.inject_errors(2, status_code=502, method='GET')
+
+        assert 201 == fake_wapi.handle('POST', 'network', {}, {'network': '10.1.0.0/24'})[0]
+        assert 502 == fake_wapi.handle('GET', 'network')[0]
+        assert 502 == fake_wapi.handle('GET', 'network')[0]
+        assert 200 == fake_wapi.handle('GET', 'network')[0]
+        assert 3 == fake_wapi.request_counts[('GET', 'network')]
+
+    def test_latency_is_added(self, fake_wapi):
+        fake_wapi.latency = 0.05
+        start = time.perf_counter()
+        fake_wapi.handle('GET', 'network')
+
+        assert time.perf_counter() - start >= 0.05
+
+
+class TestFakeWapiServer:
+    def test_client_performs_crud_operations(self, fake_client):
+        network = fake_client.get_object('network')
+        ref = network.create(network='10.1.0.0/24', comment='foo')
+        network.update(ref, comment='bar')
+
+        assert 'bar' == network.get(ref)['comment']
+        assert [{'_ref': ref, 'network': '10.1.0.0/24', 'comment': 'bar'}] == \
+            network.get(params={'comment': 'bar'}, return_fields=['network', 'comment'])
+        assert {'ips': ['10.1.0.1']} == network.func_call(ref, 'next_available_ip', num=1)
+        assert ref == network.delete(ref)
+        with pytest.raises(HttpError) as exc_info:
+            network.get(ref)
+        assert 404 == exc_info.value.status_code
+
+    def test_client_reads_objects_page_by_page(self, fake_wapi, fake_client):
+        fake_wapi.add_objects('network', make_networks(2500))
+        network = fake_client.get_object('network')
+
+        assert 2500 == len(list(network.get_multiple(page_size=1000)))
+        assert 500 == network.count(params={'*Site': 'Paris'})
+        # the schema, three pages and the page of count
+        assert 5 == fake_wapi.request_counts[('GET', 'network')]
+
+    def test_client_restarts_expired_pages(self, fake_wapi, fake_client):
+        fake_wapi.add_objects('network', make_networks(25))
+        network = fake_client.get_object('network')
+
+        items = []
+        for item in network.get_multiple(page_size=10):
+            items.append(item['network'])
+            if len(items) == 15:
+                fake_wapi.expire_cursors()
+        assert 25 == len(set(items)) == len(items)
+
+    def test_client_retries_injected_errors(self, fake_wapi, fake_client):
+        fake_wapi.add_objects('network', make_networks(2))
+        fake_wapi.inject_errors(1, status_code=503, method='GET')
+
+        assert 2 == len(fake_client.get_object('network').get())
+        assert 3 == fake_wapi.request_counts[('GET', 'network')]
+
+    def test_client_sends_custom_requests(self, fake_client):
+        results = fake_client.custom_request([
+            {'method': 'POST', 'object': 'record:a', 'data': {'name': 'foo.com', 'ipv4addr': '10.1.0.1'}},
+            {'method': 'GET', 'object': 'record:a', 'args': {'name~': 'foo'}}
+        ])
+
+        assert results[0].startswith('record:a/')
+        assert 'foo.com' == results[1][0]['name']
+
+    def test_unknown_urls_return_404(self, fake_wapi_server, fake_client):
+        response = fake_client.session.get(fake_wapi_server.url.replace('/wapi/v2.9', '/foo'))
+
+        assert 404 == response.status_code
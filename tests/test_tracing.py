@@ -0,0 +1,167 @@
+import builtins
+
+import pytest
+
+from infoblox import Client
+from infoblox.exceptions import HttpError
+from infoblox.tracing import InMemoryExporter, OpenTelemetryTracer, Tracer
+
+
+@pytest.fixture
+def exporter():
+    return InMemoryExporter()
+
+
+@pytest.fixture
+def traced_client(responses, api_schema, url, resource, exporter):
+    responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+    return Client(url, tracer=Tracer(exporter))
+
+
+def get_children(exporter, span):
+    return [child.name for child in exporter.get_spans() if child.parent_id == span.span_id]
+
+
+class TestTracer:
+    def test_spans_started_in_active_span_are_children(self, exporter):
+        tracer = Tracer(exporter)
+        parent = tracer.start_span('parent')
+        tracer.activate(parent)
+        child = tracer.record_span('child', 1.0, 3.0, {'foo': 'bar'})
+        tracer.deactivate(parent)
+        tracer.end_span(parent, error=ValueError('oops'))
+
+        assert [child, parent] == exporter.get_spans()
+        assert (parent.trace_id, parent.span_id) == (child.trace_id, child.parent_id)
+        assert 2.0 == child.duration
+        assert {'foo': 'bar'} == child.attributes
+        assert 'ValueError: oops' == parent.error
+        assert parent.parent_id is None
+        assert tracer.current_span is None
+
+    def test_explicit_parent_is_used(self, exporter):
+        tracer = Tracer(exporter)
+        first = tracer.start_span('first')
+        tracer.activate(tracer.start_span('second'))
+
+        assert first.span_id == tracer.start_span('third', parent=first).parent_id
+
+    def test_span_to_dict_returns_correct_data(self, exporter):
+        tracer = Tracer(exporter)
+        span = tracer.start_span('span', start_time=1.0)
+        span.add_event('retry', {'error': 'oops'})
+        tracer.end_span(span, end_time=2.0)
+
+        data = span.to_dict()
+        assert (1.0, 2.0, None) == (data['start_time'], data['end_time'], data['error'])
+        assert 'retry' == data['events'][0]['name']
+        assert {'error': 'oops'} == data['events'][0]['attributes']
+
+    def test_exporter_filters_and_clears_spans(self, exporter):
+        tracer = Tracer(exporter)
+        tracer.record_span('foo', 1.0, 2.0)
+        tracer.record_span('bar', 1.0, 2.0)
+
+        assert ['bar'] == [span.name for span in exporter.get_spans('bar')]
+        exporter.clear()
+        assert [] == exporter.get_spans()
+
+
+class TestClientTracing:
+    def test_operation_span_has_children_spans(self, responses, url, traced_client, exporter):
+        resource = traced_client.get_object('network')
+        exporter.clear()
+        responses.add(responses.POST, f'{url}/network', json='network/1', status=201)
+        resource.create(network='10.1.0.0/16')
+
+        operation = exporter.get_spans('infoblox.create')[0]
+        assert ['infoblox.validation', 'infoblox.http', 'infoblox.decode'] == get_children(exporter, operation)
+        assert {'infoblox.object': 'network', 'infoblox.operation': 'create', 'infoblox.results': 1} == \
+            operation.attributes
+        http = exporter.get_spans('infoblox.http')[0]
+        assert 'POST' == http.attributes['http.method']
+        assert 201 == http.attributes['http.status_code']
+        assert 0 == http.attributes['http.retries']
+        assert {operation.trace_id} == {span.trace_id for span in exporter.get_spans()}
+
+    def test_get_multiple_pages_are_children_of_operation(self, responses, url, traced_client, exporter):
+        resource = traced_client.get_object('network')
+        resource._backoff_factor = 0
+        responses.replace(responses.GET, f'{url}/network', json={'error': 'oops'}, status=503)
+        responses.add(responses.GET, f'{url}/network', json={'result': [{}, {}]})
+        exporter.clear()
+
+        assert 2 == len(list(resource.get_multiple(page_retries=1)))
+        operation = exporter.get_spans('infoblox.get_multiple')[0]
+        assert ['infoblox.validation', 'infoblox.page'] == get_children(exporter, operation)
+        page = exporter.get_spans('infoblox.page')[0]
+        assert ['infoblox.http', 'infoblox.http', 'infoblox.decode'] == get_children(exporter, page)
+        assert 2 == page.attributes['infoblox.items']
+        assert 2 == operation.attributes['infoblox.results']
+        assert 'infoblox.retry' == page.events[0][0]
+
+    def test_errors_are_recorded(self, responses, url, traced_client, exporter):
+        resource = traced_client.get_object('network')
+        responses.add(responses.GET, f'{url}/network/missing', json={'Error': 'not found'}, status=404)
+        with pytest.raises(HttpError):
+            resource.get('network/missing')
+
+        operation = exporter.get_spans('infoblox.get')[0]
+        assert operation.error.startswith('HttpError')
+        assert 404 == exporter.get_spans('infoblox.http')[-1].attributes['http.status_code']
+
+    def test_tracer_can_be_removed(self, traced_client, exporter):
+        traced_client.set_tracer(None)
+        traced_client.get_object('network')
+
+        assert not traced_client.instrumentation.enabled
+        assert 1 == len(exporter.get_spans())
+
+    def test_no_spans_are_created_by_default(self, responses, api_schema, url, resource):
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        client = Client(url)
+
+        assert client.instrumentation.tracer is None
+        assert not client.instrumentation.enabled
+        assert [] == client.session.hooks['response']
+
+
+class TestOpenTelemetryTracer:
+    def test_spans_are_mirrored_to_opentelemetry(self, responses, url, api_schema, resource):
+        pytest.importorskip('opentelemetry.sdk')
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+        from opentelemetry.trace import StatusCode
+
+        otel_exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(otel_exporter))
+        responses.add(responses.GET, f'{url}/', json=api_schema, status=200)
+        responses.add(responses.GET, f'{url}/network/missing', json={'Error': 'not found'}, status=404)
+        client = Client(url, tracer=OpenTelemetryTracer(provider.get_tracer('test')))
+        with pytest.raises(HttpError):
+            client.get_object('network').get('network/missing')
+
+        spans = {span.name: span for span in otel_exporter.get_finished_spans()}
+        operation = spans['infoblox.get']
+        http = spans['infoblox.http']
+        assert operation.context.span_id == http.parent.span_id
+        assert operation.context.trace_id == http.context.trace_id
+        assert StatusCode.ERROR == operation.status.status_code
+        assert 404 == http.attributes['http.status_code']
+        assert 'network' == operation.attributes['infoblox.object']
+
+    def test_error_is_raised_without_opentelemetry(self, monkeypatch):
+        import_function = builtins.__import__
+
+        def fake_import(name, *args, **kwargs):
+            if name.startswith('opentelemetry'):
+                raise ImportError(name)
+            return import_function(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, '__import__', fake_import)
+        with pytest.raises(ImportError) as exc_info:
+            OpenTelemetryTracer()
+
+        assert 'pip install ib-client[opentelemetry]' in str(exc_info.value)
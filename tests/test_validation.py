@@ -0,0 +1,78 @@
+import pytest
+
+from infoblox.exceptions import BadParameterError
+from infoblox.resource import Resource
+from infoblox.validation import PayloadErrors, validate_payloads
+
+
+@pytest.fixture
+def offline_resource(network_schema):
+    return Resource(None, None, 'network', schema=network_schema)
+
+
+def test_resource_built_from_schema_does_not_download_it(responses, offline_resource):
+    assert 0 == len(responses.calls)
+    assert 'comment' in offline_resource.fields
+    assert 'next_available_ip' in offline_resource.functions
+
+
+class TestResourceValidate:
+    def test_method_raises_error_when_operation_is_unknown(self, offline_resource):
+        with pytest.raises(BadParameterError):
+            offline_resource.validate({}, 'delete')
+
+    @pytest.mark.parametrize('payload', [
+        {'network': '10.1.0.0/16'},
+        {'network': '10.1.0.0/16', 'authority': True, 'email_list': ['foo@bar.com'], 'options': [{'name': 'foo'}]},
+    ])
+    def test_method_returns_no_error_for_valid_creation(self, offline_resource, payload):
+        assert [] == offline_resource.validate(payload)
+
+    def test_method_returns_all_errors_of_invalid_creation(self, offline_resource):
+        errors = offline_resource.validate({'foo': 1, 'authority': 'yes', 'dhcp_utilization_status': 'FULL',
+                                            'email_list': 'foo@bar.com'})
+
+        assert 5 == len(errors)
+        assert 'you have not provided any standard field for the network object' in errors[0]
+        assert 'foo is not a network field' == errors[1]
+        assert errors[2].startswith('authority must have one of the following types')
+        assert errors[3].startswith('dhcp_utilization_status cannot be written')
+        assert errors[4].startswith('email_list must be a list of values')
+
+    def test_method_checks_update_support(self, offline_resource):
+        assert [] == offline_resource.validate({'_ref': 'network/1', 'comment': 'foo'}, 'update')
+        assert ['_ref must be a string but you provide 2'] == offline_resource.validate({'_ref': 2}, 'update')
+        errors = offline_resource.validate({'contains_address': '10.1.0.1'}, 'update')
+        assert errors[0].startswith('contains_address cannot be updated')
+
+    def test_method_returns_error_when_payload_is_not_a_dict(self, offline_resource):
+        assert ['payload must be a json object but you provide [1]'] == offline_resource.validate([1])
+
+
+class TestValidatePayloads:
+    @pytest.fixture
+    def payloads(self):
+        payloads = [(line, {'network': f'10.{line}.0.0/16'}) for line in range(1, 11)]
+        payloads[3] = (4, {'comment': 2})
+        payloads[7] = (8, ValueError('unable to parse json data'))
+        return payloads
+
+    @pytest.mark.parametrize(('parameter', 'value'), [
+        ('operation', 'delete'), ('processes', 0), ('processes', 'foo'), ('chunk_size', 0), ('chunk_size', 2.5)
+    ])
+    def test_function_raises_error_when_parameters_are_incorrect(self, offline_resource, parameter, value):
+        with pytest.raises(BadParameterError):
+            list(validate_payloads(offline_resource, [], **{parameter: value}))
+
+    def test_function_yields_errors_of_invalid_payloads(self, offline_resource, payloads):
+        errors = list(validate_payloads(offline_resource, payloads))
+
+        assert [4, 8] == [item.line for item in errors]
+        assert errors[0].errors[0].startswith('comment must have one of the following types')
+        assert PayloadErrors(8, ['unable to parse json data']) == errors[1]
+
+    def test_function_validates_chunks_in_processes_in_input_order(self, offline_resource, payloads):
+        sequential = list(validate_payloads(offline_resource, payloads, processes=1))
+        parallel = list(validate_payloads(offline_resource, payloads, processes=2, chunk_size=2))
+
+        assert sequential == parallel